@@ -1,2 +1,5 @@
 # AI-Lawyer Backend Application
 # This package contains the core application logic
+
+# Loads .env before any module reads its settings
+from app import config  # noqa: F401
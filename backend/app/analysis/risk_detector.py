@@ -0,0 +1,130 @@
+import os
+import re
+from datetime import date, timedelta
+from typing import List, Optional
+
+from app.analysis.sentiment_analyzer import EVIDENCE_GAP, lexicon_hits, score_hits
+from app.core.case_parser import extract_dates
+
+# (pattern, what the deadline is for, days from the trigger date, source).
+# A rule applies when its pattern occurs in the text; the trigger date is
+# the date mentioned closest to its last match, else the latest in the text.
+# Indicative periods only: condonation, tolling and exclusions are ignored.
+_LIMITATION_RULES = [
+    (r"\bcheque\b.{0,80}\b(?:bounced?|dishono[u]?red|returned unpaid|insufficient funds)",
+     "Demand notice after cheque dishonour", 30, "Negotiable Instruments Act, 1881, s. 138(b)"),
+    (r"\b(?:legal|demand) notice\b.{0,120}\bcheque\b|\bcheque\b.{0,120}\b(?:legal|demand) notice\b",
+     "Cheque bounce complaint (15 days to pay + 1 month to file)", 45, "Negotiable Instruments Act, 1881, ss. 138(c), 142"),
+    (r"\bconsumer\b|\bdeficien\w* in service\b", "Consumer complaint", 730, "Consumer Protection Act, 2019, s. 69"),
+    (r"\b(?:recover\w*|repay\w*|refund\w*|loan|advance|breach of (?:the )?contract|failed to deliver|not delivered)\b",
+     "Suit for recovery of money or breach of contract", 3 * 365, "Limitation Act, 1963, Arts. 19, 55"),
+    (r"\b(?:terminat\w*|dismiss\w*|retrench\w*)\b.{0,60}\b(?:service|employ\w*|workm[ae]n)",
+     "Industrial dispute over termination", 3 * 365, "Industrial Disputes Act, 1947, s. 2A(3)"),
+    (r"\bdecree\b|\bjudgment\b|\border dated\b", "Appeal to the High Court", 90, "Limitation Act, 1963, Art. 116"),
+    (r"\b(?:dispossess\w*|possession of (?:the )?(?:land|property|plot|house))\b",
+     "Suit for possession of immovable property", 12 * 365, "Limitation Act, 1963, Art. 65"),
+]
+# Lowercase patterns over lowercased text, as in issue_extractor
+_COMPILED_RULES = [(re.compile(pattern, re.DOTALL), *rest) for pattern, *rest in _LIMITATION_RULES]
+
+# Merge a risk assessment into /case/analyze responses (computed alongside the LLM call)
+RISK_ASSESSMENT_ENABLED = os.getenv("RISK_ASSESSMENT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Within this many days a deadline is urgent
+URGENT_DAYS = 30
+# A trigger date must be mentioned within this many characters of a rule match
+_NEAR_CHARS = 300
+_CONTEXT_CHARS = 80
+MAX_EVIDENCE_GAPS = 8
+
+# Severities, in the vocabulary of the weaknesses section
+HIGH, MEDIUM, LOW = "High", "Medium", "Low"
+
+
+def _snippet(text: str, start: int, end: int) -> str:
+    return " ".join(text[max(0, start - _CONTEXT_CHARS):end + _CONTEXT_CHARS].split())
+
+
+def detect_deadlines(case_text: str, today: Optional[date] = None, dates: Optional[List[dict]] = None) -> List[dict]:
+    """
+    Limitation periods and statutory deadlines the facts suggest, counted
+    from the dates in the text, soonest first. Expired deadlines are kept:
+    they are the biggest risk of all.
+    """
+    today = today or date.today()
+    lowered = case_text.lower()
+    if dates is None:
+        dates = extract_dates(case_text)
+    if not dates:
+        return []
+    # Offsets of each date, to find those mentioned near a rule's match
+    positioned, cursor = [], 0
+    for entry in dates:
+        at = case_text.find(entry["text"], cursor)
+        positioned.append((at if at >= 0 else cursor, date.fromisoformat(entry["date"]), entry["text"]))
+        cursor = max(cursor, at + 1)
+    latest = max(positioned, key=lambda item: item[1])
+
+    deadlines = []
+    for pattern, label, days, source in _COMPILED_RULES:
+        match = None
+        for match in pattern.finditer(lowered):
+            pass
+        if match is None:
+            continue
+        distance, nearest = min((abs(item[0] - match.end()), item) for item in positioned)
+        _, trigger, trigger_text = nearest if distance <= _NEAR_CHARS else latest
+        deadline = trigger + timedelta(days=days)
+        remaining = (deadline - today).days
+        if remaining < 0:
+            status, severity = "expired", HIGH
+        elif remaining <= URGENT_DAYS:
+            status, severity = "urgent", HIGH
+        elif remaining <= 4 * URGENT_DAYS:
+            status, severity = "upcoming", MEDIUM
+        else:
+            status, severity = "open", LOW
+        deadlines.append({
+            "deadline": label,
+            "source": source,
+            "trigger_date": trigger.isoformat(),
+            "trigger_text": trigger_text,
+            "due_date": deadline.isoformat(),
+            "days_remaining": remaining,
+            "status": status,
+            "severity": severity,
+        })
+    deadlines.sort(key=lambda d: d["days_remaining"])
+    return deadlines
+
+
+def assess_risk(case_text: str, today: Optional[date] = None) -> dict:
+    """
+    CPU-only risk indicators for a case, in milliseconds and without any
+    LLM call: limitation deadlines, missing-evidence cues and the tone of
+    the narrative, combined into a 0-1 risk score and a High/Medium/Low level.
+    """
+    hits = list(lexicon_hits(case_text))
+    sentiment = score_hits(hits, len(case_text.split()))
+    deadlines = detect_deadlines(case_text, today)
+
+    gaps, seen = [], set()
+    for hit in hits:
+        if hit.category == EVIDENCE_GAP and hit.phrase not in seen and len(gaps) < MAX_EVIDENCE_GAPS:
+            seen.add(hit.phrase)
+            gaps.append({"cue": hit.phrase, "context": _snippet(case_text, hit.start, hit.end)})
+
+    # Each indicator pushes the score towards 1; none alone can reach it
+    deadline_risk = {"expired": 0.9, "urgent": 0.7, "upcoming": 0.35}.get(deadlines[0]["status"], 0.0) if deadlines else 0.0
+    gap_risk = 1 - 0.7 ** len(gaps)
+    score = 1 - (1 - deadline_risk) * (1 - 0.6 * gap_risk) * (1 - 0.5 * sentiment["adverse_score"])
+    score *= 1 - 0.3 * sentiment["favourable_score"]
+    level = HIGH if score >= 0.6 else MEDIUM if score >= 0.3 else LOW
+
+    return {
+        "risk_level": level,
+        "risk_score": round(score, 3),
+        "deadlines": deadlines,
+        "evidence_gaps": gaps,
+        "sentiment": sentiment,
+    }
@@ -0,0 +1,194 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, NamedTuple
+
+# Lexicon categories
+ADVERSE = "adverse"            # admissions and weaknesses in the client's own account
+FAVOURABLE = "favourable"      # corroboration the other side will have to answer
+EVIDENCE_GAP = "evidence_gap"  # proof the client does not have (also counts as adverse)
+HEDGING = "hedging"            # uncertainty in the narrative itself
+
+# phrase -> (category, weight). Phrases are lowercase and matched on word
+# boundaries; a longer phrase wins over a shorter one it contains, so
+# "no written agreement" is a gap, not corroboration.
+LEXICON: Dict[str, tuple] = {
+    # Adverse
+    "admitted": (ADVERSE, 1.5),
+    "admits": (ADVERSE, 1.5),
+    "confessed": (ADVERSE, 2.0),
+    "apologised": (ADVERSE, 1.0),
+    "apologized": (ADVERSE, 1.0),
+    "contradict": (ADVERSE, 1.5),
+    "contradicts": (ADVERSE, 1.5),
+    "contradictory": (ADVERSE, 1.5),
+    "inconsistent": (ADVERSE, 1.5),
+    "turned hostile": (ADVERSE, 2.0),
+    "hostile witness": (ADVERSE, 2.0),
+    "retracted": (ADVERSE, 1.5),
+    "withdrew the complaint": (ADVERSE, 1.5),
+    "compromise": (ADVERSE, 0.5),
+    "delay": (ADVERSE, 1.0),
+    "delayed": (ADVERSE, 1.0),
+    "belated": (ADVERSE, 1.0),
+    "time-barred": (ADVERSE, 2.5),
+    "time barred": (ADVERSE, 2.5),
+    "barred by limitation": (ADVERSE, 2.5),
+    "dismissed": (ADVERSE, 1.0),
+    "ex parte": (ADVERSE, 1.0),
+    "counter-claim": (ADVERSE, 1.0),
+    "counter complaint": (ADVERSE, 1.0),
+    "cross-fir": (ADVERSE, 1.0),
+    "purely civil": (ADVERSE, 1.0),
+    "signed blank": (ADVERSE, 1.5),
+    "under pressure": (ADVERSE, 0.5),
+    "did not object": (ADVERSE, 1.0),
+    "failed to appear": (ADVERSE, 1.0),
+    "did not reply": (ADVERSE, 0.5),
+    # Evidence gaps
+    "orally": (EVIDENCE_GAP, 1.5),
+    "oral agreement": (EVIDENCE_GAP, 2.0),
+    "verbal agreement": (EVIDENCE_GAP, 2.0),
+    "verbally": (EVIDENCE_GAP, 1.5),
+    "no written agreement": (EVIDENCE_GAP, 2.5),
+    "no written contract": (EVIDENCE_GAP, 2.5),
+    "without any written": (EVIDENCE_GAP, 2.5),
+    "nothing in writing": (EVIDENCE_GAP, 2.5),
+    "no receipt": (EVIDENCE_GAP, 2.0),
+    "without a receipt": (EVIDENCE_GAP, 2.0),
+    "without any receipt": (EVIDENCE_GAP, 2.0),
+    "paid in cash": (EVIDENCE_GAP, 1.5),
+    "in cash": (EVIDENCE_GAP, 1.0),
+    "no witness": (EVIDENCE_GAP, 2.0),
+    "no witnesses": (EVIDENCE_GAP, 2.0),
+    "no eyewitness": (EVIDENCE_GAP, 2.0),
+    "no independent witness": (EVIDENCE_GAP, 2.0),
+    "no medical": (EVIDENCE_GAP, 2.0),
+    "no fir": (EVIDENCE_GAP, 1.5),
+    "not registered": (EVIDENCE_GAP, 1.5),
+    "unregistered": (EVIDENCE_GAP, 1.5),
+    "unstamped": (EVIDENCE_GAP, 1.5),
+    "not stamped": (EVIDENCE_GAP, 1.5),
+    "no documents": (EVIDENCE_GAP, 2.0),
+    "no proof": (EVIDENCE_GAP, 2.0),
+    "no record": (EVIDENCE_GAP, 1.5),
+    "lost the": (EVIDENCE_GAP, 1.0),
+    "misplaced": (EVIDENCE_GAP, 1.5),
+    "could not produce": (EVIDENCE_GAP, 2.0),
+    "unable to produce": (EVIDENCE_GAP, 2.0),
+    "photocopy": (EVIDENCE_GAP, 1.0),
+    "deleted": (EVIDENCE_GAP, 1.0),
+    # Favourable
+    "bank transfer": (FAVOURABLE, 1.5),
+    "bank statement": (FAVOURABLE, 1.5),
+    "receipt": (FAVOURABLE, 1.0),
+    "receipts": (FAVOURABLE, 1.0),
+    "written agreement": (FAVOURABLE, 2.0),
+    "registered": (FAVOURABLE, 1.0),
+    "registered sale deed": (FAVOURABLE, 2.0),
+    "eyewitness": (FAVOURABLE, 1.5),
+    "eyewitnesses": (FAVOURABLE, 1.5),
+    "independent witness": (FAVOURABLE, 1.5),
+    "cctv": (FAVOURABLE, 2.0),
+    "footage": (FAVOURABLE, 1.0),
+    "medical report": (FAVOURABLE, 1.5),
+    "medico-legal": (FAVOURABLE, 1.5),
+    "post-mortem": (FAVOURABLE, 1.0),
+    "exhibit": (FAVOURABLE, 1.0),
+    "seizure memo": (FAVOURABLE, 1.0),
+    "whatsapp messages": (FAVOURABLE, 1.0),
+    "emails": (FAVOURABLE, 1.0),
+    "call records": (FAVOURABLE, 1.0),
+    "legal notice": (FAVOURABLE, 0.5),
+    "acknowledged": (FAVOURABLE, 1.0),
+    "undertaking": (FAVOURABLE, 1.0),
+    "promissory note": (FAVOURABLE, 1.5),
+    # Hedging
+    "allegedly": (HEDGING, 1.0),
+    "reportedly": (HEDGING, 1.0),
+    "perhaps": (HEDGING, 1.0),
+    "probably": (HEDGING, 1.0),
+    "maybe": (HEDGING, 1.0),
+    "not sure": (HEDGING, 1.0),
+    "does not remember": (HEDGING, 1.0),
+    "do not remember": (HEDGING, 1.0),
+    "approximately": (HEDGING, 0.5),
+    "around": (HEDGING, 0.25),
+    "i think": (HEDGING, 1.0),
+    "i believe": (HEDGING, 1.0),
+}
+
+# Every phrase in one alternation, longest first so the longest match wins,
+# run once over lowercased text: a single scan instead of one per phrase
+_LEXICON_RE = re.compile(
+    r"(?<![\w-])(?:" + "|".join(re.escape(p) for p in sorted(LEXICON, key=len, reverse=True)) + r")(?![\w-])"
+)
+
+# Weight per 1,000 words at which a score reaches ~0.63; texts shorter
+# than _MIN_WORDS count as that long, so one phrase cannot saturate a note
+_SCORE_SCALE = 20.0
+_MIN_WORDS = 250
+# Net tone beyond which the narrative is labelled adverse or favourable
+_TONE_MARGIN = 0.15
+MAX_TERMS = 8
+
+
+class LexiconHit(NamedTuple):
+    phrase: str
+    category: str
+    weight: float
+    start: int
+    end: int
+
+
+def lexicon_hits(case_text: str) -> Iterator[LexiconHit]:
+    """Lexicon phrases in the text, in order, with their character spans"""
+    for match in _LEXICON_RE.finditer(case_text.lower()):
+        phrase = match.group(0)
+        category, weight = LEXICON[phrase]
+        yield LexiconHit(phrase, category, weight, match.start(), match.end())
+
+
+def _top_terms(counts: Counter) -> List[str]:
+    return [phrase for phrase, _ in counts.most_common(MAX_TERMS)]
+
+
+def score_hits(hits: List[LexiconHit], word_count: int) -> dict:
+    """
+    Tone of a narrative from its lexicon hits (see analyze_sentiment), so
+    callers that already matched the lexicon do not scan the text twice
+    """
+    weights = Counter()
+    terms = {ADVERSE: Counter(), FAVOURABLE: Counter(), HEDGING: Counter()}
+    for hit in hits:
+        category = ADVERSE if hit.category == EVIDENCE_GAP else hit.category
+        weights[category] += hit.weight
+        terms[category][hit.phrase] += 1
+
+    per_thousand = 1000 / max(word_count, _MIN_WORDS)
+    adverse = 1 - math.exp(-weights[ADVERSE] * per_thousand / _SCORE_SCALE)
+    favourable = 1 - math.exp(-weights[FAVOURABLE] * per_thousand / _SCORE_SCALE)
+    tone = favourable - adverse
+    if tone <= -_TONE_MARGIN:
+        label = "adverse"
+    elif tone >= _TONE_MARGIN:
+        label = "favourable"
+    else:
+        label = "neutral"
+    return {
+        "label": label,
+        "adverse_score": round(adverse, 3),
+        "favourable_score": round(favourable, 3),
+        "hedging": sum(terms[HEDGING].values()),
+        "adverse_terms": _top_terms(terms[ADVERSE]),
+        "favourable_terms": _top_terms(terms[FAVOURABLE]),
+    }
+
+
+def analyze_sentiment(case_text: str) -> dict:
+    """
+    How the client's own narrative reads to the other side: adverse
+    language (admissions, delay, missing proof) against corroboration,
+    each scored 0-1 by weight per 1,000 words, plus a tone label.
+    """
+    return score_hits(list(lexicon_hits(case_text)), len(case_text.split()))
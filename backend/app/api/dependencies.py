@@ -0,0 +1,85 @@
+import math
+import os
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.auth.jwt_handler import verify_token
+from app.auth.quotas import ANALYSIS_QUOTAS, login_quotas
+
+# Without a token requests are still served (anonymous limits in app/auth/quotas.py)
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() in ("1", "true", "yes")
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def _too_many(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+def _claims(credentials: Optional[HTTPAuthorizationCredentials]) -> Optional[dict]:
+    if credentials is None:
+        return None
+    try:
+        return verify_token(credentials.credentials)
+    except ValueError as e:
+        raise _unauthorized(str(e))
+
+
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> dict:
+    """Claims (sub = user id, role) of the caller's access token; 401 without one"""
+    claims = _claims(credentials)
+    if claims is None:
+        raise _unauthorized("Not authenticated")
+    return claims
+
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Optional[dict]:
+    """Like get_current_user, but anonymous callers get None unless AUTH_REQUIRED is set"""
+    if credentials is None and AUTH_REQUIRED:
+        raise _unauthorized("Not authenticated")
+    return _claims(credentials)
+
+
+def client_of(request: Request, user: Optional[dict]) -> dict:
+    """The caller as a quota client: {"kind": "user" or "anon", "client": user id or IP}"""
+    if user is not None:
+        return {"kind": "user", "client": user["sub"]}
+    # The peer address; run uvicorn with --proxy-headers behind a trusted proxy
+    return {"kind": "anon", "client": request.client.host if request.client else "unknown"}
+
+
+async def analysis_quota(request: Request, user: Optional[dict] = Depends(get_optional_user)):
+    """
+    Admit one analysis for the caller, or 429 before any LLM work is
+    scheduled: one request from their rate limit and one of their
+    concurrent-analysis slots, held until the response has been sent.
+    Yields the caller's claims (None if anonymous).
+    """
+    owner = client_of(request, user)
+    client, quotas = owner["client"], ANALYSIS_QUOTAS[owner["kind"]]
+    retry_after = quotas.check_rate(client)
+    if retry_after:
+        raise _too_many("Rate limit exceeded, retry later", retry_after)
+    if not quotas.start_analysis(client):
+        raise _too_many("Too many analyses in progress, wait for one to finish", 1)
+    try:
+        retry_after = await quotas.check_shared_rate(client)
+        if retry_after:
+            raise _too_many("Rate limit exceeded, retry later", retry_after)
+        yield user
+    finally:
+        quotas.finish_analysis(client)
+
+
+async def login_rate_limit(request: Request) -> None:
+    """Login attempts per client IP"""
+    client = request.client.host if request.client else "unknown"
+    retry_after = login_quotas.check_rate(client) or await login_quotas.check_shared_rate(client)
+    if retry_after:
+        raise _too_many("Too many login attempts, retry later", retry_after)
@@ -1,64 +1,41 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List
-from app.core.analyzer import analyze_case_with_ai
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.api.schemas import (
+    AnalyzeRequest,
+    AnalyzeResponse,
+    BatchAnalyzeRequest,
+    BatchJobResponse,
+    CaseDetail,
+    CaseListResponse,
+    CaseSummary,
+    ClassifyResponse,
+    JobStatusResponse,
+    RiskAssessment,
+)
+from app.analysis.risk_detector import RISK_ASSESSMENT_ENABLED, assess_risk
+from app.api.dependencies import analysis_quota, client_of, get_optional_user
+from app.core.analyzer import analyze_case_with_ai_async, stream_case_analysis
+from app.core.case_classifier import classify_case
+from app.core.semantic_cache import semantic_cache
+from app.jobs.queue import job_queue, MAX_BATCH_SIZE
+from app.database import case_repository
+from app.reports.report_generator import MEDIA_TYPES, report_generator
+from app.utils.range_response import RangeFileResponse
+from app.utils.metrics import stage
+from typing import Optional
+from bson import ObjectId
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-
-
-class AnalyzeRequest(BaseModel):
-    case_text: str
-
-
-class LegalIssue(BaseModel):
-    issue: str
-    description: str
-    importance: str
-
-
-class ApplicableLaw(BaseModel):
-    law: str
-    description: str
-    relevance: str
-
-
-class CaseStrength(BaseModel):
-    point: str
-    explanation: str
-
-
-class CaseWeakness(BaseModel):
-    point: str
-    explanation: str
-    severity: str
-
-
-class RecommendedAction(BaseModel):
-    action: str
-    priority: str
-    rationale: str
-
-
-class AnalyzeResponse(BaseModel):
-    case_type: str
-    case_summary: str
-    key_facts: List[str]
-    legal_issues: List[LegalIssue]
-    applicable_laws: List[ApplicableLaw]
-    strengths: List[CaseStrength]
-    weaknesses: List[CaseWeakness]
-    recommended_actions: List[RecommendedAction]
-    evidence_needed: List[str]
-    precedents: List[str]
-    estimated_outcome: str
-    timeline_considerations: str
+# Every route needs a token when AUTH_REQUIRED is set
+router = APIRouter(dependencies=[Depends(get_optional_user)])
 
 
 @router.post("/case/analyze", response_model=AnalyzeResponse)
-async def analyze_case(data: AnalyzeRequest):
+async def analyze_case(data: AnalyzeRequest, user: Optional[dict] = Depends(analysis_quota)):
     """
     Analyze a legal case using AI (Ollama)
     Returns 503 if AI service is unavailable
@@ -66,9 +43,15 @@ async def analyze_case(data: AnalyzeRequest):
     if not data.case_text.strip():
         raise HTTPException(status_code=400, detail="Case text cannot be empty")
 
+    risk_task = _start_risk_assessment(data.case_text)
     try:
-        result = analyze_case_with_ai(data.case_text)
-        return result
+        result = await analyze_case_with_ai_async(data.case_text, owner=user["sub"] if user else None)
+        result["case_id"] = await _persist_analysis(data.case_text, result, user)
+        risk = await _risk_assessment(risk_task)
+        # Validate once here (timed) and skip FastAPI's second pass over response_model
+        with stage("validation"):
+            payload = AnalyzeResponse(**{**result, "risk_assessment": risk}).model_dump(mode="json")
+        return JSONResponse(payload)
         
     except RuntimeError as e:
         # AI service unavailable or failed
@@ -91,3 +74,279 @@ async def analyze_case(data: AnalyzeRequest):
             status_code=500,
             detail="An unexpected error occurred during analysis."
         )
+
+
+def _timed_risk_assessment(case_text: str) -> dict:
+    with stage("risk_assessment"):
+        return assess_risk(case_text)
+
+
+def _start_risk_assessment(case_text: str) -> Optional[asyncio.Task]:
+    """
+    Score the case locally in a thread while the LLM call runs. It is not
+    cached with the analysis: deadlines count down from today.
+    """
+    if not RISK_ASSESSMENT_ENABLED:
+        return None
+    return asyncio.create_task(asyncio.to_thread(_timed_risk_assessment, case_text))
+
+
+async def _risk_assessment(task: Optional[asyncio.Task]) -> Optional[dict]:
+    """The finished risk assessment; never fails the request"""
+    if task is None:
+        return None
+    try:
+        return await task
+    except Exception as e:
+        logger.error(f"Risk assessment failed: {e}")
+        return None
+
+
+async def _persist_analysis(case_text: str, result: dict, user: Optional[dict] = None) -> Optional[str]:
+    """Store the analysis in case history; never fails the request"""
+    if not case_repository.persistence_enabled():
+        return None
+    owner_id = ObjectId(user["sub"]) if user and ObjectId.is_valid(user["sub"]) else None
+    try:
+        return await case_repository.save_case(
+            case_text, result, owner_id=owner_id, **semantic_cache.embedding_fields(case_text)
+        )
+    except Exception as e:
+        logger.error(f"Failed to save case history: {e}")
+        return None
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/case/analyze/stream")
+async def analyze_case_stream(data: AnalyzeRequest, user: Optional[dict] = Depends(analysis_quota)):
+    """
+    Analyze a legal case and stream the result as server-sent events.
+
+    Emits a `section` event for each top-level section as soon as the model
+    completes it, then a `result` event with the full AnalyzeResponse, or
+    an `error` event if analysis fails.
+    """
+    if not data.case_text.strip():
+        raise HTTPException(status_code=400, detail="Case text cannot be empty")
+
+    async def event_stream():
+        risk_task = _start_risk_assessment(data.case_text)
+        try:
+            async for event, payload in stream_case_analysis(data.case_text):
+                if event == "result":
+                    payload["case_id"] = await _persist_analysis(data.case_text, payload, user)
+                    risk = await _risk_assessment(risk_task)
+                    with stage("validation"):
+                        payload = AnalyzeResponse(**{**payload, "risk_assessment": risk}).model_dump()
+                yield _sse_event(event, payload)
+        except RuntimeError as e:
+            yield _sse_event("error", {"detail": f"AI analysis failed: {str(e)}"})
+        except Exception as e:
+            logger.error(f"Unexpected streaming error: {e}")
+            yield _sse_event("error", {"detail": "An unexpected error occurred during analysis."})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/case/classify", response_model=ClassifyResponse)
+def classify(data: AnalyzeRequest):
+    """
+    Fast local triage without an LLM call: case type, parties, dates,
+    amounts, relevant statute sections and candidate issues
+    """
+    if not data.case_text.strip():
+        raise HTTPException(status_code=400, detail="Case text cannot be empty")
+    return classify_case(data.case_text)
+
+
+@router.post("/case/risk", response_model=RiskAssessment)
+def case_risk(data: AnalyzeRequest):
+    """
+    Local risk triage without an LLM call, usable when the AI service is
+    down: limitation deadlines, missing-evidence cues and adverse language
+    """
+    if not data.case_text.strip():
+        raise HTTPException(status_code=400, detail="Case text cannot be empty")
+    return assess_risk(data.case_text)
+
+
+@router.post("/case/analyze/batch", response_model=BatchJobResponse, status_code=202)
+async def analyze_case_batch(data: BatchAnalyzeRequest, request: Request,
+                             user: Optional[dict] = Depends(get_optional_user)):
+    """
+    Queue many cases for background analysis.
+    Returns a job id to poll with GET /jobs/{job_id}.
+    """
+    if not data.cases:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one case")
+    if len(data.cases) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch cannot contain more than {MAX_BATCH_SIZE} cases")
+    if any(not case.case_text.strip() for case in data.cases):
+        raise HTTPException(status_code=400, detail="Case text cannot be empty")
+    # Each case is charged to the caller's quotas as it runs, like a /case/analyze
+    job = await job_queue.submit(
+        [case.model_dump() for case in data.cases], priority=data.priority, owner=client_of(request, user)
+    )
+    return BatchJobResponse(job_id=job["_id"], status=job["status"], total=job["total"])
+
+
+async def _get_own_job(job_id: str, request: Request, user: Optional[dict]) -> dict:
+    """The job if the caller submitted it (or is an admin); others get a 404"""
+    job = await job_queue.get(job_id)
+    if job is None or (not _is_admin(user) and job.get("owner") != client_of(request, user)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, request: Request, user: Optional[dict] = Depends(get_optional_user)):
+    """
+    Progress and per-case results of a batch job
+    """
+    job = await _get_own_job(job_id, request, user)
+    return JobStatusResponse(job_id=job["_id"], **job)
+
+
+@router.delete("/jobs/{job_id}", response_model=BatchJobResponse)
+async def cancel_job(job_id: str, request: Request, user: Optional[dict] = Depends(get_optional_user)):
+    """
+    Cancel the queued and running cases of a batch job
+    """
+    job = await _get_own_job(job_id, request, user)
+    if not await job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is already {job['status']}")
+    job = await job_queue.get(job_id)
+    return BatchJobResponse(job_id=job["_id"], status=job["status"], total=job["total"])
+
+
+def _require_case_history() -> None:
+    if not case_repository.persistence_enabled():
+        raise HTTPException(status_code=503, detail="Case history requires MongoDB (MONGODB_URI is not set)")
+
+
+def _case_summary(doc: dict) -> CaseSummary:
+    doc = dict(doc)
+    doc["id"] = str(doc.pop("_id"))
+    if doc.get("owner_id") is not None:
+        doc["owner_id"] = str(doc["owner_id"])
+    return CaseSummary(**doc)
+
+
+def _is_admin(user: Optional[dict]) -> bool:
+    return user is not None and user.get("role") == "admin"
+
+
+def _can_read_case(user: Optional[dict], doc: dict) -> bool:
+    """Signed-in users see their own cases, anonymous callers the unowned ones"""
+    if _is_admin(user):
+        return True
+    owner_id = doc.get("owner_id")
+    if user is None:
+        return owner_id is None
+    return owner_id is not None and str(owner_id) == user["sub"]
+
+
+@router.get("/cases", response_model=CaseListResponse)
+async def list_cases(
+    cursor: Optional[str] = None,
+    limit: int = Query(case_repository.DEFAULT_PAGE_SIZE, ge=1, le=case_repository.MAX_PAGE_SIZE),
+    case_type: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Full-text search over summaries and issues"),
+    owner_id: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of list fields"),
+    user: Optional[dict] = Depends(get_optional_user),
+):
+    """
+    Case history, newest first. Pass `next_cursor` back as `cursor` for the
+    next page. Lists never include case text or the full analysis.
+    Signed-in users see only their own cases, anonymous callers only the
+    cases analyzed without signing in.
+    """
+    _require_case_history()
+    if owner_id is not None and not ObjectId.is_valid(owner_id):
+        raise HTTPException(status_code=400, detail="Invalid owner_id")
+    if not _is_admin(user):
+        if owner_id is not None and (user is None or owner_id != user["sub"]):
+            raise HTTPException(status_code=403, detail="Cannot list another user's cases")
+        owner_id = user["sub"] if user is not None else None
+    field_list = [f.strip() for f in fields.split(",")] if fields else None
+
+    try:
+        docs, next_cursor = await case_repository.list_cases(
+            owner_id=ObjectId(owner_id) if owner_id else None,
+            case_type=case_type,
+            search=q,
+            cursor=cursor,
+            limit=limit,
+            fields=field_list,
+            unowned=user is None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CaseListResponse(items=[_case_summary(doc) for doc in docs], next_cursor=next_cursor)
+
+
+@router.get("/cases/{case_id}", response_model=CaseDetail)
+async def get_case(case_id: str, user: Optional[dict] = Depends(get_optional_user)):
+    """
+    A stored case with its full analysis
+    """
+    _require_case_history()
+    doc = await case_repository.get_case(case_id)
+    # Someone else's case is reported as missing, not as forbidden
+    if doc is None or not _can_read_case(user, doc):
+        raise HTTPException(status_code=404, detail="Case not found")
+    return CaseDetail(
+        id=str(doc["_id"]),
+        title=doc.get("title"),
+        case_text=doc["case_text"],
+        case_type=doc.get("case_type"),
+        created_at=doc["created_at"],
+        analysis=doc["analysis"],
+    )
+
+
+@router.get("/cases/{case_id}/report")
+async def download_case_report(
+    case_id: str,
+    format: str = Query("pdf", pattern="^(pdf|docx)$"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
+    user: Optional[dict] = Depends(get_optional_user),
+):
+    """
+    The case brief as a PDF or DOCX download. Rendered once per analysis
+    and served from disk afterwards; supports Range requests.
+    """
+    _require_case_history()
+    if not ObjectId.is_valid(case_id):
+        raise HTTPException(status_code=404, detail="Case not found")
+    path = report_generator.cached(case_id, format)
+    if path is not None:
+        # The file is on disk, but whose case it is lives in the database
+        doc = await case_repository.get_case(case_id, fields=["owner_id"])
+        if doc is None or not _can_read_case(user, doc):
+            raise HTTPException(status_code=404, detail="Case not found")
+    else:
+        doc = await case_repository.get_case(case_id)
+        if doc is None or not doc.get("analysis") or not _can_read_case(user, doc):
+            raise HTTPException(status_code=404, detail="Case not found")
+        meta = {"title": doc.get("title"), "created_at": doc.get("created_at")}
+        try:
+            with stage("report_render"):
+                path = await report_generator.render(case_id, format, doc["analysis"], meta)
+        except RuntimeError as e:
+            logger.error(f"Report generation failed: {e}")
+            raise HTTPException(status_code=503, detail=str(e))
+    return RangeFileResponse(
+        path, MEDIA_TYPES[format], filename=f"case-{case_id}.{format}",
+        range_header=range_header, if_range=if_range,
+    )
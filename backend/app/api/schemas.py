@@ -0,0 +1,204 @@
+from pydantic import BaseModel, EmailStr, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class AnalyzeRequest(BaseModel):
+    case_text: str
+
+
+class LegalIssue(BaseModel):
+    issue: str
+    description: str
+    importance: str
+
+
+class ApplicableLaw(BaseModel):
+    law: str
+    description: str
+    relevance: str
+    # True when every cited section exists in the offline statute index
+    verified: Optional[bool] = None
+
+
+class CaseStrength(BaseModel):
+    point: str
+    explanation: str
+
+
+class CaseWeakness(BaseModel):
+    point: str
+    explanation: str
+    severity: str
+
+
+class RecommendedAction(BaseModel):
+    action: str
+    priority: str
+    rationale: str
+
+
+class RiskDeadline(BaseModel):
+    deadline: str
+    source: str
+    trigger_date: str
+    trigger_text: str
+    due_date: str
+    days_remaining: int
+    status: str
+    severity: str
+
+
+class EvidenceGap(BaseModel):
+    cue: str
+    context: str
+
+
+class SentimentScore(BaseModel):
+    label: str
+    adverse_score: float
+    favourable_score: float
+    hedging: int
+    adverse_terms: List[str]
+    favourable_terms: List[str]
+
+
+class RiskAssessment(BaseModel):
+    risk_level: str
+    risk_score: float
+    deadlines: List[RiskDeadline]
+    evidence_gaps: List[EvidenceGap]
+    sentiment: SentimentScore
+
+
+class AnalyzeResponse(BaseModel):
+    case_type: str
+    case_summary: str
+    key_facts: List[str]
+    legal_issues: List[LegalIssue]
+    applicable_laws: List[ApplicableLaw]
+    strengths: List[CaseStrength]
+    weaknesses: List[CaseWeakness]
+    recommended_actions: List[RecommendedAction]
+    evidence_needed: List[str]
+    precedents: List[str]
+    estimated_outcome: str
+    timeline_considerations: str
+    case_id: Optional[str] = None
+    # Local indicators computed alongside the LLM call (see app/analysis)
+    risk_assessment: Optional[RiskAssessment] = None
+
+
+class Party(BaseModel):
+    role: str
+    name: str
+
+
+class CaseDate(BaseModel):
+    date: str
+    text: str
+    context: str
+
+
+class CaseAmount(BaseModel):
+    amount: float
+    text: str
+
+
+class ClassifyResponse(BaseModel):
+    case_type: str
+    confidence: float
+    scores: Dict[str, float]
+    parties: List[Party]
+    dates: List[CaseDate]
+    amounts: List[CaseAmount]
+    sections: List[str]
+    candidate_issues: List[LegalIssue]
+
+
+class BatchCase(BaseModel):
+    case_text: str
+    title: Optional[str] = None
+
+
+class BatchAnalyzeRequest(BaseModel):
+    cases: List[BatchCase]
+    priority: int = Field(0, ge=-10, le=10, description="Higher runs first")
+
+
+class BatchJobResponse(BaseModel):
+    job_id: str
+    status: str
+    total: int
+
+
+class JobItemStatus(BaseModel):
+    index: int
+    title: Optional[str] = None
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    result: Optional[dict] = None
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    priority: int
+    total: int
+    completed: int
+    failed: int
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    items: List[JobItemStatus]
+
+
+class CaseSummary(BaseModel):
+    id: str
+    title: Optional[str] = None
+    case_type: Optional[str] = None
+    case_summary: Optional[str] = None
+    issues: Optional[List[str]] = None
+    owner_id: Optional[str] = None
+    created_at: datetime
+
+
+class CaseListResponse(BaseModel):
+    items: List[CaseSummary]
+    next_cursor: Optional[str] = None
+
+
+class CaseDetail(BaseModel):
+    id: str
+    title: Optional[str] = None
+    case_text: str
+    case_type: Optional[str] = None
+    created_at: datetime
+    analysis: AnalyzeResponse
+
+
+class SignupRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    email: EmailStr
+    # bcrypt only uses the first 72 bytes
+    password: str = Field(..., min_length=8, max_length=72)
+
+
+class LoginRequest(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class UserResponse(BaseModel):
+    id: str
+    name: str
+    email: str
+    role: str
+    created_at: datetime
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.dependencies import get_current_user, login_rate_limit
+from app.api.schemas import LoginRequest, SignupRequest, TokenResponse, UserResponse
+from app.auth.jwt_handler import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token
+from app.auth.passwords import hash_password, verify_password
+from app.database import user_repository
+from app.database.case_repository import persistence_enabled
+from app.database.models import UserModel
+
+router = APIRouter()
+
+
+def _require_user_store() -> None:
+    if not persistence_enabled():
+        raise HTTPException(status_code=503, detail="Accounts require MongoDB (MONGODB_URI is not set)")
+
+
+def _user_response(user: UserModel) -> UserResponse:
+    return UserResponse(id=str(user.id), name=user.name, email=user.email, role=user.role, created_at=user.created_at)
+
+
+@router.post("/signup", response_model=UserResponse, status_code=201)
+async def signup(data: SignupRequest):
+    """
+    Create an account. Sign in with /auth/login to get an access token.
+    """
+    _require_user_store()
+    user = UserModel(
+        name=data.name.strip(),
+        email=data.email.lower(),
+        hashed_password=await hash_password(data.password),
+        role="user",
+    )
+    if await user_repository.create_user(user) is None:
+        raise HTTPException(status_code=409, detail="Email is already registered")
+    return _user_response(user)
+
+
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(login_rate_limit)])
+async def login(data: LoginRequest):
+    """
+    Exchange email and password for a bearer access token
+    """
+    _require_user_store()
+    user = await user_repository.get_user_by_email(data.email)
+    if not await verify_password(data.password, user.hashed_password if user else None):
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    return TokenResponse(
+        access_token=create_access_token(str(user.id), user.role),
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
+@router.get("/me", response_model=UserResponse)
+async def me(claims: dict = Depends(get_current_user)):
+    """
+    The signed-in user
+    """
+    _require_user_store()
+    user = await user_repository.get_user(claims["sub"])
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return _user_response(user)
@@ -0,0 +1,62 @@
+import logging
+import os
+import secrets
+import time
+from functools import lru_cache
+from typing import Optional
+
+from jose import JWTError, jwt
+
+logger = logging.getLogger(__name__)
+
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# Verified tokens kept per process; a hit skips signature checking entirely
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+if not JWT_SECRET_KEY:
+    # Fine for one process in development; workers would reject each other's tokens
+    JWT_SECRET_KEY = secrets.token_urlsafe(32)
+    logger.warning("⚠️ JWT_SECRET_KEY is not set: using a random key, tokens will not survive a restart")
+
+
+def create_access_token(user_id: str, role: str, expires_minutes: Optional[int] = None) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": user_id,
+        "role": role,
+        "iat": now,
+        "exp": now + 60 * (expires_minutes or ACCESS_TOKEN_EXPIRE_MINUTES),
+    }
+    return jwt.encode(claims, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _decode(token: str) -> dict:
+    # Invalid tokens raise and are therefore never cached
+    return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+
+
+def verify_token(token: str) -> dict:
+    """
+    Claims of a valid access token. Repeat requests with the same token are
+    answered from an LRU cache of verified tokens; only expiry is rechecked.
+
+    Raises:
+        ValueError: If the token is malformed, forged or expired
+    """
+    try:
+        claims = _decode(token)
+    except JWTError as e:
+        raise ValueError(f"Invalid token: {e}")
+    if claims.get("exp", 0) <= time.time():
+        raise ValueError("Invalid token: Signature has expired.")
+    if not claims.get("sub"):
+        raise ValueError("Invalid token: no subject")
+    return claims
+
+
+def token_cache_stats() -> dict:
+    info = _decode.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -0,0 +1,41 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from passlib.context import CryptContext
+
+# bcrypt cost factor: each increment doubles the time per hash (~0.25s at 12)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so these threads hash in parallel. A pool of its
+# own keeps a burst of logins from filling the default executor that
+# asyncio.to_thread work (risk scoring, index loads) runs on.
+BCRYPT_THREADS = int(os.getenv("BCRYPT_THREADS", str(os.cpu_count() or 1)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+_executor = ThreadPoolExecutor(BCRYPT_THREADS, thread_name_prefix="bcrypt")
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    # Made on first use rather than at import, which would add a hash to startup
+    return pwd_context.hash("not a real password")
+
+
+def _check(password: str, hashed_password: Optional[str]) -> bool:
+    if hashed_password is None:
+        # Unknown email: verify against a dummy hash so the login takes as
+        # long whether or not the account exists
+        pwd_context.verify(password, _dummy_hash())
+        return False
+    return pwd_context.verify(password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: Optional[str]) -> bool:
+    """Check a password off the event loop (None: no such user, always False)"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, _check, password, hashed_password)
@@ -0,0 +1,39 @@
+import os
+from typing import Dict, Optional
+
+from app.config import per_process_limit, shared_state_enabled
+from app.utils.rate_limit import ClientQuotas, MongoRateLimiter
+
+# Deployment-wide limits per signed-in user (0 = unlimited)
+USER_RATE_LIMIT_RPM = float(os.getenv("USER_RATE_LIMIT_RPM", "20"))
+USER_RATE_LIMIT_BURST = float(os.getenv("USER_RATE_LIMIT_BURST", "5"))
+USER_MAX_CONCURRENT_ANALYSES = int(os.getenv("USER_MAX_CONCURRENT_ANALYSES", "2"))
+# The same per anonymous client IP; off by default, since every client
+# behind one proxy or NAT shares an IP (and so a limit)
+ANON_RATE_LIMIT_RPM = float(os.getenv("ANON_RATE_LIMIT_RPM", "0"))
+ANON_RATE_LIMIT_BURST = float(os.getenv("ANON_RATE_LIMIT_BURST", "3"))
+ANON_MAX_CONCURRENT_ANALYSES = int(os.getenv("ANON_MAX_CONCURRENT_ANALYSES", "0"))
+# Login attempts per client IP: each costs a bcrypt hash
+LOGIN_RATE_LIMIT_RPM = float(os.getenv("LOGIN_RATE_LIMIT_RPM", "10"))
+
+
+def _client_quotas(name: str, rate_per_minute: float, burst: float, max_concurrent: int) -> ClientQuotas:
+    if rate_per_minute and shared_state_enabled():
+        # The in-memory bucket turns floods away without a round trip; the
+        # shared window holds the client to the limit across all workers
+        shared = MongoRateLimiter(name, rate_per_minute / 60)
+        return ClientQuotas(rate_per_minute, burst, per_process_limit(max_concurrent), shared)
+    return ClientQuotas(per_process_limit(rate_per_minute), burst, per_process_limit(max_concurrent))
+
+
+user_quotas = _client_quotas("user", USER_RATE_LIMIT_RPM, USER_RATE_LIMIT_BURST, USER_MAX_CONCURRENT_ANALYSES)
+anon_quotas = _client_quotas("anon", ANON_RATE_LIMIT_RPM, ANON_RATE_LIMIT_BURST, ANON_MAX_CONCURRENT_ANALYSES)
+login_quotas = _client_quotas("login", LOGIN_RATE_LIMIT_RPM, LOGIN_RATE_LIMIT_RPM / 2, 0)
+
+# Analysis quotas by client kind, as recorded on batch jobs
+ANALYSIS_QUOTAS: Dict[str, ClientQuotas] = {"user": user_quotas, "anon": anon_quotas}
+
+
+def analysis_quotas(owner: Optional[dict]) -> Optional[ClientQuotas]:
+    """Quotas for a client {"kind", "client"} (None for unknown or no client)"""
+    return ANALYSIS_QUOTAS.get(owner["kind"]) if owner else None
@@ -0,0 +1,44 @@
+"""
+Process-wide settings. Importing this module loads .env, once, before any
+other app module reads its knobs with os.getenv at import time; it is
+imported first by app/__init__.py.
+"""
+import math
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Worker processes serving the app. gunicorn.conf.py sets it from the
+# worker count; set it yourself for `uvicorn --workers N`
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+# Where state that must agree across workers lives (analysis cache,
+# LLM rate limits, batch jobs): "memory" keeps it per process, "mongo"
+# shares it through MongoDB. Defaults to mongo for several workers.
+SHARED_STATE_BACKEND = os.getenv(
+    "SHARED_STATE_BACKEND",
+    "mongo" if WEB_CONCURRENCY > 1 and os.getenv("MONGODB_URI") else "memory",
+).lower()
+# Requests one process works on at once; the rest wait up to
+# REQUEST_QUEUE_TIMEOUT seconds and then get a 503 (0 = unlimited)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "64"))
+REQUEST_QUEUE_TIMEOUT = float(os.getenv("REQUEST_QUEUE_TIMEOUT", "30"))
+
+if SHARED_STATE_BACKEND not in ("memory", "mongo"):
+    raise RuntimeError(f"Unknown SHARED_STATE_BACKEND {SHARED_STATE_BACKEND!r}: use memory or mongo")
+if SHARED_STATE_BACKEND == "mongo" and not os.getenv("MONGODB_URI"):
+    raise RuntimeError("SHARED_STATE_BACKEND=mongo needs MONGODB_URI")
+
+
+def shared_state_enabled() -> bool:
+    return SHARED_STATE_BACKEND == "mongo"
+
+
+def per_process_limit(total: float) -> float:
+    """This process's share of a deployment-wide limit (0 = unlimited stays 0)"""
+    if not total:
+        return total
+    if isinstance(total, int):
+        return max(1, math.ceil(total / WEB_CONCURRENCY))
+    return total / WEB_CONCURRENCY
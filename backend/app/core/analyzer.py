@@ -1,84 +1,484 @@
-from app.llm.prompts import case_analysis_prompt
-from app.llm.ollama_client import call_ollama, is_ollama_available, DEFAULT_MODEL
-from app.llm.gemini_client import call_gemini, is_gemini_available
+from app.llm.prompts import (
+    case_analysis_prompt,
+    case_update_prompt,
+    missing_sections_prompt,
+    typed_case_analysis_prompt,
+    PROMPT_VERSION,
+)
+from app.llm.ollama_client import (
+    call_ollama,
+    call_ollama_async,
+    stream_ollama_async,
+    is_ollama_available,
+    is_ollama_available_async,
+    DEFAULT_MODEL,
+    OLLAMA_MAX_CONCURRENCY,
+)
+from app.llm.gemini_client import (
+    call_gemini,
+    call_gemini_async,
+    stream_gemini_async,
+    is_gemini_available,
+    is_gemini_reachable_async,
+    GEMINI_MODEL,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_RATE_LIMIT_RPM,
+)
+from app.llm.json_repair import ITEM_FIELDS, canonical_key, canonical_sections, coerce_items
+from app.llm.json_stream import IncrementalSectionParser
+from app.llm.scheduler import Provider, ProviderScheduler, is_valid_result
+from app.llm.health import HealthMonitor
+from app.llm.token_budget import compact_case_text, estimate_tokens
+from app.core.result_cache import analysis_cache, make_cache_key
+from app.core.chunked_analyzer import analyze_long_case_async, is_long_document
+from app.core.semantic_cache import (
+    semantic_cache,
+    sentence_diff,
+    SemanticMatch,
+    SEMANTIC_CACHE_ENABLED,
+)
+from app.law_mapping.section_mapper import format_sections, map_sections
+from app.law_mapping.reasoning_engine import validate_applicable_laws
+from app.core.case_classifier import case_classifier, CLASSIFIER_MIN_CONFIDENCE
+from app.core.issue_extractor import extract_issues
+from app.config import per_process_limit, shared_state_enabled
+from app.utils.metrics import stage
+from app.utils.rate_limit import MongoRateLimiter
+from contextlib import aclosing
+from typing import AsyncIterator, Optional, Tuple
+import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 
+def _raise_total_failure(errors: list) -> None:
+    all_errors = " | ".join(errors)
+    logger.error(f"❌ Both AI services failed: {all_errors}")
+    raise RuntimeError(f"AI Analysis Service Unavailable. Details: {all_errors}")
+
+
+# Helper to ensure something is a list
+def ensure_list(val):
+    if isinstance(val, list):
+        return val
+    if val is None or val == "Not specified":
+        return []
+    return [str(val)]
+
+
+# Helper to ensure something is a string
+def ensure_str(val, default="Not specified"):
+    if val is None:
+        return default
+    return str(val)
+
+
+# Top-level sections of the case_analysis_prompt schema, in prompt order
+ANALYSIS_SECTIONS = (
+    "case_type",
+    "case_summary",
+    "key_facts",
+    "legal_issues",
+    "applicable_laws",
+    "strengths",
+    "weaknesses",
+    "recommended_actions",
+    "evidence_needed",
+    "precedents",
+    "estimated_outcome",
+    "timeline_considerations",
+)
+
+_LIST_SECTIONS = {"key_facts", "evidence_needed", "precedents"}
+_STR_SECTIONS = {"case_summary", "estimated_outcome", "timeline_considerations"}
+
+
+def _item_text(item) -> str:
+    if isinstance(item, dict):
+        return "; ".join(str(v) for v in item.values() if v not in (None, ""))
+    return str(item)
+
+
+def normalize_section(name: str, value):
+    """Coerce a single top-level section to its AnalyzeResponse type"""
+    if isinstance(value, list) and (name == "case_type" or name in _STR_SECTIONS):
+        value = "; ".join(map(_item_text, value)) or None
+    if name == "case_type":
+        return ensure_str(value, "Unknown")
+    if name in _STR_SECTIONS:
+        return ensure_str(value)
+    if name in _LIST_SECTIONS:
+        return [_item_text(item) for item in ensure_list(value) if item not in (None, "")]
+    if name == "applicable_laws":
+        return validate_applicable_laws(coerce_items(name, value))
+    if name in ITEM_FIELDS:
+        return coerce_items(name, value)
+    return value if value is not None else []
+
+
+def normalize_analysis(ai_result: dict) -> dict:
+    """
+    Coerce a raw model response into the AnalyzeResponse shape
+    """
+    try:
+        # Validate and return
+        with stage("normalization"):
+            ai_result = canonical_sections(ai_result)
+            result = {name: normalize_section(name, ai_result.get(name)) for name in ANALYSIS_SECTIONS}
+        
+        logger.info(f"AI analysis successful: {result['case_type']}")
+        return result
+        
+    except Exception as e:
+        logger.error(f"AI analysis failed: {e}")
+        raise RuntimeError(f"AI analysis failed: {str(e)}")
+
+
+def build_case_prompt(case_text: str) -> Tuple[str, Optional[str]]:
+    """
+    Pre-stage run locally before any LLM call: strip boilerplate from the
+    text, retrieve the relevant statute sections and classify the case. When the classifier is confident, the
+    smaller type-specific prompt is used and the model is not asked for
+    case_type.
+
+    Returns:
+        (prompt, case_type) where case_type is None for the generic prompt
+    """
+    case_text = compact_case_text(case_text)
+    try:
+        sections = map_sections(case_text)
+        prediction = case_classifier.predict(case_text)
+    except Exception as e:
+        logger.warning(f"⚠️ Local pre-stage failed, using the generic prompt: {e}")
+        return case_analysis_prompt(case_text), None
+
+    references = format_sections(sections)
+    if prediction["confidence"] < CLASSIFIER_MIN_CONFIDENCE:
+        return case_analysis_prompt(case_text, references), None
+
+    # Statute-derived issues would repeat the references, so only cue-phrase issues are listed
+    issues = "\n".join(f"- {issue['issue']}" for issue in extract_issues(case_text))
+    prompt = typed_case_analysis_prompt(case_text, prediction["case_type"], references, issues)
+    return prompt, prediction["case_type"]
+
+
+async def _call_default_ollama(prompt: str) -> dict:
+    return await call_ollama_async(prompt, model=DEFAULT_MODEL)
+
+
+# Cached availability, refreshed in the background while the app runs
+health_monitor = HealthMonitor({
+    "Gemini": is_gemini_reachable_async,
+    "Ollama": is_ollama_available_async,
+})
+
+provider_scheduler = ProviderScheduler([
+    Provider(
+        "Gemini",
+        call_gemini_async,
+        lambda: health_monitor.is_available("Gemini"),
+        unavailable_message="Gemini API is not configured or unreachable",
+        # Limits are for the whole deployment: each worker gets its share,
+        # or with shared state all workers draw on one rate limit
+        max_concurrency=per_process_limit(GEMINI_MAX_CONCURRENCY),
+        requests_per_minute=per_process_limit(GEMINI_RATE_LIMIT_RPM),
+        rate_limiter=(
+            MongoRateLimiter("gemini", GEMINI_RATE_LIMIT_RPM / 60)
+            if GEMINI_RATE_LIMIT_RPM and shared_state_enabled() else None
+        ),
+    ),
+    Provider(
+        "Ollama",
+        _call_default_ollama,
+        lambda: health_monitor.is_available("Ollama"),
+        unavailable_message="Ollama service is not running locally (port 11434 unreachable)",
+        max_concurrency=per_process_limit(OLLAMA_MAX_CONCURRENCY),
+    ),
+])
+
+# Streaming counterparts of the scheduler's providers, keyed by name
+_stream_providers = {
+    "Gemini": stream_gemini_async,
+    "Ollama": lambda prompt: stream_ollama_async(prompt, model=DEFAULT_MODEL),
+}
+
+# Blocking counterparts, for analyze_case_with_ai
+_sync_providers = {
+    "Gemini": call_gemini,
+    "Ollama": lambda prompt: call_ollama(prompt, model=DEFAULT_MODEL),
+}
+_sync_probes = {
+    "Gemini": is_gemini_available,
+    "Ollama": is_ollama_available,
+}
+
+
+def _is_available_sync(name: str) -> bool:
+    cached = health_monitor.cached_status(name)
+    return cached if cached is not None else _sync_probes[name]()
+
+
 def analyze_case_with_ai(case_text: str) -> dict:
     """
-    Analyze case using AI (Gemini first, Ollama as fallback)
+    Blocking variant of analyze_case_with_ai_async for callers without an
+    event loop. Providers are tried one after another in scheduler order,
+    behind the same circuit breakers and cached health as the async path.
     """
-    prompt = case_analysis_prompt(case_text)
+    with stage("prompt_build"):
+        prompt, case_type = build_case_prompt(case_text)
     ai_result = None
     errors = []
 
-    # 1. Try Gemini
-    if is_gemini_available():
+    for provider in provider_scheduler.ordered_providers():
+        breaker = provider.breaker
+        if not breaker.allow_request():
+            errors.append(f"{provider.name} circuit breaker is open")
+            continue
+        if not _is_available_sync(provider.name):
+            breaker.release()
+            errors.append(provider.unavailable_message)
+            continue
         try:
-            logger.info("🚀 Attempting Gemini 1.5 Flash...")
-            ai_result = call_gemini(prompt)
-            logger.info("✅ Gemini analysis successful")
+            logger.info(f"🚀 Attempting {provider.name}...")
+            result = _sync_providers[provider.name](prompt)
         except Exception as e:
-            err_msg = f"Gemini failed: {str(e)}"
+            breaker.record_failure()
+            err_msg = f"{provider.name} failed: {str(e)}"
             logger.warning(f"⚠️ {err_msg}")
             errors.append(err_msg)
+            continue
+        breaker.record_success()
+        if is_valid_result(result):
+            logger.info(f"✅ {provider.name} analysis successful")
+            ai_result = result
+            break
+        errors.append(f"{provider.name} returned no analysis")
 
-    # 2. Try Ollama (Fallback)
     if not ai_result:
-        if is_ollama_available():
-            try:
-                logger.info(f"🤖 Attempting local Ollama ({DEFAULT_MODEL})...")
-                ai_result = call_ollama(prompt, model=DEFAULT_MODEL)
-                logger.info("✅ Ollama analysis successful")
-            except Exception as e:
-                err_msg = f"Ollama failed: {str(e)}"
-                logger.error(f"❌ {err_msg}")
-                errors.append(err_msg)
-        else:
-            errors.append("Ollama service is not running locally (port 11434 unreachable)")
-
-    # 3. Handle total failure
+        _raise_total_failure(errors)
+
+    if case_type:
+        ai_result.setdefault("case_type", case_type)
+    return normalize_analysis(ai_result)
+
+
+def _active_model_name() -> str:
+    """Name of the model chain that would answer right now (part of the cache key)"""
+    if is_gemini_available():
+        return f"{GEMINI_MODEL}|{DEFAULT_MODEL}"
+    return DEFAULT_MODEL
+
+
+async def analyze_case_with_ai_async(case_text: str, owner: Optional[str] = None) -> dict:
+    """
+    Non-blocking variant of analyze_case_with_ai for the API routes.
+    Repeat analyses of the same text are served from the result cache.
+    With an `owner` (user id) the semantic cache may reuse or update one of
+    that owner's earlier analyses; the result is then cached for them only.
+    """
+    if SEMANTIC_CACHE_ENABLED and owner is not None:
+        key = make_cache_key(case_text, PROMPT_VERSION, _active_model_name(), scope=f"owner:{owner}")
+        return await analysis_cache.get_or_compute(key, lambda: _analyze_with_semantic_cache(case_text, owner))
+    key = make_cache_key(case_text, PROMPT_VERSION, _active_model_name())
+    return await analysis_cache.get_or_compute(key, lambda: _analyze_uncached_async(case_text))
+
+
+# Re-ask for sections missing from a response instead of leaving them empty
+RETRY_MISSING_SECTIONS = os.getenv("RETRY_MISSING_SECTIONS", "true").lower() in ("1", "true", "yes")
+# Above this share of the case's tokens, changed sentences get a full analysis instead
+MAX_CHANGED_FRACTION = 0.3
+
+
+async def _analyze_with_semantic_cache(case_text: str, owner: str) -> dict:
+    """
+    Exact-cache miss: reuse the analysis of a similar case of the same
+    owner if no sentence differs, update it for the changed sentences, or
+    analyze from scratch. Similarity alone never decides reuse: one negated
+    sentence barely moves the embedding but reverses the analysis.
+    """
+    match = await semantic_cache.lookup(case_text, owner)
+    if match is None:
+        result = await _analyze_uncached_async(case_text)
+    else:
+        added, removed = sentence_diff(match.case_text, case_text)
+        if not added and not removed:
+            semantic_cache.hits += 1
+            logger.info(f"♻️ Reusing the analysis of a near-duplicate case (similarity {match.score:.3f})")
+            return match.analysis
+        semantic_cache.seeded += 1
+        result = await _reanalyze_changes(case_text, match, added, removed)
+    semantic_cache.add(case_text, result, owner)
+    return result
+
+
+def _is_update(result) -> bool:
+    # An empty object is a valid answer to the update prompt: nothing changes
+    return isinstance(result, dict)
+
+
+async def _reanalyze_changes(case_text: str, match: SemanticMatch, added: list, removed: list) -> dict:
+    """Update a similar case's analysis for the sentences that differ"""
+    changed_tokens = estimate_tokens(" ".join(added + removed))
+    if changed_tokens > MAX_CHANGED_FRACTION * estimate_tokens(case_text):
+        return await _analyze_uncached_async(case_text)
+
+    logger.info(f"♻️ Updating a similar case's analysis (similarity {match.score:.3f}, ~{changed_tokens} changed tokens)")
+    previous = json.dumps({name: match.analysis.get(name) for name in ANALYSIS_SECTIONS}, separators=(",", ":"))
+    prompt = case_update_prompt(
+        previous,
+        "\n".join(f"- {sentence}" for sentence in added),
+        "\n".join(f"- {sentence}" for sentence in removed),
+    )
+    delta, errors = await provider_scheduler.run(prompt, accept=_is_update)
+    if delta is None:
+        logger.warning(f"⚠️ Incremental update failed, analyzing in full: {errors}")
+        return await _analyze_uncached_async(case_text)
+    delta = canonical_sections(delta)
+    updated = {**match.analysis, **{name: value for name, value in delta.items() if name in ANALYSIS_SECTIONS}}
+    return normalize_analysis(updated)
+
+
+def _needs_chunking(case_text: str) -> Optional[str]:
+    """The compacted text if it is still too long for one prompt, else None"""
+    if not is_long_document(case_text):
+        return None
+    # Documents that are long only because of boilerplate still fit one prompt
+    compacted = compact_case_text(case_text)
+    return compacted if is_long_document(compacted) else None
+
+
+async def _analyze_uncached_async(case_text: str) -> dict:
+    """
+    Dispatch the prompt through the provider scheduler (sequential,
+    hedged or race across Gemini and Ollama) using the pooled async clients.
+    Long documents are analyzed chunk by chunk.
+    """
+    compacted = _needs_chunking(case_text)
+    if compacted is not None:
+        # Too long for one context window: map-reduce over chunks instead
+        return normalize_analysis(await analyze_long_case_async(compacted, provider_scheduler.run))
+
+    with stage("prompt_build"):
+        prompt, case_type = build_case_prompt(case_text)
+    ai_result, errors = await provider_scheduler.run(prompt)
+
     if not ai_result:
-        all_errors = " | ".join(errors)
-        logger.error(f"❌ Both AI services failed: {all_errors}")
-        raise RuntimeError(f"AI Analysis Service Unavailable. Details: {all_errors}")
-    
-    try:
-        # Helper to ensure something is a list
-        def ensure_list(val):
-            if isinstance(val, list):
-                return val
-            if val is None or val == "Not specified":
-                return []
-            return [str(val)]
-
-        # Helper to ensure something is a string
-        def ensure_str(val, default="Not specified"):
-            if val is None:
-                return default
-            return str(val)
+        _raise_total_failure(errors)
 
-        # Validate and return
-        result = {
-            "case_type": ensure_str(ai_result.get("case_type"), "Unknown"),
-            "case_summary": ensure_str(ai_result.get("case_summary")),
-            "key_facts": ensure_list(ai_result.get("key_facts")),
-            "legal_issues": ai_result.get("legal_issues", []),
-            "applicable_laws": ai_result.get("applicable_laws", []),
-            "strengths": ai_result.get("strengths", []),
-            "weaknesses": ai_result.get("weaknesses", []),
-            "recommended_actions": ai_result.get("recommended_actions", []),
-            "evidence_needed": ensure_list(ai_result.get("evidence_needed")),
-            "precedents": ensure_list(ai_result.get("precedents")),
-            "estimated_outcome": ensure_str(ai_result.get("estimated_outcome")),
-            "timeline_considerations": ensure_str(ai_result.get("timeline_considerations"))
-        }
-        
-        logger.info(f"AI analysis successful: {result['case_type']}")
-        return result
-        
-    except Exception as e:
-        logger.error(f"AI analysis failed: {e}")
-        raise RuntimeError(f"AI analysis failed: {str(e)}")
+    ai_result = canonical_sections(ai_result)
+    if case_type:
+        ai_result.setdefault("case_type", case_type)
+    ai_result = await _fill_missing_sections(case_text, ai_result)
+    return normalize_analysis(ai_result)
+
+
+async def _fill_missing_sections(case_text: str, ai_result: dict) -> dict:
+    """
+    Ask for the sections the model left out (or lost to truncation) with a
+    prompt listing only those, instead of re-running the whole analysis.
+    On failure the missing sections fall back to their empty defaults.
+    """
+    missing = [name for name in ANALYSIS_SECTIONS if name not in ai_result]
+    if not missing or not RETRY_MISSING_SECTIONS:
+        return ai_result
+    logger.warning(f"⚠️ Model response lacks {', '.join(missing)}; asking for those sections only")
+    with stage("section_retry"):
+        extra, errors = await provider_scheduler.run(missing_sections_prompt(compact_case_text(case_text), missing))
+    if not extra:
+        logger.warning(f"⚠️ Missing-section retry failed, using defaults: {errors}")
+        return ai_result
+    extra = canonical_sections(extra)
+    return {**ai_result, **{name: extra[name] for name in missing if name in extra}}
+
+
+async def stream_case_analysis(case_text: str) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Stream an analysis as ("section", {"section", "value"}) events, one per
+    top-level schema section as soon as the model has finished it, followed
+    by a single ("result", analysis) event with the normalized analysis.
+    Providers are tried in scheduler order; the next one is used only if
+    the current one fails before producing any section. Documents too long
+    for one prompt are analyzed chunk by chunk first, then sent section by
+    section.
+    """
+    key = make_cache_key(case_text, PROMPT_VERSION, _active_model_name())
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        analysis_cache.hits += 1
+        for name in ANALYSIS_SECTIONS:
+            yield "section", {"section": name, "value": cached[name]}
+        yield "result", cached
+        return
+
+    if _needs_chunking(case_text) is not None:
+        # Map-reduce has no sections to show until the chunks are merged; a
+        # single truncated prompt would stream faster but miss most of the case
+        result = await analyze_case_with_ai_async(case_text)
+        for name in ANALYSIS_SECTIONS:
+            yield "section", {"section": name, "value": result[name]}
+        yield "result", result
+        return
+
+    with stage("prompt_build"):
+        prompt, case_type = build_case_prompt(case_text)
+    sections = {}
+    errors = []
+    if case_type:
+        # Known before the model answers: stream it straight away
+        sections["case_type"] = case_type
+        yield "section", {"section": "case_type", "value": case_type}
+    local_sections = len(sections)
+    for provider in provider_scheduler.ordered_providers():
+        breaker = provider.breaker
+        if not breaker.allow_request():
+            errors.append(f"{provider.name} circuit breaker is open")
+            continue
+        if not await provider.is_available():
+            breaker.release()
+            errors.append(provider.unavailable_message)
+            continue
+
+        parser = IncrementalSectionParser()
+        open_stream = _stream_providers[provider.name]
+        outcome_recorded = False
+        try:
+            async with aclosing(open_stream(prompt)) as stream:
+                async for text in stream:
+                    for name, value in parser.feed(text):
+                        name = canonical_key(name)
+                        if name in ANALYSIS_SECTIONS and name not in sections:
+                            sections[name] = normalize_section(name, value)
+                            yield "section", {"section": name, "value": sections[name]}
+                    if parser.done:
+                        break
+            breaker.record_success()
+            outcome_recorded = True
+            for name, value in parser.close():
+                name = canonical_key(name)
+                if name in ANALYSIS_SECTIONS and name not in sections:
+                    sections[name] = normalize_section(name, value)
+                    yield "section", {"section": name, "value": sections[name]}
+        except Exception as e:
+            if not outcome_recorded:
+                breaker.record_failure()
+                outcome_recorded = True
+            err_msg = f"{provider.name} failed: {str(e)}"
+            logger.warning(f"⚠️ {err_msg}")
+            errors.append(err_msg)
+        finally:
+            # Client went away mid-stream: no verdict on the provider
+            if not outcome_recorded:
+                breaker.release()
+
+        if len(sections) > local_sections:
+            break
+
+    if len(sections) == local_sections:
+        _raise_total_failure(errors)
+
+    result = normalize_analysis(sections)
+    if len(sections) == len(ANALYSIS_SECTIONS):
+        analysis_cache.set(key, result)
+    yield "result", result
@@ -0,0 +1,96 @@
+import json
+import logging
+import math
+import os
+import threading
+from typing import Dict, Optional
+
+from app.core.case_parser import parse_case
+from app.core.issue_extractor import extract_issues
+from app.law_mapping.section_mapper import map_sections, section_index, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Same labels as the case_type field of case_analysis_prompt, minus "Other"
+# (returned when nothing in the text is recognized)
+CASE_TYPES = ("Criminal", "Civil", "Constitutional", "Family", "Corporate", "Property", "Labor", "Tax")
+# Weights produced offline by app.core.classifier_training
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "case_classifier_model.json")
+# Below this probability the analyzer keeps the generic prompt
+CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("CLASSIFIER_MIN_CONFIDENCE", "0.6"))
+
+
+def case_features(text: str) -> Dict[str, float]:
+    """
+    Binary bag of stemmed words plus one `act:<code>` feature per act the
+    text names, L2-normalized so long and short texts score alike.
+    """
+    names = set(tokenize(text))
+    names.update(f"act:{code}" for code in section_index.acts_mentioned(text))
+    if not names:
+        return {}
+    value = 1 / math.sqrt(len(names))
+    return {name: value for name in names}
+
+
+class CaseClassifier:
+    """Linear case type model; the weights are loaded lazily on first use"""
+
+    def __init__(self, model: Optional[dict] = None, model_path: str = MODEL_PATH):
+        self.model_path = model_path
+        self._model = model
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    with open(self.model_path) as f:
+                        self._model = json.load(f)
+        return self._model
+
+    def predict(self, text: str) -> dict:
+        """
+        Returns:
+            dict: case_type, confidence (probability of that type) and the
+            per-type probabilities
+        """
+        model = self._load()
+        classes, weights = model["classes"], model["weights"]
+        logits = list(model["bias"])
+        matched = 0
+        for name, value in case_features(text).items():
+            row = weights.get(name)
+            if row is None:
+                continue
+            matched += 1
+            for c, w in enumerate(row):
+                logits[c] += w * value
+        if not matched:
+            return {"case_type": "Other", "confidence": 0.0, "scores": {}}
+
+        top = max(logits)
+        exps = [math.exp(z - top) for z in logits]
+        total = sum(exps)
+        scores = {label: round(e / total, 4) for label, e in zip(classes, exps)}
+        best = max(scores, key=scores.get)
+        return {"case_type": best, "confidence": scores[best], "scores": scores}
+
+
+case_classifier = CaseClassifier()
+
+
+def classify_case(case_text: str) -> dict:
+    """
+    Local triage of a case without any LLM call: case type, parties,
+    dates, amounts, the most relevant statute sections and candidate
+    legal issues. Runs in a few milliseconds on CPU.
+    """
+    prediction = case_classifier.predict(case_text)
+    sections = map_sections(case_text)
+    return {
+        **prediction,
+        **parse_case(case_text),
+        "sections": [s["citation"] for s in sections],
+        "candidate_issues": extract_issues(case_text, sections),
+    }
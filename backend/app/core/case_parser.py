@@ -0,0 +1,146 @@
+import re
+from datetime import date
+from typing import List, Optional
+
+# Party roles as they appear in Indian pleadings and case narratives
+_ROLES = {
+    "complainant": "Complainant",
+    "informant": "Complainant",
+    "petitioner": "Petitioner",
+    "appellant": "Appellant",
+    "applicant": "Applicant",
+    "plaintiff": "Plaintiff",
+    "accused": "Accused",
+    "respondent": "Respondent",
+    "defendant": "Defendant",
+    "opposite party": "Opposite Party",
+    "victim": "Victim",
+    "deceased": "Deceased",
+    "landlord": "Landlord",
+    "tenant": "Tenant",
+    "employer": "Employer",
+    "employee": "Employee",
+    "husband": "Husband",
+    "wife": "Wife",
+}
+_NAME = r"(?:(?:Mr|Mrs|Ms|Smt|Shri|Sh|Dr|M/s)\.?\s+)?[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){0,3}"
+# "the accused Suresh Kumar", "Complainant No. 2, Smt. Meena", "respondent: ABC Pvt Ltd"
+_ROLE_RE = re.compile(
+    rf"\b(?i:({'|'.join(_ROLES)}))(?i:\s+no\.?\s*\d+)?\s*[,:\-]?\s*(?i:namely\s+|i\.e\.\s+|one\s+)?({_NAME})"
+)
+# "Ramesh Kumar vs. State of Maharashtra"
+_VERSUS_RE = re.compile(rf"({_NAME})\s+(?:vs?\.?|versus)\s+({_NAME})")
+# Capitalized words that follow a role word but are not names
+_NOT_NAMES = {"The", "He", "She", "They", "It", "His", "Her", "On", "In", "At", "That", "This", "Court", "Police",
+              "Section", "Sec", "Under", "And", "Was", "Had", "Has", "Is", "Filed", "Stated"}
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+         ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"),
+         ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+_MONTH = rf"({'|'.join(sorted(_MONTHS, key=len, reverse=True))})\.?"
+_DATE_PATTERNS = [
+    # 12.03.2023, 12/3/23, 12-03-2023 (day first)
+    (re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4}|\d{2})\b"), ("day", "month", "year")),
+    # 12th March 2023, 12 Mar, 2023, 12th day of March 2023
+    (re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:day\s+of\s+)?{_MONTH},?\s+(\d{{4}})\b", re.IGNORECASE),
+     ("day", "month_name", "year")),
+    # March 12, 2023
+    (re.compile(rf"\b{_MONTH}\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE),
+     ("month_name", "day", "year")),
+]
+_AMOUNT_RE = re.compile(
+    r"(?:Rs\.?|INR|₹)\s*([\d,]+(?:\.\d+)?)\s*(?:/-)?\s*(lakhs?|lacs?|crores?)?", re.IGNORECASE
+)
+_MULTIPLIERS = {"lakh": 100000, "lac": 100000, "crore": 10000000}
+
+CONTEXT_CHARS = 60
+
+
+def _context(text: str, start: int, end: int) -> str:
+    return " ".join(text[max(0, start - CONTEXT_CHARS):end + CONTEXT_CHARS].split())
+
+
+def _clean_name(name: str) -> Optional[str]:
+    words = name.split()
+    while words and words[-1] in _NOT_NAMES:
+        words.pop()
+    if not words or words[0] in _NOT_NAMES:
+        return None
+    return " ".join(words)
+
+
+def extract_parties(text: str) -> List[dict]:
+    """Named parties with their role, in order of first mention"""
+    parties, seen = [], set()
+
+    def add(role: str, name: Optional[str]):
+        name = _clean_name(name) if name else None
+        if name and (role, name) not in seen:
+            seen.add((role, name))
+            parties.append({"role": role, "name": name})
+
+    for match in _VERSUS_RE.finditer(text):
+        add("First Party", match.group(1))
+        add("Second Party", match.group(2))
+    for match in _ROLE_RE.finditer(text):
+        add(_ROLES[match.group(1).lower()], match.group(2))
+    return parties
+
+
+def _year(value: str) -> int:
+    year = int(value)
+    return year + 2000 if year < 100 else year
+
+
+def extract_dates(text: str) -> List[dict]:
+    """
+    Calendar dates in the text, read day-first as in Indian documents.
+
+    Returns:
+        list: {"date": ISO date, "text": as written, "context": surrounding text}
+    """
+    found = []
+    for pattern, fields in _DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            parts = dict(zip(fields, match.groups()))
+            month = _MONTHS[parts["month_name"].lower()] if "month_name" in parts else int(parts["month"])
+            try:
+                value = date(_year(parts["year"]), month, int(parts["day"]))
+            except ValueError:
+                continue
+            found.append((match.start(), {
+                "date": value.isoformat(),
+                "text": match.group(0),
+                "context": _context(text, match.start(), match.end()),
+            }))
+    found.sort(key=lambda item: item[0])
+    return [entry for _, entry in found]
+
+
+def extract_amounts(text: str) -> List[dict]:
+    """Rupee amounts, with lakh/crore multipliers applied"""
+    amounts = []
+    for match in _AMOUNT_RE.finditer(text):
+        try:
+            value = float(match.group(1).replace(",", ""))
+        except ValueError:
+            continue
+        unit = (match.group(2) or "").lower().rstrip("s")
+        amounts.append({"amount": value * _MULTIPLIERS.get(unit, 1), "text": match.group(0).strip()})
+    return amounts
+
+
+def parse_case(text: str) -> dict:
+    """Parties, dates and amounts extracted with regular expressions only"""
+    return {
+        "parties": extract_parties(text),
+        "dates": extract_dates(text),
+        "amounts": extract_amounts(text),
+    }
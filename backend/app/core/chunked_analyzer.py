@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from typing import Awaitable, Callable, List, Tuple
+
+from app.llm.prompts import chunk_extraction_prompt, case_synthesis_prompt
+from app.llm.token_budget import CHARS_PER_TOKEN, OLLAMA_NUM_CTX, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Scaled to OLLAMA_NUM_CTX: a case of half the context still leaves room for
+# the instructions, statute references and a full-length answer
+LONG_DOC_THRESHOLD_TOKENS = int(os.getenv("LONG_DOC_THRESHOLD_TOKENS", str(OLLAMA_NUM_CTX // 2)))
+CHUNK_TOKENS = int(os.getenv("LONG_DOC_CHUNK_TOKENS", str(OLLAMA_NUM_CTX * 3 // 8)))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("LONG_DOC_CHUNK_OVERLAP_TOKENS", "150"))
+MAX_PARALLEL_CHUNKS = int(os.getenv("LONG_DOC_MAX_PARALLEL", "4"))
+
+# Caps on merged lists so the synthesis prompt stays small
+MAX_FACTS = 40
+MAX_ISSUES = 15
+MAX_LAWS = 20
+MAX_EVIDENCE = 20
+MAX_DATES = 20
+
+# Sentence boundary: terminal punctuation followed by whitespace and a
+# capital, digit, quote or bracket, or a blank line
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])|\n\s*\n")
+# Abbreviations common in Indian legal text that end in a period
+_ABBREVIATIONS = ("sec.", "secs.", "no.", "nos.", "vs.", "v.", "r/w.", "u/s.", "art.", "cl.", "dt.", "mr.", "mrs.",
+                  "ms.", "dr.", "sh.", "smt.", "hon'ble.", "ltd.", "pvt.", "co.", "viz.", "i.e.", "e.g.", "etc.")
+_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+RunPrompt = Callable[[str], Awaitable[Tuple[dict, List[str]]]]
+
+
+def is_long_document(case_text: str) -> bool:
+    return estimate_tokens(case_text) > LONG_DOC_THRESHOLD_TOKENS
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences without breaking on common legal abbreviations"""
+    sentences = []
+    pending = ""
+    for piece in _SENTENCE_END_RE.split(text):
+        if not piece or not piece.strip():
+            continue
+        piece = piece.strip()
+        pending = f"{pending} {piece}" if pending else piece
+        last_word = pending.rsplit(None, 1)[-1].lower()
+        if last_word in _ABBREVIATIONS:
+            continue
+        sentences.append(pending)
+        pending = ""
+    if pending:
+        sentences.append(pending)
+    return sentences
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> List[str]:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    parts, current = [], ""
+    for word in sentence.split():
+        if current and len(current) + len(word) + 1 > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> List[str]:
+    """
+    Pack whole sentences into chunks of at most `max_tokens` (estimated),
+    repeating the trailing `overlap_tokens` worth of sentences at the start
+    of the next chunk so facts spanning a boundary are not lost.
+    """
+    sentences = []
+    for sentence in split_sentences(text):
+        if estimate_tokens(sentence) > max_tokens:
+            sentences.extend(_split_long_sentence(sentence, max_tokens))
+        else:
+            sentences.append(sentence)
+
+    # Budget in characters so joining spaces are accounted for
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current: List[str] = []
+    current_chars = 0
+    for sentence in sentences:
+        size = len(sentence) + 1
+        if current and current_chars + size > max_chars:
+            chunks.append(" ".join(current))
+            # Carry the tail of this chunk into the next one
+            overlap, overlap_size = [], 0
+            for prev in reversed(current):
+                prev_size = len(prev) + 1
+                if overlap_size + prev_size > overlap_chars or overlap_size + prev_size + size > max_chars:
+                    break
+                overlap.insert(0, prev)
+                overlap_size += prev_size
+            current, current_chars = overlap, overlap_size
+        current.append(sentence)
+        current_chars += size
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _dedupe_key(value) -> str:
+    return _NORMALIZE_RE.sub(" ", str(value).lower()).strip()
+
+
+def _merge_strings(extractions: List[dict], field: str, limit: int) -> List[str]:
+    seen, merged = set(), []
+    for extraction in extractions:
+        values = extraction.get(field) or []
+        if not isinstance(values, list):
+            values = [values]
+        for value in values:
+            key = _dedupe_key(value)
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(str(value))
+    return merged[:limit]
+
+
+def _merge_records(extractions: List[dict], field: str, key_field: str, limit: int) -> List[dict]:
+    seen, merged = set(), []
+    for extraction in extractions:
+        values = extraction.get(field) or []
+        if not isinstance(values, list):
+            continue
+        for value in values:
+            if not isinstance(value, dict):
+                continue
+            key = _dedupe_key(value.get(key_field, ""))
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(value)
+    return merged[:limit]
+
+
+def merge_extractions(extractions: List[dict]) -> dict:
+    """Merge per-chunk extractions, dropping duplicates (first occurrence wins)"""
+    return {
+        "key_facts": _merge_strings(extractions, "key_facts", MAX_FACTS),
+        "legal_issues": _merge_records(extractions, "legal_issues", "issue", MAX_ISSUES),
+        "applicable_laws": _merge_records(extractions, "applicable_laws", "law", MAX_LAWS),
+        "evidence_needed": _merge_strings(extractions, "evidence_needed", MAX_EVIDENCE),
+        "dates_and_deadlines": _merge_strings(extractions, "dates_and_deadlines", MAX_DATES),
+    }
+
+
+async def analyze_long_case_async(
+    case_text: str,
+    run_prompt: RunPrompt,
+    max_parallel: int = MAX_PARALLEL_CHUNKS,
+) -> dict:
+    """
+    Map-reduce analysis of a long document.
+
+    Map: extract facts, issues, laws, evidence and dates from overlapping
+    chunks, at most `max_parallel` at a time. Reduce: merge and dedupe the
+    extractions, then run one small synthesis prompt over the merged
+    material for the case-level fields.
+
+    Args:
+        case_text: Full document text
+        run_prompt: Coroutine returning (result, errors), e.g. ProviderScheduler.run
+
+    Returns:
+        dict: Raw analysis with every AnalyzeResponse section (not yet normalized)
+    """
+    chunks = chunk_text(case_text)
+    logger.info(f"📚 Long document (~{estimate_tokens(case_text)} tokens): {len(chunks)} chunks, {max_parallel} parallel")
+
+    semaphore = asyncio.Semaphore(max_parallel)
+    errors: List[str] = []
+
+    async def extract(index: int, chunk: str):
+        async with semaphore:
+            result, chunk_errors = await run_prompt(chunk_extraction_prompt(chunk, index + 1, len(chunks)))
+        if not result:
+            errors.extend(chunk_errors or [f"Chunk {index + 1} returned no usable JSON"])
+            logger.warning(f"⚠️ Chunk {index + 1}/{len(chunks)} extraction failed")
+            return None
+        return result
+
+    extractions = [e for e in await asyncio.gather(*(extract(i, c) for i, c in enumerate(chunks))) if e]
+    if not extractions:
+        raise RuntimeError(f"AI Analysis Service Unavailable. Details: {' | '.join(errors)}")
+    if len(extractions) < len(chunks):
+        logger.warning(f"⚠️ {len(chunks) - len(extractions)} of {len(chunks)} chunks failed, continuing with the rest")
+
+    merged = merge_extractions(extractions)
+    synthesis, synthesis_errors = await run_prompt(case_synthesis_prompt(json.dumps(merged, indent=1)))
+    if not synthesis:
+        raise RuntimeError(f"AI Analysis Service Unavailable. Details: {' | '.join(synthesis_errors)}")
+
+    result = dict(synthesis)
+    for field in ("key_facts", "legal_issues", "applicable_laws", "evidence_needed"):
+        result[field] = merged[field]
+    if merged["dates_and_deadlines"] and not result.get("timeline_considerations"):
+        result["timeline_considerations"] = "; ".join(merged["dates_and_deadlines"])
+    return result
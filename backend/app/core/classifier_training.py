@@ -0,0 +1,286 @@
+"""
+Offline training for the case type classifier.
+
+Fits a multinomial logistic regression over the same features the
+classifier uses at runtime (stemmed words plus the acts a text names) and
+writes the weights to case_classifier_model.json. The training set is a
+synthetic corpus of case narratives built from per-type templates, plus
+the bundled statute sections labelled by the case type of their act.
+
+    python -m app.core.classifier_training
+"""
+import json
+import math
+import random
+from typing import Dict, List, Tuple
+
+from app.core.case_classifier import CASE_TYPES, MODEL_PATH, case_features
+
+NAMES = ["Ramesh Kumar", "Sunita Devi", "Anil Sharma", "Priya Nair", "Mohammed Iqbal", "Kavita Rao",
+         "Suresh Patil", "Meena Gupta", "Rajesh Verma", "Farah Khan", "Vikram Singh", "Lakshmi Iyer"]
+COMPANIES = ["ABC Traders Pvt Ltd", "Sunrise Infra Ltd", "Metro Logistics", "Apex Textiles Pvt Ltd",
+             "Green Valley Builders", "Orbit Software Solutions"]
+PLACES = ["Pune", "Delhi", "Chennai", "Lucknow", "Jaipur", "Kochi", "Nagpur", "Indore"]
+
+FILLER = [
+    "The matter was listed before the court on {date}.",
+    "Counsel for {name} submitted a written statement.",
+    "Copies of the relevant documents are annexed.",
+    "The parties reside in {place}.",
+    "Notice was issued to the other side.",
+    "The next date of hearing is {date}.",
+    "{name} has approached a lawyer for advice.",
+    "The facts are briefly stated below.",
+]
+
+TEMPLATES: Dict[str, List[str]] = {
+    "Criminal": [
+        "{name} lodged an FIR at {place} police station against {name2}.",
+        "The accused {name2} was arrested on {date} and remanded to judicial custody.",
+        "{name2} threatened to kill {name} and attacked him with a knife.",
+        "The accused took Rs. {amount} from {name} promising a job abroad and absconded.",
+        "Gold ornaments were stolen from the house of {name} during the night.",
+        "The police filed a charge sheet under sections 420 and 406 IPC.",
+        "{name2} has applied for anticipatory bail fearing arrest.",
+        "The victim sustained grievous injuries and was admitted to hospital.",
+        "A cheque of Rs. {amount} issued by {name2} was dishonoured for insufficient funds.",
+        "The investigating officer recorded statements of witnesses under section 161 CrPC.",
+        "The accused was caught accepting a bribe by the anti-corruption bureau.",
+        "{name} was cheated through a fake UPI payment link and lost Rs. {amount}.",
+        "The deceased was found dead and the post mortem report shows strangulation.",
+        "A mob assaulted {name} and damaged his shop.",
+        "The accused is charged with murder and the trial is pending before the Sessions Court.",
+        "{name2} stalked and harassed {name} on social media and sent obscene messages.",
+    ],
+    "Civil": [
+        "{name} entered into an agreement with {company} for supply of goods worth Rs. {amount}.",
+        "{company} failed to deliver the goods despite receiving the advance payment.",
+        "{name} seeks recovery of money with interest for breach of contract.",
+        "A legal notice demanding damages was sent on {date} but was not answered.",
+        "The plaintiff has filed a suit for recovery of Rs. {amount}.",
+        "The defendant denies liability and claims the contract was frustrated.",
+        "{name} purchased a defective car and the dealer refused to replace it.",
+        "The hospital was negligent in treatment and {name} seeks compensation before the consumer commission.",
+        "{name} was injured in a road accident and filed a claim before the motor accidents claims tribunal.",
+        "The insurance company repudiated the claim of {name} without reason.",
+        "The builder did not refund the booking amount and the service was deficient.",
+        "The plaintiff seeks a permanent injunction and damages for defamation.",
+        "The suit is at the stage of framing of issues in the civil court.",
+        "The bank wrongly debited charges and refused to reverse them.",
+    ],
+    "Constitutional": [
+        "{name} challenges the government notification as violative of Article 14.",
+        "A writ petition under Article 226 has been filed before the High Court.",
+        "The petitioner alleges violation of fundamental rights to life and personal liberty under Article 21.",
+        "The state authorities cancelled the licence without giving a hearing.",
+        "The petitioner seeks a writ of mandamus directing the municipal corporation to act.",
+        "The detention order was passed without supplying grounds to the detenu.",
+        "The recruitment rules are alleged to be arbitrary and discriminatory.",
+        "A public interest litigation was filed regarding pollution of the river.",
+        "The petitioner challenges the constitutional validity of the amendment.",
+        "Habeas corpus is sought for production of {name} who is in illegal detention.",
+        "The order restricts freedom of speech and expression under Article 19.",
+    ],
+    "Family": [
+        "{name} married {name2} on {date} according to Hindu rites.",
+        "The husband and in-laws harassed the wife for dowry and beat her.",
+        "The wife was thrown out of the matrimonial home along with the child.",
+        "{name} seeks divorce on the ground of cruelty and desertion.",
+        "The parties wish to file for divorce by mutual consent.",
+        "The wife claims maintenance for herself and the minor child.",
+        "Both parents claim custody of the minor child.",
+        "An application was filed under the Domestic Violence Act for a protection order.",
+        "The husband has not paid the interim maintenance ordered by the family court.",
+        "{name2} has remarried without obtaining a divorce.",
+        "The stridhan and jewellery of the wife are retained by the in-laws.",
+        "The couple has been living separately for three years.",
+    ],
+    "Corporate": [
+        "{company} defaulted on repayment of a term loan of Rs. {amount} crore.",
+        "The financial creditor filed an application under section 7 of the IBC before the NCLT.",
+        "Minority shareholders allege oppression and mismanagement by the directors.",
+        "The board of directors of {company} passed a resolution without quorum.",
+        "The operational creditor served a demand notice for unpaid invoices.",
+        "The shareholders agreement contains an arbitration clause.",
+        "The company failed to hold the annual general meeting.",
+        "The promoters diverted company funds to related entities.",
+        "A merger scheme between {company} and another company awaits approval.",
+        "The joint venture partner terminated the agreement and invoked arbitration.",
+        "The resolution professional has invited claims from creditors.",
+    ],
+    "Property": [
+        "{name} owns agricultural land in {place} inherited from his father.",
+        "{name2} has encroached upon the plot and started construction.",
+        "The sale deed was executed on {date} but possession was not handed over.",
+        "The tenant has not paid rent for eight months and refuses to vacate.",
+        "The landlord seeks eviction of the tenant from the shop premises.",
+        "The co-owners dispute partition of the ancestral property.",
+        "A forged will was used to transfer the property to {name2}.",
+        "The seller refused to execute the sale deed under the agreement to sell.",
+        "The mutation of the land records was done without notice.",
+        "{name} claims title by adverse possession for more than twelve years.",
+        "The builder delayed possession of the flat by four years.",
+        "The mortgaged property was auctioned by the bank.",
+    ],
+    "Labor": [
+        "{name} was employed with {company} as a machine operator since {date}.",
+        "The employer terminated the services of the workman without notice.",
+        "No retrenchment compensation was paid to the workmen.",
+        "The employee has not been paid salary for four months.",
+        "Gratuity was denied to {name} after twelve years of service.",
+        "The union raised an industrial dispute before the labour commissioner.",
+        "The dismissal followed a domestic enquiry that violated natural justice.",
+        "Provident fund contributions were deducted but not deposited.",
+        "{name} was injured at the factory and claims workmen compensation.",
+        "The contract workers demand regularisation of their services.",
+        "The employer refused maternity benefit to the employee.",
+    ],
+    "Tax": [
+        "The assessing officer issued a notice under section 148 of the Income-tax Act.",
+        "{company} received a GST demand of Rs. {amount} with penalty.",
+        "The reassessment proceedings were initiated after four years.",
+        "The department disallowed the deduction claimed in the return of income.",
+        "An appeal has been filed before the Commissioner of Income Tax (Appeals).",
+        "Input tax credit was denied to the assessee for the financial year.",
+        "A search and seizure was conducted at the premises of {name}.",
+        "The assessee was penalised for under-reporting of income.",
+        "The tax refund has been withheld for two years.",
+        "The GST registration of {company} was cancelled retrospectively.",
+    ],
+}
+
+# Vocabulary typical of each case type, mixed into synthetic cases as
+# short first-person complaints
+KEYWORDS: Dict[str, List[str]] = {
+    "Criminal": ["police", "fir", "arrest", "accused", "bail", "theft", "stolen", "cheated", "fraud", "scam",
+                 "threatened", "attacked", "assault", "murder", "bribe", "cheque bounced", "extortion",
+                 "harassment", "molested", "kidnapped", "online fraud", "stabbed"],
+    "Civil": ["contract", "agreement", "refund", "damages", "compensation", "recovery suit", "consumer",
+              "defective product", "warranty", "insurance claim", "deficiency in service", "negligence",
+              "accident claim", "defamation", "money recovery", "invoice", "supplier"],
+    "Constitutional": ["writ", "high court", "fundamental rights", "government order", "municipal corporation",
+                       "notification", "arbitrary", "discrimination", "public interest", "licence cancelled",
+                       "without hearing", "natural justice", "demolished", "state authority"],
+    "Family": ["husband", "wife", "marriage", "divorce", "dowry", "in-laws", "maintenance", "custody",
+               "child", "alimony", "domestic violence", "matrimonial", "separation", "stridhan"],
+    "Corporate": ["company", "directors", "shareholders", "board", "insolvency", "nclt", "creditors",
+                  "debenture", "merger", "joint venture", "funds siphoned", "minority shareholder", "startup"],
+    "Property": ["landlord", "tenant", "rent", "lease", "evict", "flat", "plot", "land", "possession",
+                 "sale deed", "encroachment", "partition", "builder", "title", "mutation", "house"],
+    "Labor": ["employer", "employee", "salary", "wages", "fired", "terminated", "gratuity", "provident fund",
+              "workman", "factory", "labour court", "resignation", "appointment letter", "bonus", "overtime"],
+    "Tax": ["income tax", "gst", "tax notice", "assessment", "reassessment", "penalty", "refund of tax",
+            "return of income", "deduction", "tds", "assessing officer", "tax demand", "input tax credit"],
+}
+KEYWORD_SENTENCES = [
+    "I need help with {a} and {b}.",
+    "My problem is about {a}.",
+    "There is an issue of {a}, {b} and {c}.",
+    "They told me about {a} and {b}.",
+    "What can I do about the {a}?",
+]
+
+# Case type of the matters each bundled act mostly arises in
+ACT_CASE_TYPES = {
+    "IPC": "Criminal", "CrPC": "Criminal", "IEA": "Criminal", "NIA": "Criminal", "POCSO": "Criminal",
+    "PCA": "Criminal", "ITA": "Criminal", "ICA": "Civil", "SRA": "Civil", "CPC": "Civil", "CPA": "Civil",
+    "MVA": "Civil", "LA": "Civil", "HMA": "Family", "DPA": "Family", "PWDVA": "Family", "TPA": "Property",
+    "IDA": "Labor", "PGA": "Labor", "ACA": "Corporate", "CA": "Corporate", "IBC": "Corporate",
+    "COI": "Constitutional", "ITAX": "Tax",
+}
+
+EPOCHS = 12
+LEARNING_RATE = 0.5
+L2 = 1e-5
+MIN_FEATURE_DOCS = 2
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        name=rng.choice(NAMES), name2=rng.choice(NAMES), company=rng.choice(COMPANIES),
+        place=rng.choice(PLACES), amount=f"{rng.randint(1, 99)},{rng.randint(100, 999)}",
+        date=f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.20{rng.randint(15, 25)}",
+    )
+
+
+def _keyword_sentence(case_type: str, rng: random.Random) -> str:
+    a, b, c = rng.sample(KEYWORDS[case_type], 3)
+    return rng.choice(KEYWORD_SENTENCES).format(a=a, b=b, c=c)
+
+
+def synthetic_case(case_type: str, rng: random.Random) -> str:
+    sentences = [_fill(s, rng) for s in rng.sample(TEMPLATES[case_type], rng.randint(1, 4))]
+    sentences += [_keyword_sentence(case_type, rng) for _ in range(rng.randint(0, 2))]
+    sentences += [_fill(s, rng) for s in rng.sample(FILLER, rng.randint(0, 3))]
+    rng.shuffle(sentences)
+    return " ".join(sentences)
+
+
+def synthetic_corpus(per_type: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """(case_text, case_type) pairs, `per_type` of each type"""
+    rng = random.Random(seed)
+    return [(synthetic_case(t, rng), t) for _ in range(per_type) for t in CASE_TYPES]
+
+
+def _statute_corpus() -> List[Tuple[str, str]]:
+    from app.law_mapping.section_mapper import ACTS_DB_PATH
+    with open(ACTS_DB_PATH) as f:
+        corpus = json.load(f)
+    return [
+        (f"{s['title']}. {s['text']} {s.get('keywords', '')}", ACT_CASE_TYPES[s["act"]])
+        for s in corpus["sections"]
+    ]
+
+
+def train(examples: List[Tuple[str, str]], seed: int = 0) -> dict:
+    """Multinomial logistic regression by SGD over sparse features"""
+    samples = [(case_features(text), CASE_TYPES.index(label)) for text, label in examples]
+    doc_freq: Dict[str, int] = {}
+    for features, _ in samples:
+        for name in features:
+            doc_freq[name] = doc_freq.get(name, 0) + 1
+    vocabulary = sorted(name for name, count in doc_freq.items() if count >= MIN_FEATURE_DOCS)
+    weights = {name: [0.0] * len(CASE_TYPES) for name in vocabulary}
+    bias = [0.0] * len(CASE_TYPES)
+
+    rng = random.Random(seed)
+    for epoch in range(EPOCHS):
+        rng.shuffle(samples)
+        rate = LEARNING_RATE / (1 + epoch)
+        for features, label in samples:
+            active = [(weights[n], v) for n, v in features.items() if n in weights]
+            logits = [bias[c] + sum(w[c] * v for w, v in active) for c in range(len(CASE_TYPES))]
+            top = max(logits)
+            exps = [math.exp(z - top) for z in logits]
+            total = sum(exps)
+            for c in range(len(CASE_TYPES)):
+                gradient = exps[c] / total - (1.0 if c == label else 0.0)
+                bias[c] -= rate * gradient
+                for w, v in active:
+                    w[c] -= rate * (gradient * v + L2 * w[c])
+
+    return {
+        "classes": list(CASE_TYPES),
+        "bias": [round(b, 4) for b in bias],
+        "weights": {
+            name: [round(x, 4) for x in w] for name, w in sorted(weights.items()) if max(map(abs, w)) >= 0.01
+        },
+    }
+
+
+def accuracy(model_predict, examples: List[Tuple[str, str]]) -> float:
+    return sum(1 for text, label in examples if model_predict(text) == label) / max(1, len(examples))
+
+
+if __name__ == "__main__":
+    from app.core.case_classifier import CaseClassifier
+
+    model = train(synthetic_corpus(per_type=300, seed=0) + _statute_corpus())
+    with open(MODEL_PATH, "w") as f:
+        json.dump(model, f, separators=(",", ":"))
+        f.write("\n")
+
+    classifier = CaseClassifier(model)
+    held_out = synthetic_corpus(per_type=100, seed=1)
+    print(f"{len(model['weights'])} features, held-out synthetic accuracy "
+          f"{accuracy(lambda text: classifier.predict(text)['case_type'], held_out):.3f}")
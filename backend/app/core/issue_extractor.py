@@ -0,0 +1,82 @@
+import re
+from typing import List, Optional
+
+MAX_CANDIDATE_ISSUES = 8
+# Statute sections scoring below this are too weak a match to raise an issue
+MIN_SECTION_SCORE = 8.0
+
+# (pattern, issue, importance); checked in order, each raises its issue once
+_ISSUE_RULES = [
+    (r"\bcheque\b.{0,80}\b(?:bounced?|dishono[u]?red|returned unpaid|insufficient funds)",
+     "Liability for dishonour of cheque", "High"),
+    (r"\b(?:cheat\w*|fraud\w*|deceiv\w*|induced|absconded)\b", "Whether the accused had dishonest intention from the inception", "High"),
+    (r"\bentrust\w*|misappropriat\w*|breach of trust", "Criminal breach of trust over entrusted property", "High"),
+    (r"\bdowry\b", "Harassment and cruelty for dowry", "High"),
+    (r"\b(?:beat|assault\w*|attack\w*|injur\w*|hurt)\b", "Causing hurt or assault", "Medium"),
+    (r"\b(?:murder\w*|killed|death of|deceased)\b", "Culpability for the death", "High"),
+    (r"\b(?:anticipatory bail|bail)\b", "Grant of bail", "High"),
+    (r"\bquash\w*", "Quashing of the criminal proceedings", "Medium"),
+    (r"\b(?:arrest\w*|detention|detained|custody)\b", "Legality of the arrest or detention", "Medium"),
+    (r"\bbreach of (?:the )?contract|failed to deliver|not delivered|non[- ]performance",
+     "Breach of contract and the damages recoverable", "High"),
+    (r"\bspecific performance|agreement to sell", "Entitlement to specific performance", "High"),
+    (r"\binjunction|encroach\w*|dispossess\w*", "Protection of possession by injunction", "High"),
+    (r"\b(?:evict\w*|vacate|arrears of rent|tenant)\b", "Grounds for eviction of the tenant", "Medium"),
+    (r"\bpartition|ancestral property|co-?owner", "Shares of the co-owners in partition", "Medium"),
+    (r"\b(?:forged|forgery|fabricated)\b", "Genuineness of the documents relied on", "High"),
+    (r"\bdivorce|desert\w*|cruelty", "Grounds for divorce or matrimonial relief", "High"),
+    (r"\bmaintenance|alimony", "Entitlement to and quantum of maintenance", "Medium"),
+    (r"\bcustody\b.{0,40}\b(?:child|minor|son|daughter)\b|\b(?:child|minor)\b.{0,40}\bcustody\b",
+     "Custody of the minor child", "High"),
+    (r"\bdomestic violence|matrimonial home|protection order", "Reliefs against domestic violence", "High"),
+    (r"\b(?:terminat\w*|dismiss\w*|retrench\w*)\b.{0,60}\b(?:service|employ\w*|workm[ae]n)",
+     "Legality of the termination of employment", "High"),
+    (r"\bsalary|wages|gratuity|provident fund", "Recovery of unpaid wages and terminal dues", "Medium"),
+    (r"\bdeficien\w*|defective|consumer", "Deficiency in service or defect in goods", "Medium"),
+    (r"\bnegligen\w*", "Negligence and resulting liability", "Medium"),
+    (r"\bdefam\w*|reputation", "Defamation and its defences", "Medium"),
+    (r"\barticle\s+(?:14|19|21|226|32)\b|fundamental right|writ", "Violation of fundamental rights", "High"),
+    (r"\binsolvency|\bibc\b|\bnclt\b|default\w* on repayment", "Initiation of insolvency proceedings", "High"),
+    (r"\boppression|mismanagement", "Oppression and mismanagement of the company", "High"),
+    (r"\barbitrat\w*", "Reference of the dispute to arbitration", "Medium"),
+    (r"\b(?:reassessment|assessing officer|gst|income tax|tax demand)\b", "Validity of the tax demand or reassessment", "High"),
+    (r"\blimitation|time[- ]barred|\bdelay\b", "Whether the claim is within limitation", "High"),
+    (r"\bjurisdiction", "Jurisdiction of the forum", "Medium"),
+    (r"\blegal notice|demand notice", "Compliance with the statutory notice requirement", "Medium"),
+]
+# Patterns are lowercase and run over lowercased text, which is much faster than IGNORECASE
+_COMPILED_RULES = [(re.compile(pattern, re.DOTALL), issue, importance) for pattern, issue, importance in _ISSUE_RULES]
+
+_CONTEXT_CHARS = 80
+
+
+def _snippet(text: str, start: int, end: int) -> str:
+    return " ".join(text[max(0, start - _CONTEXT_CHARS):end + _CONTEXT_CHARS].split())
+
+
+def extract_issues(case_text: str, sections: Optional[List[dict]] = None) -> List[dict]:
+    """
+    Candidate legal issues in the LegalIssue shape, found by cue phrases in
+    the text and by the best matching statute sections (from map_sections).
+    These are hints for the lawyer and the prompt, not a legal analysis.
+    """
+    issues, seen = [], set()
+    lowered = case_text.lower()
+    for pattern, issue, importance in _COMPILED_RULES:
+        match = pattern.search(lowered)
+        if match and issue not in seen:
+            seen.add(issue)
+            issues.append({
+                "issue": issue,
+                "description": f"Raised by: \"{_snippet(case_text, match.start(), match.end())}\"",
+                "importance": importance,
+            })
+
+    for section in sections or []:
+        if section["score"] < MIN_SECTION_SCORE:
+            continue
+        issue = f"Applicability of {section['citation']}"
+        if issue not in seen:
+            seen.add(issue)
+            issues.append({"issue": issue, "description": section["title"], "importance": "Medium"})
+    return issues[:MAX_CANDIDATE_ISSUES]
@@ -0,0 +1,275 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.config import shared_state_enabled
+from app.database.db import get_db
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "512"))
+CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+CACHE_PERSIST = os.getenv("ANALYSIS_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+CACHE_COLLECTION = "analysis_cache"
+# How long one worker may hold a key it is computing before others give up
+# waiting and compute it themselves; a little over the Ollama timeout
+CACHE_LEASE_SECONDS = float(os.getenv("ANALYSIS_CACHE_LEASE_SECONDS", "330"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_case_text(case_text: str) -> str:
+    """Collapse whitespace so trivially re-formatted submissions share a key"""
+    return _WHITESPACE_RE.sub(" ", case_text).strip()
+
+
+def make_cache_key(case_text: str, prompt_version: str, model: str, scope: str = "") -> str:
+    """
+    Content-address an analysis by normalized case text, prompt template
+    version and model name. A `scope` (e.g. an owner) keeps analyses that
+    drew on that owner's other cases apart from everyone else's.
+    """
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, scope, normalize_case_text(case_text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class MongoCacheTier:
+    """
+    Optional persistent tier in the ai_lawyer database. Documents expire
+    through a TTL index on `expires_at`. Failures are logged and treated
+    as misses so the cache never breaks an analysis.
+
+    Also extends single-flight across processes: a worker computing a key
+    holds a lease document for it, and other workers wait for its result
+    instead of computing the same analysis again.
+    """
+
+    def __init__(self, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._collection = None
+        self._indexed = False
+        # Identifies this process's leases
+        self._owner = uuid.uuid4().hex
+
+    async def _get_collection(self):
+        if self._collection is None:
+            self._collection = get_db()[CACHE_COLLECTION]
+        if not self._indexed:
+            await self._collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        return self._collection
+
+    async def get(self, key: str) -> Optional[dict]:
+        try:
+            collection = await self._get_collection()
+            doc = await collection.find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+                {"result": 1},
+            )
+            return doc["result"] if doc else None
+        except Exception as e:
+            logger.warning(f"Persistent analysis cache read failed: {e}")
+            return None
+
+    async def lease(self, key: str) -> bool:
+        """Claim the computation of `key`; False if another process holds it"""
+        try:
+            collection = await self._get_collection()
+            now = datetime.utcnow()
+            # The TTL monitor only runs once a minute: clear an expired lease ourselves
+            await collection.delete_one({"_id": f"lease:{key}", "expires_at": {"$lte": now}})
+            await collection.insert_one(
+                {"_id": f"lease:{key}", "owner": self._owner, "expires_at": now + timedelta(seconds=CACHE_LEASE_SECONDS)}
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+        except Exception as e:
+            logger.warning(f"Persistent analysis cache lease failed: {e}")
+            return True
+
+    async def release(self, key: str) -> None:
+        try:
+            collection = await self._get_collection()
+            await collection.delete_one({"_id": f"lease:{key}", "owner": self._owner})
+        except Exception as e:
+            logger.warning(f"Persistent analysis cache lease release failed: {e}")
+
+    async def wait(self, key: str, timeout: float = CACHE_LEASE_SECONDS) -> Optional[dict]:
+        """
+        Poll for the result of a computation another process holds the
+        lease for. None if it gave up (the lease is gone without a result)
+        or `timeout` passed.
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.1
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(2.0, delay * 2)
+            value = await self.get(key)
+            if value is not None:
+                return value
+            try:
+                collection = await self._get_collection()
+                if await collection.find_one({"_id": f"lease:{key}"}, {"_id": 1}) is None:
+                    return await self.get(key)
+            except Exception as e:
+                logger.warning(f"Persistent analysis cache read failed: {e}")
+                return None
+        return None
+
+    async def set(self, key: str, value: dict) -> None:
+        try:
+            collection = await self._get_collection()
+            expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            await collection.replace_one(
+                {"_id": key},
+                {"_id": key, "result": value, "expires_at": expires_at},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Persistent analysis cache write failed: {e}")
+
+
+class AnalysisCache:
+    """
+    Two-tier analysis result cache: an in-process LRU with TTL expiry,
+    optionally backed by MongoDB. Concurrent lookups of the same key share
+    a single in-flight computation (single-flight).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        persistent: Optional[MongoCacheTier] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: dict = {}
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # Served from another worker's computation of the same key
+        self.remote_coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return a copy of the in-memory entry for `key`, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Return the cached analysis for `key`, or run `compute` once and cache
+        its result. Callers arriving while a computation is in flight await
+        that computation instead of starting their own.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # Run as its own task so one caller disconnecting does not
+            # cancel the computation the other callers are waiting on
+            task = asyncio.ensure_future(self._load(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        value = await asyncio.shield(task)
+        return copy.deepcopy(value)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+        if self.persistent is not None:
+            value = await self.persistent.get(key)
+            if value is not None:
+                self.persistent_hits += 1
+                self.set(key, value)
+                return value
+
+            if not await self.persistent.lease(key):
+                # Another worker is computing it
+                value = await self.persistent.wait(key)
+                if value is not None:
+                    self.remote_coalesced += 1
+                    self.set(key, value)
+                    return value
+                # It failed or timed out: compute it here
+                await self.persistent.lease(key)
+
+        self.misses += 1
+        try:
+            value = await compute()
+            self.set(key, value)
+            if self.persistent is not None:
+                await self.persistent.set(key, value)
+        finally:
+            if self.persistent is not None:
+                await self.persistent.release(key)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            task.exception()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self.persistent is not None,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "remote_coalesced": self.remote_coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Workers sharing state share the persistent tier, and with it their results
+analysis_cache = AnalysisCache(persistent=MongoCacheTier() if CACHE_PERSIST or shared_state_enabled() else None)
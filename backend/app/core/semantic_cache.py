@@ -0,0 +1,194 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.core.chunked_analyzer import split_sentences
+from app.core.result_cache import normalize_case_text
+from app.core.vector_index import VectorIndex
+from app.database import case_repository
+from app.llm.embeddings import embed_text, embedding_model_name
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# At or above this cosine similarity a stored analysis is a candidate: it
+# is reused as is if no sentence changed, else updated for the changed ones
+SEMANTIC_SEED_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_SEED_THRESHOLD", "0.85"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+# Brute-force search over 5000 x 1024 floats takes about 2ms;
+# approximate (LSH) search only pays off far beyond that
+SEMANTIC_CACHE_ANN_MIN_ROWS = int(os.getenv("SEMANTIC_CACHE_ANN_MIN_ROWS", "20000"))
+# Vectors of recent lookups kept so the request can persist them with its case
+_RECENT_VECTORS = 256
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class SemanticMatch(NamedTuple):
+    score: float
+    analysis: dict
+    case_text: str
+
+
+def _text_key(case_text: str) -> str:
+    return hashlib.sha256(normalize_case_text(case_text).encode("utf-8")).hexdigest()
+
+
+def sentence_diff(old_text: str, new_text: str) -> Tuple[List[str], List[str]]:
+    """(sentences only in new_text, sentences only in old_text), whitespace and case insensitive"""
+    def index(text):
+        # Spacing is ignored entirely, so "agreement ," matches "agreement,"
+        return {_WHITESPACE_RE.sub("", s).lower(): s for s in split_sentences(text)}
+
+    old, new = index(old_text), index(new_text)
+    added = [sentence for key, sentence in new.items() if key not in old]
+    removed = [sentence for key, sentence in old.items() if key not in new]
+    return added, removed
+
+
+class SemanticCache:
+    """
+    Near-duplicate lookup of earlier analyses by embedding similarity.
+
+    Entries are scoped to their owner (a user id): a lookup only matches
+    the same user's earlier cases, since a seeded analysis keeps sections
+    of the matched case. Callers without an owner are never served.
+    Entries added while the app runs keep their analysis in memory.
+    Entries reloaded from the `cases` collection hold only the case id and
+    fetch the analysis when they are matched. Embedding failures are
+    logged and treated as misses.
+    """
+
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES, ann_min_rows: int = SEMANTIC_CACHE_ANN_MIN_ROWS):
+        self.max_entries = max_entries
+        self.ann_min_rows = ann_min_rows
+        self.model = embedding_model_name()
+        # Created on the first vector, once the dimension is known
+        self.index: Optional[VectorIndex] = None
+        self._entries: Dict[str, dict] = {}
+        self._recent_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._load_task: Optional[asyncio.Task] = None
+        self.reloaded = 0
+        # Matches reused as is and matches updated for changed sentences;
+        # only the caller's sentence diff can tell them apart
+        self.hits = 0
+        self.seeded = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def lookup(self, case_text: str, owner: str) -> Optional[SemanticMatch]:
+        """The owner's most similar stored analysis scoring at least SEMANTIC_SEED_THRESHOLD, or None"""
+        key = _text_key(case_text)
+        try:
+            vector = await embed_text(case_text)
+        except RuntimeError as e:
+            logger.warning(f"⚠️ Semantic cache embedding failed: {e}")
+            self.errors += 1
+            return None
+        self._recent_vectors[key] = vector
+        self._recent_vectors.move_to_end(key)
+        while len(self._recent_vectors) > _RECENT_VECTORS:
+            self._recent_vectors.popitem(last=False)
+
+        best = self.index.search(vector, 1, group=owner) if self.index is not None else []
+        if not best or best[0][1] < SEMANTIC_SEED_THRESHOLD:
+            self.misses += 1
+            return None
+        match_key, score = best[0]
+        entry = await self._entry(match_key)
+        if entry is None:
+            self.misses += 1
+            return None
+        return SemanticMatch(score, copy.deepcopy(entry["analysis"]), entry["case_text"])
+
+    async def _entry(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or "case_id" not in entry:
+            return entry
+        try:
+            doc = await case_repository.get_case(entry["case_id"])
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache could not fetch case {entry['case_id']}: {e}")
+            return None
+        if not doc or not doc.get("analysis"):
+            return None
+        entry = {"analysis": doc["analysis"], "case_text": doc["case_text"]}
+        if key in self._entries:
+            self._entries[key] = entry
+        return entry
+
+    def add(self, case_text: str, analysis: dict, owner: str) -> None:
+        """Index the owner's analysis under the vector computed by the lookup for the same text"""
+        vector = self._recent_vectors.get(_text_key(case_text))
+        if vector is not None:
+            entry = {"analysis": copy.deepcopy(analysis), "case_text": case_text}
+            self._insert(f"{owner}:{_text_key(case_text)}", vector, owner, entry)
+
+    def _insert(self, key: str, vector: np.ndarray, owner: str, entry: dict) -> None:
+        if self.index is None:
+            self.index = VectorIndex(len(vector), self.max_entries, self.ann_min_rows)
+        if len(vector) != self.index.dim:
+            return
+        evicted = self.index.add(key, vector, group=owner)
+        if evicted is not None:
+            self._entries.pop(evicted, None)
+        self._entries[key] = entry
+
+    def embedding_fields(self, case_text: str) -> dict:
+        """Fields to store with the case document so the entry survives a restart"""
+        vector = self._recent_vectors.get(_text_key(case_text))
+        if vector is None:
+            return {}
+        return {"embedding": vector.tobytes(), "embedding_model": self.model}
+
+    async def load(self) -> None:
+        """Index the newest persisted cases of signed-in users embedded with the current model"""
+        loaded = 0
+        cursor = case_repository.find_embeddings(self.model, self.max_entries)
+        # Newest first: if the index overflows the oldest are the ones overwritten
+        rows = [(str(doc["_id"]), str(doc["owner_id"]), doc["embedding"]) async for doc in cursor]
+        for case_id, owner, embedding in reversed(rows):
+            key = f"case:{case_id}"
+            if key not in self._entries:
+                self._insert(key, np.frombuffer(embedding, dtype=np.float32), owner, {"case_id": case_id})
+                loaded += 1
+        self.reloaded += loaded
+        logger.info(f"🧠 Semantic cache reloaded {loaded} persisted analyses ({self.model})")
+
+    def start_loading(self) -> None:
+        """Reload in the background; lookups until then see only new entries"""
+        self._load_task = asyncio.create_task(self._load_safely())
+
+    async def _load_safely(self) -> None:
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache reload failed: {e}")
+
+    async def stop(self) -> None:
+        if self._load_task is not None:
+            self._load_task.cancel()
+            await asyncio.gather(self._load_task, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SEMANTIC_CACHE_ENABLED,
+            "model": self.model,
+            "entries": len(self.index) if self.index is not None else 0,
+            "max_entries": self.max_entries,
+            "ann": self.index.ann_enabled if self.index is not None else False,
+            "reloaded": self.reloaded,
+            "hits": self.hits,
+            "seeded": self.seeded,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+semantic_cache = SemanticCache()
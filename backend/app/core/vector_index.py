@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+INITIAL_ROWS = 256
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over L2-normalized float32 vectors.
+
+    Search is one batched matrix-vector product over all rows until the
+    index holds `ann_min_rows` vectors; from then on random-hyperplane LSH
+    (`lsh_tables` tables of `lsh_bits` bits) picks candidate rows and only
+    those are scored. LSH can miss a match, so leave it off (the default
+    threshold is above the default capacity) unless brute force is too slow.
+
+    Holds at most `capacity` vectors; beyond that the oldest is overwritten.
+    Each vector may belong to a group (e.g. its owner) that searches can be
+    restricted to. Not thread-safe: use it from the event loop.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        capacity: int,
+        ann_min_rows: int,
+        lsh_tables: int = 16,
+        lsh_bits: int = 12,
+        seed: int = 0,
+    ):
+        self.dim = dim
+        self.capacity = capacity
+        self.ann_min_rows = ann_min_rows
+        self.lsh_tables = lsh_tables
+        self.lsh_bits = lsh_bits
+        self._rng = np.random.default_rng(seed)
+        self._matrix = np.zeros((min(capacity, INITIAL_ROWS), dim), dtype=np.float32)
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Group of each row as a small integer, so searches filter with one comparison
+        self._groups = np.full(len(self._matrix), -1, dtype=np.int64)
+        self._group_ids: Dict[str, int] = {}
+        # Next row to overwrite once the index is full
+        self._oldest = 0
+        self._planes: Optional[np.ndarray] = None
+        self._signatures: Optional[np.ndarray] = None
+        self._buckets: List[Dict[int, set]] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def ann_enabled(self) -> bool:
+        return self._planes is not None
+
+    def add(self, key: str, vector: np.ndarray, group: Optional[str] = None) -> Optional[str]:
+        """
+        Insert or replace the vector for `key`, in `group` if given
+
+        Returns:
+            the key evicted to make room, if any
+        """
+        evicted = None
+        row = self._rows.get(key)
+        if row is None:
+            if len(self._keys) < self.capacity:
+                row = len(self._keys)
+                if row == len(self._matrix):
+                    grown = np.zeros((min(self.capacity, 2 * row), self.dim), dtype=np.float32)
+                    grown[:row] = self._matrix
+                    self._matrix = grown
+                    self._groups = np.concatenate([self._groups, np.full(len(grown) - row, -1, dtype=np.int64)])
+                self._keys.append(key)
+            else:
+                row = self._oldest
+                self._oldest = (row + 1) % self.capacity
+                evicted = self._keys[row]
+                del self._rows[evicted]
+                self._keys[row] = key
+            self._rows[key] = row
+        if self._planes is not None:
+            self._unbucket(row)
+
+        self._matrix[row] = vector
+        self._groups[row] = -1 if group is None else self._group_ids.setdefault(group, len(self._group_ids))
+        if self._planes is not None:
+            self._bucket(row)
+        elif len(self._keys) >= self.ann_min_rows:
+            self._build_lsh()
+        return evicted
+
+    def search(self, vector: np.ndarray, k: int = 1, group: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Up to `k` (key, cosine similarity) pairs, most similar first, only from `group` if given"""
+        count = len(self._keys)
+        if not count:
+            return []
+        rows = None
+        if group is not None:
+            group_id = self._group_ids.get(group)
+            if group_id is None:
+                return []
+            rows = np.flatnonzero(self._groups[:count] == group_id)
+        if self._planes is not None:
+            signatures = self._signature(vector[None, :])[0]
+            candidates = set()
+            for table, signature in enumerate(signatures):
+                candidates.update(self._buckets[table].get(int(signature), ()))
+            if candidates:
+                candidates = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+                rows = candidates if rows is None else np.intersect1d(rows, candidates)
+        if rows is not None and not len(rows):
+            return []
+
+        scores = self._matrix[:count] @ vector if rows is None else self._matrix[rows] @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._keys[i if rows is None else rows[i]], float(scores[i])) for i in top]
+
+    def _signature(self, vectors: np.ndarray) -> np.ndarray:
+        """LSH signatures, shape (len(vectors), lsh_tables)"""
+        bits = (vectors @ self._planes.T > 0).reshape(len(vectors), self.lsh_tables, self.lsh_bits)
+        return bits.astype(np.int64) @ (1 << np.arange(self.lsh_bits, dtype=np.int64))
+
+    def _build_lsh(self) -> None:
+        self._planes = self._rng.standard_normal((self.lsh_tables * self.lsh_bits, self.dim)).astype(np.float32)
+        self._buckets = [{} for _ in range(self.lsh_tables)]
+        self._signatures = np.zeros((len(self._matrix), self.lsh_tables), dtype=np.int64)
+        count = len(self._keys)
+        self._signatures[:count] = self._signature(self._matrix[:count])
+        for row in range(count):
+            self._add_to_buckets(row)
+
+    def _bucket(self, row: int) -> None:
+        if row >= len(self._signatures):
+            grown = np.zeros((len(self._matrix), self.lsh_tables), dtype=np.int64)
+            grown[:len(self._signatures)] = self._signatures
+            self._signatures = grown
+        self._signatures[row] = self._signature(self._matrix[row][None, :])[0]
+        self._add_to_buckets(row)
+
+    def _add_to_buckets(self, row: int) -> None:
+        for table, signature in enumerate(self._signatures[row]):
+            self._buckets[table].setdefault(int(signature), set()).add(row)
+
+    def _unbucket(self, row: int) -> None:
+        if row >= len(self._signatures):
+            return
+        for table, signature in enumerate(self._signatures[row]):
+            bucket = self._buckets[table].get(int(signature))
+            if bucket is not None:
+                bucket.discard(row)
@@ -0,0 +1,174 @@
+import base64
+import json
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+from app.database.db import get_db
+
+logger = logging.getLogger(__name__)
+
+CASES_COLLECTION = "cases"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Fields a history listing may return; case_text and the analysis blob
+# are never loaded for lists
+LIST_FIELDS = ("title", "case_type", "case_summary", "issues", "owner_id", "created_at")
+DEFAULT_LIST_FIELDS = ("title", "case_type", "case_summary", "created_at")
+
+_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def persistence_enabled() -> bool:
+    return bool(os.getenv("MONGODB_URI"))
+
+
+def _collection():
+    return get_db()[CASES_COLLECTION]
+
+
+async def ensure_case_indexes(collection=None) -> None:
+    """
+    Indexes backing the history queries. Every list query sorts on
+    (created_at, _id) so keyset pagination is an index range scan.
+    """
+    collection = collection if collection is not None else _collection()
+    await collection.create_index(
+        [("owner_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="owner_created",
+    )
+    await collection.create_index(
+        [("case_type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="type_created",
+    )
+    await collection.create_index([("created_at", DESCENDING), ("_id", DESCENDING)], name="created")
+    await collection.create_index(
+        [("case_summary", TEXT), ("issues", TEXT)],
+        name="summary_issues_text",
+    )
+    # Semantic cache reload: newest embedded cases per embedding model
+    await collection.create_index(
+        [("embedding_model", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="embedding_created",
+        partialFilterExpression={"embedding_model": {"$exists": True}},
+    )
+
+
+def case_document(
+    case_text: str,
+    analysis: dict,
+    owner_id: Optional[ObjectId] = None,
+    title: Optional[str] = None,
+    embedding: Optional[bytes] = None,
+    embedding_model: Optional[str] = None,
+) -> dict:
+    """Build a `cases` document (CaseModel fields plus the full analysis)"""
+    doc = {
+        "title": title,
+        "case_text": case_text,
+        "case_type": analysis.get("case_type"),
+        "case_summary": analysis.get("case_summary"),
+        "issues": [i.get("issue") for i in analysis.get("legal_issues", []) if isinstance(i, dict) and i.get("issue")],
+        "laws": analysis.get("applicable_laws", []),
+        "analysis": analysis,
+        "owner_id": owner_id,
+        "created_at": datetime.utcnow(),
+    }
+    if embedding is not None:
+        # float32 bytes for the semantic cache
+        doc["embedding"] = embedding
+        doc["embedding_model"] = embedding_model
+    return doc
+
+
+async def save_case(
+    case_text: str,
+    analysis: dict,
+    owner_id: Optional[ObjectId] = None,
+    title: Optional[str] = None,
+    embedding: Optional[bytes] = None,
+    embedding_model: Optional[str] = None,
+) -> str:
+    result = await _collection().insert_one(
+        case_document(case_text, analysis, owner_id, title, embedding, embedding_model)
+    )
+    return str(result.inserted_id)
+
+
+async def get_case(case_id: str, fields: Optional[List[str]] = None) -> Optional[dict]:
+    if not ObjectId.is_valid(case_id):
+        return None
+    projection = {field: 1 for field in fields} if fields else None
+    return await _collection().find_one({"_id": ObjectId(case_id)}, projection)
+
+
+def find_embeddings(embedding_model: str, limit: int, collection=None):
+    """Cursor over the embeddings and owners of the newest owned cases embedded with `embedding_model`"""
+    collection = collection if collection is not None else _collection()
+    query = {"embedding_model": embedding_model, "owner_id": {"$ne": None}}
+    return collection.find(query, {"embedding": 1, "owner_id": 1}).sort(_SORT).limit(limit)
+
+
+def encode_cursor(doc: dict) -> str:
+    payload = json.dumps([doc["created_at"].isoformat(), str(doc["_id"])])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, case_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), ObjectId(case_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def list_cases(
+    owner_id: Optional[ObjectId] = None,
+    case_type: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[List[str]] = None,
+    unowned: bool = False,
+    collection=None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of case history, newest first, using keyset pagination on
+    (created_at, _id): the cost of a page does not grow with its depth.
+    With `unowned`, only cases analyzed without signing in are listed.
+
+    Returns:
+        (documents, next_cursor) where next_cursor is None on the last page
+    """
+    collection = collection if collection is not None else _collection()
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    query = {}
+    if owner_id is not None or unowned:
+        query["owner_id"] = owner_id
+    if case_type:
+        query["case_type"] = case_type
+    if search:
+        query["$text"] = {"$search": search}
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]
+
+    projection = {field: 1 for field in (fields or DEFAULT_LIST_FIELDS) if field in LIST_FIELDS}
+    # The sort keys are always needed to build the next cursor
+    projection["created_at"] = 1
+
+    # Fetch one extra document to learn whether another page exists
+    docs = await collection.find(query, projection).sort(_SORT).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
@@ -1,16 +1,35 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
-
 MONGODB_URI = os.getenv("MONGODB_URI")
+DATABASE_NAME = "ai_lawyer"
+
+_client = None
+
 
-if not MONGODB_URI:
-    raise RuntimeError("MONGODB_URI is not set")
+def get_client():
+    """
+    The process's MongoDB client, created on first use. Nothing connects at
+    import time, so the app imports (and gunicorn can preload it) without
+    MongoDB, and each worker gets its own client after the fork.
+
+    Raises:
+        RuntimeError: If MONGODB_URI is not set
+    """
+    global _client
+    if _client is None:
+        if not MONGODB_URI:
+            raise RuntimeError("MONGODB_URI is not set")
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _client = AsyncIOMotorClient(MONGODB_URI)
+    return _client
 
-client = AsyncIOMotorClient(MONGODB_URI)
-database = client["ai_lawyer"]
 
 def get_db():
-    return database
+    return get_client()[DATABASE_NAME]
+
+
+def close_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
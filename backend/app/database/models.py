@@ -10,7 +10,7 @@ class PyObjectId(ObjectId):
         yield cls.validate
 
     @classmethod
-    def validate(cls, v):
+    def validate(cls, v, _info=None):
         if not ObjectId.is_valid(v):
             raise ValueError("Invalid ObjectId")
         return ObjectId(v)
@@ -35,8 +35,13 @@ class CaseModel(BaseModel):
     title: Optional[str]
     case_text: str
     case_type: Optional[str]
+    case_summary: Optional[str] = None
     issues: Optional[List[str]] = []
     laws: Optional[List[dict]] = []
+    analysis: Optional[dict] = None
+    # Semantic cache vector (float32 bytes) and the model that produced it
+    embedding: Optional[bytes] = None
+    embedding_model: Optional[str] = None
     owner_id: Optional[PyObjectId]
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -0,0 +1,43 @@
+import logging
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from app.database.db import get_db
+from app.database.models import UserModel
+
+logger = logging.getLogger(__name__)
+
+USERS_COLLECTION = "users"
+
+
+def _collection():
+    return get_db()[USERS_COLLECTION]
+
+
+async def ensure_user_indexes(collection=None) -> None:
+    collection = collection if collection is not None else _collection()
+    await collection.create_index([("email", ASCENDING)], name="email_unique", unique=True)
+
+
+async def create_user(user: UserModel) -> Optional[str]:
+    """Insert a user; None if the email is already registered"""
+    try:
+        result = await _collection().insert_one(user.model_dump(by_alias=True))
+    except DuplicateKeyError:
+        return None
+    return str(result.inserted_id)
+
+
+async def get_user_by_email(email: str) -> Optional[UserModel]:
+    doc = await _collection().find_one({"email": email.lower()})
+    return UserModel(**doc) if doc else None
+
+
+async def get_user(user_id: str) -> Optional[UserModel]:
+    if not ObjectId.is_valid(user_id):
+        return None
+    doc = await _collection().find_one({"_id": ObjectId(user_id)})
+    return UserModel(**doc) if doc else None
@@ -0,0 +1,289 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.auth.quotas import analysis_quotas
+from app.core.analyzer import analyze_case_with_ai_async
+from app.jobs.store import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    create_job_store,
+    new_job,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+BATCH_MAX_ATTEMPTS = int(os.getenv("BATCH_MAX_ATTEMPTS", "3"))
+BATCH_RETRY_BASE_DELAY = float(os.getenv("BATCH_RETRY_BASE_DELAY", "5"))
+BATCH_RETRY_MAX_DELAY = float(os.getenv("BATCH_RETRY_MAX_DELAY", "300"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "500"))
+# A running item is handed to another worker if its own has not finished
+# it by then (the process died); longer than any single analysis
+BATCH_ITEM_LEASE_SECONDS = float(os.getenv("BATCH_ITEM_LEASE_SECONDS", "900"))
+# How often the store is scanned for items this process did not queue:
+# other workers' jobs, retries, and items of workers that died
+BATCH_SWEEP_INTERVAL = float(os.getenv("BATCH_SWEEP_INTERVAL", "30"))
+# Items held for a client with all its analysis slots busy are looked at
+# again when one of its items finishes, or after this long at the latest
+_QUOTA_RECHECK_SECONDS = 5.0
+
+
+class JobQueue:
+    """
+    Background batch analysis queue.
+
+    Jobs are persisted through `store`; each case in a job is a work item
+    on an in-process priority queue drained by a fixed pool of `workers`.
+    Provider-level concurrency and rate limits are enforced by the provider
+    scheduler the `process` callable goes through. Failed items are retried
+    with exponential backoff and jitter.
+
+    A worker claims an item in the store before running it, so with the
+    MongoDB store several processes can share the jobs: a periodic sweep
+    queues claimable items submitted elsewhere, unfinished jobs survive a
+    restart, and items of a process that died are picked up once their
+    lease expires.
+
+    Each item is charged to its job's owner when a worker picks it up: one
+    request from their rate limit and one of their analysis slots while it
+    runs, as for /case/analyze. Items over quota are held per client and
+    released one at a time as the quota frees up, so they never occupy a
+    worker while they wait.
+    """
+
+    def __init__(
+        self,
+        store,
+        process: Callable[[str], Awaitable[dict]],
+        workers: int = BATCH_WORKERS,
+        max_attempts: int = BATCH_MAX_ATTEMPTS,
+        quotas=analysis_quotas,
+    ):
+        self.store = store
+        self.process = process
+        self.workers = workers
+        self.max_attempts = max_attempts
+        # Owner of a job -> its ClientQuotas, or None if not limited
+        self.quotas = quotas
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._retry_handles: Dict[Tuple[str, int], asyncio.TimerHandle] = {}
+        self._cancelled: set = set()
+        # Items on the local queue or held for quota, so a sweep does not queue them twice
+        self._queued: set = set()
+        # Queue entries waiting for their owner's quota (a heap per client)
+        self._held: Dict[str, list] = {}
+        self._release_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.PriorityQueue()
+        recovered = await self.sweep()
+        if recovered:
+            logger.info(f"Recovered {recovered} unfinished batch items")
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._sweep_task = asyncio.create_task(self._sweep_periodically())
+
+    async def sweep(self) -> int:
+        """Queue claimable items from the store that are not queued here yet"""
+        found = 0
+        for job_id, priority, index, owner in await self.store.find_claimable():
+            key = (job_id, index)
+            if key not in self._queued and key not in self._running and key not in self._retry_handles:
+                self._enqueue(job_id, priority, index, owner)
+                found += 1
+        return found
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(BATCH_SWEEP_INTERVAL)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.warning(f"⚠️ Batch queue sweep failed: {e}")
+
+    async def stop(self) -> None:
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            await asyncio.gather(self._sweep_task, return_exceptions=True)
+            self._sweep_task = None
+        for handle in [*self._retry_handles.values(), *self._release_handles.values()]:
+            handle.cancel()
+        self._retry_handles.clear()
+        self._release_handles.clear()
+        self._held.clear()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, cases: List[dict], priority: int = 0, owner: Optional[dict] = None) -> dict:
+        """
+        Persist a new job and queue its cases; higher priority runs first.
+        Each case is charged to `owner`'s quota when it runs.
+        """
+        job = new_job(cases, priority, owner)
+        await self.store.insert(job)
+        for item in job["items"]:
+            self._enqueue(job["_id"], priority, item["index"], owner)
+        logger.info(f"Queued batch job {job['_id']} ({job['total']} cases, priority {priority})")
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.store.get(job_id)
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel queued and in-flight items of a job"""
+        if not await self.store.cancel(job_id):
+            return False
+        self._cancelled.add(job_id)
+        for (running_job, index), task in list(self._running.items()):
+            if running_job == job_id:
+                task.cancel()
+        for key in [k for k in self._retry_handles if k[0] == job_id]:
+            self._retry_handles.pop(key).cancel()
+        logger.info(f"Cancelled batch job {job_id}")
+        return True
+
+    def queued_items(self) -> int:
+        """Items waiting for a worker, including those held for their owner's quota"""
+        held = sum(len(entries) for entries in self._held.values())
+        return (self._queue.qsize() if self._queue is not None else 0) + held
+
+    def _enqueue(self, job_id: str, priority: int, index: int, owner: Optional[dict] = None) -> None:
+        self._queued.add((job_id, index))
+        self._queue.put_nowait((-priority, next(self._sequence), job_id, index, owner))
+
+    @staticmethod
+    def _client_key(owner: dict) -> str:
+        return f"{owner['kind']}:{owner['client']}"
+
+    async def _admit(self, quotas, owner: dict, entry: tuple) -> bool:
+        """Take a rate-limit request and an analysis slot for the item, or hold it"""
+        client = owner["client"]
+        if not quotas.start_analysis(client):
+            retry_after = _QUOTA_RECHECK_SECONDS
+        else:
+            retry_after = quotas.check_rate(client) or await quotas.check_shared_rate(client)
+            if not retry_after:
+                return True
+            quotas.finish_analysis(client)
+        self._hold(owner, entry, retry_after)
+        return False
+
+    def _hold(self, owner: dict, entry: tuple, delay: float) -> None:
+        key = self._client_key(owner)
+        self._queued.add((entry[2], entry[3]))
+        heapq.heappush(self._held.setdefault(key, []), entry)
+        if key not in self._release_handles:
+            self._release_handles[key] = asyncio.get_running_loop().call_later(delay, self._release, key)
+
+    def _release(self, key: str) -> None:
+        """Put the client's first held item back on the queue to try its quota again"""
+        handle = self._release_handles.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        held = self._held.get(key)
+        if not held:
+            return
+        self._queue.put_nowait(heapq.heappop(held))
+        if not held:
+            del self._held[key]
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> float:
+        delay = min(BATCH_RETRY_MAX_DELAY, BATCH_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _schedule_retry(self, job_id: str, priority: int, index: int, delay: float, owner: Optional[dict]) -> None:
+        def requeue():
+            self._retry_handles.pop((job_id, index), None)
+            if job_id not in self._cancelled:
+                self._enqueue(job_id, priority, index, owner)
+
+        self._retry_handles[(job_id, index)] = asyncio.get_running_loop().call_later(delay, requeue)
+
+    async def _worker(self) -> None:
+        while True:
+            entry = await self._queue.get()
+            neg_priority, _, job_id, index, owner = entry
+            self._queued.discard((job_id, index))
+            try:
+                if job_id in self._cancelled:
+                    continue
+                quotas = self.quotas(owner)
+                if quotas is not None and not await self._admit(quotas, owner, entry):
+                    continue
+                task = asyncio.create_task(self._process_item(job_id, -neg_priority, index, owner))
+                self._running[(job_id, index)] = task
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    if not task.cancelled():
+                        # The worker itself is being stopped
+                        task.cancel()
+                        raise
+                finally:
+                    self._running.pop((job_id, index), None)
+                    if quotas is not None:
+                        quotas.finish_analysis(owner["client"])
+                        # The slot is free: the client's next held item may run
+                        self._release(self._client_key(owner))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Batch worker error on {job_id}[{index}]: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process_item(self, job_id: str, priority: int, index: int, owner: Optional[dict] = None) -> None:
+        item = await self.store.claim_item(job_id, index, BATCH_ITEM_LEASE_SECONDS)
+        if item is None:
+            # Finished, cancelled, waiting out a retry delay or claimed by another worker
+            return
+
+        attempts = item["attempts"]
+        await self.store.update_job(job_id, {"status": RUNNING}, only_if_status=QUEUED)
+
+        try:
+            result = await self.process(item["case_text"])
+        except asyncio.CancelledError:
+            logger.info(f"Batch item {job_id}[{index}] cancelled")
+            raise
+        except Exception as e:
+            if attempts < self.max_attempts:
+                delay = self._retry_delay(attempts)
+                logger.warning(f"⚠️ Batch item {job_id}[{index}] failed (attempt {attempts}), retrying in {delay:.1f}s: {e}")
+                not_before = datetime.utcnow() + timedelta(seconds=delay)
+                await self.store.update_item(job_id, index, {"status": QUEUED, "error": str(e), "not_before": not_before})
+                self._schedule_retry(job_id, priority, index, delay, owner)
+                return
+            logger.error(f"❌ Batch item {job_id}[{index}] failed after {attempts} attempts: {e}")
+            counters = await self.store.update_item(
+                job_id, index, {"status": FAILED, "error": str(e)}, increment="failed"
+            )
+        else:
+            counters = await self.store.update_item(
+                job_id, index, {"status": COMPLETED, "result": result, "error": None}, increment="completed"
+            )
+
+        if counters and counters["status"] != CANCELLED and counters["completed"] + counters["failed"] >= counters["total"]:
+            status = FAILED if counters["completed"] == 0 else COMPLETED
+            await self.store.update_job(
+                job_id, {"status": status, "finished_at": datetime.utcnow()}, only_if_status=RUNNING
+            )
+            logger.info(f"Batch job {job_id} {status}: {counters['completed']} ok, {counters['failed']} failed")
+
+
+job_queue = JobQueue(create_job_store(), analyze_case_with_ai_async)
@@ -0,0 +1,271 @@
+import copy
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from pymongo import ASCENDING, ReturnDocument
+
+from app.database.db import get_db
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "jobs"
+JOB_ITEMS_COLLECTION = "job_items"
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+
+def new_job(cases: List[dict], priority: int, owner: Optional[dict] = None) -> dict:
+    """
+    Build a job document with one queued item per case. `owner` is the
+    quota client ({"kind", "client"}) each item is charged to when it runs.
+    """
+    now = datetime.utcnow()
+    return {
+        "_id": uuid.uuid4().hex,
+        "status": QUEUED,
+        "priority": priority,
+        "owner": owner,
+        "total": len(cases),
+        "completed": 0,
+        "failed": 0,
+        "created_at": now,
+        "updated_at": now,
+        "items": [
+            {
+                "index": i,
+                "title": case.get("title"),
+                "case_text": case["case_text"],
+                "status": QUEUED,
+                "attempts": 0,
+                "result": None,
+                "error": None,
+            }
+            for i, case in enumerate(cases)
+        ],
+    }
+
+
+def _claimable(item: dict, now: datetime) -> bool:
+    """Queued and past any retry delay, or running under an expired lease (its worker died)"""
+    if item["status"] == QUEUED:
+        return item.get("not_before") is None or item["not_before"] <= now
+    if item["status"] == RUNNING:
+        return item.get("lease_until") is None or item["lease_until"] <= now
+    return False
+
+
+def _claimable_query(now: datetime) -> dict:
+    """_claimable as a MongoDB filter on item documents"""
+    return {
+        "$or": [
+            {"status": QUEUED, "not_before": {"$not": {"$gt": now}}},
+            {"status": RUNNING, "lease_until": {"$not": {"$gt": now}}},
+        ]
+    }
+
+
+def _without_case_text(job: dict) -> dict:
+    job = copy.deepcopy(job)
+    for item in job["items"]:
+        item.pop("case_text", None)
+    return job
+
+
+class MemoryJobStore:
+    """Process-local job store, used when MongoDB is not configured"""
+
+    def __init__(self):
+        self._jobs = {}
+
+    async def insert(self, job: dict) -> None:
+        self._jobs[job["_id"]] = copy.deepcopy(job)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """Return the job without item case texts"""
+        job = self._jobs.get(job_id)
+        return _without_case_text(job) if job else None
+
+    async def get_item(self, job_id: str, index: int) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if not job or index >= len(job["items"]):
+            return None
+        return copy.deepcopy(job["items"][index])
+
+    async def claim_item(self, job_id: str, index: int, lease_seconds: float) -> Optional[dict]:
+        """Mark a claimable item running for this worker; return it, or None if not claimable"""
+        job = self._jobs.get(job_id)
+        now = datetime.utcnow()
+        if not job or job["status"] in TERMINAL_STATUSES or not _claimable(job["items"][index], now):
+            return None
+        item = job["items"][index]
+        item.update(status=RUNNING, attempts=item["attempts"] + 1, lease_until=now + timedelta(seconds=lease_seconds))
+        job["updated_at"] = now
+        return copy.deepcopy(item)
+
+    async def update_job(self, job_id: str, fields: dict, only_if_status: Optional[str] = None) -> None:
+        job = self._jobs.get(job_id)
+        if job and (only_if_status is None or job["status"] == only_if_status):
+            job.update(fields, updated_at=datetime.utcnow())
+
+    async def update_item(self, job_id: str, index: int, fields: dict, increment: Optional[str] = None) -> Optional[dict]:
+        """Update one item, optionally bump a job counter; return the job counters"""
+        job = self._jobs.get(job_id)
+        if not job:
+            return None
+        job["items"][index].update(fields)
+        if increment:
+            job[increment] += 1
+        job["updated_at"] = datetime.utcnow()
+        return {key: job[key] for key in ("status", "total", "completed", "failed")}
+
+    async def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if not job or job["status"] in TERMINAL_STATUSES:
+            return False
+        for item in job["items"]:
+            if item["status"] in (QUEUED, RUNNING):
+                item["status"] = CANCELLED
+        job.update(status=CANCELLED, updated_at=datetime.utcnow())
+        return True
+
+    async def find_claimable(self) -> List[Tuple[str, int, int, Optional[dict]]]:
+        """(job id, priority, item index, owner) of every item a worker could claim now"""
+        now = datetime.utcnow()
+        return [
+            (job["_id"], job["priority"], item["index"], job.get("owner"))
+            for job in self._jobs.values() if job["status"] in (QUEUED, RUNNING)
+            for item in job["items"] if _claimable(item, now)
+        ]
+
+
+class MongoJobStore:
+    """
+    Job store in the ai_lawyer database, shared by every worker process.
+    Job counters live in `jobs` and each case in its own `job_items`
+    document, so a large batch never nears MongoDB's 16 MB document limit
+    and finishing an item rewrites only that item. Items are claimed
+    atomically, so each runs once.
+    """
+
+    def __init__(self):
+        self._jobs = None
+        self._items = None
+
+    async def _collections(self):
+        if self._jobs is None:
+            db = get_db()
+            items = db[JOB_ITEMS_COLLECTION]
+            await db[JOBS_COLLECTION].create_index("status")
+            await items.create_index([("job_id", ASCENDING), ("index", ASCENDING)], unique=True)
+            await items.create_index("status")
+            self._jobs, self._items = db[JOBS_COLLECTION], items
+        return self._jobs, self._items
+
+    @staticmethod
+    def _item_id(job_id: str, index: int) -> str:
+        return f"{job_id}:{index}"
+
+    async def insert(self, job: dict) -> None:
+        jobs, items = await self._collections()
+        job = dict(job)
+        docs = [
+            {
+                **item,
+                "_id": self._item_id(job["_id"], item["index"]),
+                "job_id": job["_id"],
+                # Copied from the job so a sweep can queue items without it
+                "priority": job["priority"],
+                "owner": job.get("owner"),
+            }
+            for item in job.pop("items")
+        ]
+        # Items first: until the job exists they cannot be claimed
+        await items.insert_many(docs, ordered=False)
+        await jobs.insert_one(job)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """Return the job without item case texts"""
+        jobs, items = await self._collections()
+        job = await jobs.find_one({"_id": job_id})
+        if job is None:
+            return None
+        cursor = items.find({"job_id": job_id}, {"_id": 0, "job_id": 0, "priority": 0, "owner": 0, "case_text": 0})
+        job["items"] = await cursor.sort("index", ASCENDING).to_list(None)
+        return job
+
+    async def get_item(self, job_id: str, index: int) -> Optional[dict]:
+        _, items = await self._collections()
+        return await items.find_one({"_id": self._item_id(job_id, index)})
+
+    async def claim_item(self, job_id: str, index: int, lease_seconds: float) -> Optional[dict]:
+        """
+        Atomically mark a claimable item running for this worker and return
+        it, or None if it is not claimable (another worker got it first)
+        """
+        jobs, items = await self._collections()
+        if await jobs.find_one({"_id": job_id, "status": {"$nin": list(TERMINAL_STATUSES)}}, {"_id": 1}) is None:
+            return None
+        now = datetime.utcnow()
+        return await items.find_one_and_update(
+            {"_id": self._item_id(job_id, index), **_claimable_query(now)},
+            {
+                "$set": {"status": RUNNING, "lease_until": now + timedelta(seconds=lease_seconds)},
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def update_job(self, job_id: str, fields: dict, only_if_status: Optional[str] = None) -> None:
+        jobs, _ = await self._collections()
+        query = {"_id": job_id}
+        if only_if_status is not None:
+            query["status"] = only_if_status
+        await jobs.update_one(query, {"$set": {**fields, "updated_at": datetime.utcnow()}})
+
+    async def update_item(self, job_id: str, index: int, fields: dict, increment: Optional[str] = None) -> Optional[dict]:
+        """Update one item, optionally bump a job counter; return the job counters"""
+        jobs, items = await self._collections()
+        await items.update_one({"_id": self._item_id(job_id, index)}, {"$set": fields})
+        update = {"$set": {"updated_at": datetime.utcnow()}}
+        if increment:
+            update["$inc"] = {increment: 1}
+        return await jobs.find_one_and_update(
+            {"_id": job_id},
+            update,
+            projection={"status": 1, "total": 1, "completed": 1, "failed": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def cancel(self, job_id: str) -> bool:
+        jobs, items = await self._collections()
+        result = await jobs.update_one(
+            {"_id": job_id, "status": {"$nin": list(TERMINAL_STATUSES)}},
+            {"$set": {"status": CANCELLED, "updated_at": datetime.utcnow()}},
+        )
+        if result.modified_count == 0:
+            return False
+        await items.update_many(
+            {"job_id": job_id, "status": {"$in": [QUEUED, RUNNING]}}, {"$set": {"status": CANCELLED}}
+        )
+        return True
+
+    async def find_claimable(self) -> List[Tuple[str, int, int, Optional[dict]]]:
+        """(job id, priority, item index, owner) of every item a worker could claim now"""
+        _, items = await self._collections()
+        cursor = items.find(_claimable_query(datetime.utcnow()), {"job_id": 1, "priority": 1, "index": 1, "owner": 1})
+        return [(item["job_id"], item["priority"], item["index"], item.get("owner")) async for item in cursor]
+
+
+def create_job_store():
+    """Persist jobs in MongoDB when it is configured, otherwise keep them in memory"""
+    if os.getenv("MONGODB_URI"):
+        return MongoJobStore()
+    logger.warning("MONGODB_URI is not set: batch jobs are kept in memory and lost on restart")
+    return MemoryJobStore()
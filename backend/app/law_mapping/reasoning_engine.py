@@ -0,0 +1,84 @@
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from app.law_mapping.section_mapper import section_index
+
+logger = logging.getLogger(__name__)
+
+_NUMBER = r"\d+(?:-?[a-z](?![a-z]))?(?:\(\d+\))?"
+# "Section 420", "Sec. 138", "S. 498A", "u/s 302", "Sections 406 and 420"
+_SECTION_RE = re.compile(
+    rf"(?:\bsections?|\bsecs?\.?|\bs\.|\bu/s\.?)\s*({_NUMBER})"
+    rf"((?:\s*(?:,|/|and|&|r/w|read with)\s*{_NUMBER})*)",
+    re.IGNORECASE,
+)
+_NUMBER_RE = re.compile(_NUMBER, re.IGNORECASE)
+_ARTICLE_RE = re.compile(r"\b(?:article|art\.?)\s*(\d+[a-z]?)", re.IGNORECASE)
+# CPC "Order XXXIX Rule 1" / "O. 39 R. 1"
+_ORDER_RULE_RE = re.compile(r"\b(?:order|o\.)\s*([ivxlc]+|\d+)\s*,?\s*(?:rule|r\.)\s*(\d+)", re.IGNORECASE)
+_YEAR_RE = re.compile(r"1[89]\d\d|20\d\d")
+_ROMAN = {"i": 1, "v": 5, "x": 10, "l": 50, "c": 100}
+
+
+def _roman_to_int(numeral: str) -> int:
+    values = [_ROMAN[c] for c in numeral.lower()]
+    return sum(-v if i + 1 < len(values) and v < values[i + 1] else v for i, v in enumerate(values))
+
+def parse_citation(law: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Split a free-text citation into (act code, section numbers), e.g.
+    "Sections 406 and 420 IPC" -> ("IPC", ["406", "420"]).
+    Articles come back as "Art. N" and CPC orders as "O<order>R<rule>".
+    """
+    act = section_index.resolve_act(law)
+    sections = []
+    for match in _SECTION_RE.finditer(law):
+        sections.append(match.group(1))
+        sections.extend(_NUMBER_RE.findall(match.group(2)))
+    sections.extend(f"Art. {number}" for number in _ARTICLE_RE.findall(law))
+    for order, rule in _ORDER_RULE_RE.findall(law):
+        order = order if order.isdigit() else str(_roman_to_int(order))
+        sections.append(f"O{order}R{rule}")
+    if act and not sections:
+        # Bare numbers next to an act name ("IPC 420"), skipping enactment years
+        sections = [n for n in _NUMBER_RE.findall(law) if not _YEAR_RE.fullmatch(n)]
+    return act, [s.replace("-", "") for s in sections]
+
+
+def find_section(act: str, section: str) -> Optional[dict]:
+    """Look a section up in the statute index, falling back to its base number (156(3) -> 156)"""
+    found = section_index.lookup(act, section)
+    if found is None and "(" in section:
+        found = section_index.lookup(act, section.split("(", 1)[0])
+    return found
+
+
+def validate_applicable_laws(laws):
+    """
+    Check every cited law against the offline statute index.
+
+    Each entry gets `verified`: True when every section it cites exists in
+    the index under the named act, False otherwise (unknown act, no section
+    number, or a section the index does not contain). Entries are never
+    dropped, since the bundled corpus does not cover every statute.
+    """
+    if not isinstance(laws, list):
+        return laws
+    validated = []
+    for law in laws:
+        if not isinstance(law, dict):
+            validated.append(law)
+            continue
+        act, sections = parse_citation(str(law.get("law", "")))
+        matches = [find_section(act, s) for s in sections] if act else []
+        verified = bool(matches) and all(matches)
+        law = {**law, "verified": verified}
+        if verified and not law.get("description"):
+            law["description"] = "; ".join(m["title"] for m in matches)
+        validated.append(law)
+
+    unverified = sum(1 for law in validated if isinstance(law, dict) and not law["verified"])
+    if unverified:
+        logger.info(f"{unverified} of {len(validated)} cited laws not found in the statute index")
+    return validated
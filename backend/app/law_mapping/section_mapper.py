@@ -0,0 +1,289 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+ACTS_DB_PATH = os.path.join(_HERE, "acts_db.json")
+# Generated from acts_db.json on first use and rebuilt when the corpus changes
+SECTION_INDEX_PATH = os.getenv("SECTION_INDEX_PATH", os.path.join(_HERE, "sections.idx"))
+# Number of sections injected into the analysis prompt (0 disables grounding)
+SECTION_GROUNDING_K = int(os.getenv("SECTION_GROUNDING_K", "6"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Index file layout (little-endian):
+#   header: magic, format version, sha256 of acts_db.json, doc/term/posting counts
+#   u64[terms]      sorted term hashes
+#   u32[terms + 1]  offset of each term's postings
+#   u32[postings]   doc ids (ascending within a term)
+#   f32[postings]   precomputed BM25 weight of the term in that doc
+_MAGIC = b"SIDX"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sI32sIII12x")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and any are as at be been being by for from has have he her his in into is it its of on or "
+    "other shall she such that the their them then there these they this to was were which who whom "
+    "will with within without may not no so than under upon any all also one two act section sections "
+    "sec article code".split()
+)
+_SUFFIXES = ("ations", "ation", "ments", "ment", "ness", "ings", "ing", "ies", "ied", "ed", "s")
+
+
+@lru_cache(maxsize=65536)
+def _stem(token: str) -> str:
+    """Light suffix stripping so 'cheated', 'cheating' and 'cheat' share a term"""
+    if len(token) <= 4 or token[0].isdigit():
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            if suffix == "s" and token.endswith("ss"):
+                break
+            token = token[: -len(suffix)] + ("y" if suffix in ("ies", "ied") else "")
+            break
+    if len(token) > 4 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS or (len(token) < 2 and not token.isdigit()):
+            continue
+        tokens.append(_stem(token))
+    return tokens
+
+
+def _term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), "little")
+
+
+def _document_text(section: dict, act: dict) -> str:
+    # Title and keywords are repeated to weight them above the body text
+    return " ".join([
+        act["name"], " ".join(act.get("aliases", [])), section["section"],
+        section["title"], section["title"], section["text"],
+        section.get("keywords", ""), section.get("keywords", ""),
+    ])
+
+
+def section_key(section: str) -> str:
+    """Normalized section number: 'Art. 21' -> 'art21', '498 A' -> '498a'"""
+    return re.sub(r"[^a-z0-9()]", "", section.lower())
+
+
+def citation(section: dict) -> str:
+    """Human readable citation, e.g. 'Section 420 of the Indian Penal Code, 1860'"""
+    if not section["section"][0].isdigit() and " - " in section["title"]:
+        # Articles and CPC order/rule entries carry their citation in the title
+        return f"{section['title'].split(' - ', 1)[0]} of the {section['act_name']}"
+    return f"Section {section['section']} of the {section['act_name']}"
+
+
+def build_index(corpus: dict, corpus_hash: bytes) -> bytes:
+    """Serialize a BM25 inverted index over the corpus sections"""
+    acts = corpus["acts"]
+    docs = [Counter(tokenize(_document_text(s, acts[s["act"]]))) for s in corpus["sections"]]
+    lengths = [sum(doc.values()) for doc in docs]
+    avgdl = sum(lengths) / max(1, len(lengths))
+
+    postings: Dict[int, List[Tuple[int, int]]] = {}
+    for doc_id, doc in enumerate(docs):
+        for term, tf in doc.items():
+            postings.setdefault(_term_hash(term), []).append((doc_id, tf))
+
+    hashes = sorted(postings)
+    offsets, doc_ids, weights = [0], [], []
+    for term_hash in hashes:
+        entries = postings[term_hash]
+        idf = math.log(1 + (len(docs) - len(entries) + 0.5) / (len(entries) + 0.5))
+        for doc_id, tf in entries:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / avgdl)
+            doc_ids.append(doc_id)
+            weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+        offsets.append(len(doc_ids))
+
+    n_terms, n_postings = len(hashes), len(doc_ids)
+    return b"".join([
+        _HEADER.pack(_MAGIC, _FORMAT_VERSION, corpus_hash, len(docs), n_terms, n_postings),
+        struct.pack(f"<{n_terms}Q", *hashes),
+        struct.pack(f"<{n_terms + 1}I", *offsets),
+        struct.pack(f"<{n_postings}I", *doc_ids),
+        struct.pack(f"<{n_postings}f", *weights),
+    ])
+
+
+class SectionIndex:
+    """
+    Offline BM25 retrieval over the bundled statute corpus (acts_db.json).
+
+    The inverted index lives in a compact binary file that is memory-mapped
+    on first use, so loading it costs no parsing and the OS shares its pages
+    between worker processes. The file is rebuilt when it is missing, from
+    an older format, or built from a different corpus. Results are fully
+    deterministic: query terms are scored in sorted order and ties are
+    broken by corpus order.
+    """
+
+    def __init__(self, corpus_path: str = ACTS_DB_PATH, index_path: str = SECTION_INDEX_PATH):
+        self.corpus_path = corpus_path
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._sections: List[dict] = []
+        self._by_citation: Dict[Tuple[str, str], dict] = {}
+        self._alias_codes: Dict[str, str] = {}
+        self._alias_re: Optional[re.Pattern] = None
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.corpus_path, "rb") as f:
+                raw = f.read()
+            corpus = json.loads(raw)
+            corpus_hash = hashlib.sha256(raw).digest()
+
+            acts = corpus["acts"]
+            self._sections = [
+                {**section, "act_name": acts[section["act"]]["name"]} for section in corpus["sections"]
+            ]
+            self._by_citation = {
+                (s["act"], section_key(s["section"])): s for s in self._sections
+            }
+            self._alias_codes = {
+                alias.lower(): code for code, act in acts.items() for alias in act.get("aliases", [])
+            }
+            # Longest alias first, so "indian evidence act" wins over "evidence act"
+            alternatives = sorted(self._alias_codes, key=lambda alias: (-len(alias), alias))
+            self._alias_re = re.compile(rf"(?<![a-z])({'|'.join(map(re.escape, alternatives))})(?![a-z])")
+            self._map_index(corpus, corpus_hash)
+            self._loaded = True
+
+    def _map_index(self, corpus: dict, corpus_hash: bytes) -> None:
+        buffer = self._open_index(corpus_hash)
+        if buffer is None:
+            data = build_index(corpus, corpus_hash)
+            try:
+                tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.index_path)
+                logger.info(f"Built statute index: {len(self._sections)} sections, {len(data)} bytes")
+                buffer = self._open_index(corpus_hash)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write statute index to {self.index_path}, keeping it in memory: {e}")
+            if buffer is None:
+                buffer = data
+
+        view = memoryview(buffer)
+        _, _, _, _, n_terms, n_postings = _HEADER.unpack_from(view)
+        start = _HEADER.size
+        self._hashes = view[start:start + 8 * n_terms].cast("Q")
+        start += 8 * n_terms
+        self._offsets = view[start:start + 4 * (n_terms + 1)].cast("I")
+        start += 4 * (n_terms + 1)
+        self._doc_ids = view[start:start + 4 * n_postings].cast("I")
+        start += 4 * n_postings
+        self._weights = view[start:start + 4 * n_postings].cast("f")
+
+    def _open_index(self, corpus_hash: bytes) -> Optional[mmap.mmap]:
+        try:
+            with open(self.index_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            return None
+        magic, version, stored_hash, *_ = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or version != _FORMAT_VERSION or stored_hash != corpus_hash:
+            mapped.close()
+            return None
+        return mapped
+
+    def search(self, text: str, k: int) -> List[Tuple[int, float]]:
+        """Top-k (doc_id, score) for the text, best first"""
+        self.load()
+        scores: Dict[int, float] = {}
+        n_terms = len(self._hashes)
+        for term in sorted(set(tokenize(text))):
+            term_hash = _term_hash(term)
+            i = bisect_left(self._hashes, term_hash)
+            if i == n_terms or self._hashes[i] != term_hash:
+                continue
+            for p in range(self._offsets[i], self._offsets[i + 1]):
+                doc_id = self._doc_ids[p]
+                scores[doc_id] = scores.get(doc_id, 0.0) + self._weights[p]
+        best = heapq.nsmallest(k, ((-score, doc_id) for doc_id, score in scores.items()))
+        return [(doc_id, -neg_score) for neg_score, doc_id in best]
+
+    def section(self, doc_id: int) -> dict:
+        self.load()
+        return self._sections[doc_id]
+
+    def resolve_act(self, text: str) -> Optional[str]:
+        """Act code of the first known act name mentioned in text"""
+        self.load()
+        match = self._alias_re.search(text.lower())
+        return self._alias_codes[match.group(1)] if match else None
+
+    def acts_mentioned(self, text: str) -> List[str]:
+        """Codes of every known act named in text, in order of first mention"""
+        self.load()
+        codes = (self._alias_codes[alias] for alias in self._alias_re.findall(text.lower()))
+        return list(dict.fromkeys(codes))
+
+    def lookup(self, act: str, section: str) -> Optional[dict]:
+        self.load()
+        return self._by_citation.get((act, section_key(section)))
+
+
+section_index = SectionIndex()
+
+
+def map_sections(case_text: str, k: int = SECTION_GROUNDING_K) -> List[dict]:
+    """
+    Statute sections most relevant to the case, best first.
+
+    Returns:
+        list: dicts with act, act_name, section, title, text, citation and score
+    """
+    if k <= 0 or not case_text.strip():
+        return []
+    results = []
+    for doc_id, score in section_index.search(case_text, k):
+        section = section_index.section(doc_id)
+        results.append({
+            "act": section["act"],
+            "act_name": section["act_name"],
+            "section": section["section"],
+            "title": section["title"],
+            "text": section["text"],
+            "citation": citation(section),
+            "score": round(score, 4),
+        })
+    return results
+
+
+def format_sections(sections: List[dict]) -> str:
+    """Render retrieved sections as prompt reference lines"""
+    return "\n".join(f"- {s['citation']} ({s['title']}): {s['text']}" for s in sections)
@@ -0,0 +1,93 @@
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("LLM_BREAKER_HALF_OPEN_CALLS", "1"))
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    closed: requests flow; `failure_threshold` consecutive failures open it
+    open: requests are rejected immediately until `cooldown` seconds pass
+    half_open: up to `half_open_max_calls` trial requests are let through;
+        a success closes the breaker, a failure re-opens it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        half_open_max_calls: int = BREAKER_HALF_OPEN_CALLS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.rejections = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now, reserving a trial slot when half-open"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.rejections += 1
+        return False
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        if self._state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give back a half-open trial slot for a request that ended without an outcome"""
+        if self._state == HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def _transition(self, state: str) -> None:
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        self._half_open_calls = 0
+        if state != self._state:
+            logger.warning(f"🔌 {self.name} circuit breaker: {self._state} -> {state}")
+        self._state = state
+
+    def to_dict(self) -> dict:
+        state = self.state
+        retry_in = None
+        if state == OPEN:
+            retry_in = round(max(0.0, self.cooldown - (time.monotonic() - self._opened_at)), 1)
+        return {
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "rejections": self.rejections,
+            "retry_in_s": retry_in,
+        }
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import re
+import zlib
+
+import numpy as np
+
+from app.llm.ollama_client import embed_ollama_async
+
+# "hashed" (CPU only, no model needed) or "ollama"
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashed").lower()
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+HASHED_DIM = 1024
+# Word n-gram sizes of the hashed embedding; bigrams and trigrams make
+# reordered or reworded passages score lower than verbatim ones
+_NGRAM_SIZES = (1, 2, 3)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def hashed_ngram_embedding(text: str, dim: int = HASHED_DIM) -> np.ndarray:
+    """
+    Feature-hashed bag of word 1-3 grams with log-scaled counts and a
+    hash-derived sign, L2-normalized. crc32 rather than hash() so vectors
+    are stable across processes and can be persisted.
+    """
+    words = _WORD_RE.findall(text.lower())
+    grams = [" ".join(words[i:i + n]) for n in _NGRAM_SIZES for i in range(len(words) - n + 1)]
+    vector = np.zeros(dim, dtype=np.float32)
+    if not grams:
+        return vector
+    hashes = np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint32, count=len(grams))
+    unique, counts = np.unique(hashes, return_counts=True)
+    signs = np.where(unique & 0x80000000, 1.0, -1.0).astype(np.float32)
+    np.add.at(vector, (unique % dim).astype(np.intp), signs * (1 + np.log(counts, dtype=np.float32)))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embedding_model_name() -> str:
+    """Identifies the vector space; vectors from different models are never compared"""
+    if EMBEDDING_BACKEND == "ollama":
+        return f"ollama:{OLLAMA_EMBED_MODEL}"
+    return f"hashed-ngram-{HASHED_DIM}"
+
+
+async def embed_text(text: str) -> np.ndarray:
+    """
+    L2-normalized float32 embedding of `text` with the configured backend
+
+    Raises:
+        RuntimeError: If the Ollama backend fails
+    """
+    if EMBEDDING_BACKEND == "ollama":
+        vector = np.asarray(await embed_ollama_async(text, OLLAMA_EMBED_MODEL), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    # Off the event loop: a few milliseconds for a long document
+    return await asyncio.to_thread(hashed_ngram_embedding, text)
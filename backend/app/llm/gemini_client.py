@@ -1,26 +1,34 @@
-import requests
+import httpx
 import os
 import json
 import logging
-from dotenv import load_dotenv
-
-load_dotenv()
+from typing import AsyncIterator
+from app.llm.json_repair import parse_model_json
+from app.llm.llm_client import get_http_client
+from app.utils.metrics import record_llm_usage, stage
 
 logger = logging.getLogger(__name__)
 
 # Configure Gemini
 API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_TIMEOUT = 30
+# Client-side limits to stay inside the Gemini quota (0 = unlimited)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "0"))
+GEMINI_RATE_LIMIT_RPM = float(os.getenv("GEMINI_RATE_LIMIT_RPM", "0"))
+
+
+def _gemini_url() -> str:
+    return f"{GEMINI_BASE_URL}/v1beta/models/{GEMINI_MODEL}:generateContent?key={API_KEY}"
 
-def call_gemini(prompt: str) -> dict:
-    """
-    Call Gemini 1.5 Flash API using REST (Faster and more reliable than gRPC on some networks)
-    """
-    if not API_KEY:
-        raise RuntimeError("Gemini API Key is missing.")
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={API_KEY}"
-    
-    payload = {
+def _gemini_stream_url() -> str:
+    return f"{GEMINI_BASE_URL}/v1beta/models/{GEMINI_MODEL}:streamGenerateContent?alt=sse&key={API_KEY}"
+
+
+def _gemini_payload(prompt: str) -> dict:
+    return {
         "contents": [{
             "parts": [{"text": prompt}]
         }],
@@ -29,28 +37,48 @@ def call_gemini(prompt: str) -> dict:
             "temperature": 0.7
         }
     }
-    
+
+
+def _record_gemini_usage(result: dict) -> None:
+    usage = result.get('usageMetadata') or {}
+    record_llm_usage("Gemini", usage.get('promptTokenCount'), usage.get('candidatesTokenCount'))
+
+
+def _parse_gemini_result(result: dict) -> dict:
+    """Extract the JSON analysis from a generateContent response body"""
+    _record_gemini_usage(result)
+    try:
+        response_text = result['candidates'][0]['content']['parts'][0]['text']
+    except (KeyError, IndexError) as e:
+        logger.error(f"❌ Failed to parse Gemini response: {str(e)}")
+        raise RuntimeError("Unexpected response format from Gemini")
+    try:
+        with stage("json_parse"):
+            return parse_model_json(response_text)
+    except RuntimeError as e:
+        logger.error(f"❌ Failed to parse Gemini response: {str(e)}")
+        raise
+
+
+def call_gemini(prompt: str) -> dict:
+    """
+    Call Gemini 1.5 Flash API using REST (Faster and more reliable than gRPC on some networks)
+    """
+    if not API_KEY:
+        raise RuntimeError("Gemini API Key is missing.")
+    # Only the sync path uses requests: imported on first use to keep startup fast
+    import requests
+
     try:
         logger.info("🚀 Sending request to Gemini REST API...")
-        response = requests.post(url, json=payload, timeout=30)
+        response = requests.post(_gemini_url(), json=_gemini_payload(prompt), timeout=GEMINI_TIMEOUT)
         
         if response.status_code != 200:
             error_detail = response.json().get('error', {}).get('message', 'Unknown error')
             logger.error(f"❌ Gemini API Error ({response.status_code}): {error_detail}")
             raise RuntimeError(f"Gemini API Error: {error_detail}")
             
-        result = response.json()
-        
-        # Extract the JSON text from the response structure
-        try:
-            response_text = result['candidates'][0]['content']['parts'][0]['text']
-            return json.loads(response_text)
-        except (KeyError, IndexError, json.JSONDecodeError) as e:
-            logger.error(f"❌ Failed to parse Gemini response: {str(e)}")
-            # If it's just raw text, return it
-            if 'candidates' in result:
-                return {"raw_response": result['candidates'][0]['content']['parts'][0]['text']}
-            raise RuntimeError("Unexpected response format from Gemini")
+        return _parse_gemini_result(response.json())
             
     except requests.exceptions.Timeout:
         logger.error("❌ Gemini API Timeout")
@@ -59,6 +87,94 @@ def call_gemini(prompt: str) -> dict:
         logger.error(f"❌ Gemini Request Failed: {str(e)}")
         raise RuntimeError(f"Gemini Request Failed: {str(e)}")
 
+
+async def call_gemini_async(prompt: str) -> dict:
+    """
+    Async variant of call_gemini using the shared pooled HTTP client,
+    so a slow Gemini call does not block the event loop
+    """
+    if not API_KEY:
+        raise RuntimeError("Gemini API Key is missing.")
+
+    client = await get_http_client()
+    try:
+        logger.info("🚀 Sending async request to Gemini REST API...")
+        response = await client.post(_gemini_url(), json=_gemini_payload(prompt), timeout=GEMINI_TIMEOUT)
+
+        if response.status_code != 200:
+            error_detail = response.json().get('error', {}).get('message', 'Unknown error')
+            logger.error(f"❌ Gemini API Error ({response.status_code}): {error_detail}")
+            raise RuntimeError(f"Gemini API Error: {error_detail}")
+
+        return _parse_gemini_result(response.json())
+
+    except httpx.TimeoutException:
+        logger.error("❌ Gemini API Timeout")
+        raise RuntimeError("Gemini API timed out")
+    except Exception as e:
+        logger.error(f"❌ Gemini Request Failed: {str(e)}")
+        raise RuntimeError(f"Gemini Request Failed: {str(e)}")
+
+
+async def stream_gemini_async(prompt: str) -> AsyncIterator[str]:
+    """
+    Stream generated text from Gemini's streamGenerateContent (SSE) endpoint
+    """
+    if not API_KEY:
+        raise RuntimeError("Gemini API Key is missing.")
+
+    client = await get_http_client()
+    try:
+        logger.info("🚀 Streaming from Gemini REST API...")
+        async with client.stream(
+            "POST", _gemini_stream_url(), json=_gemini_payload(prompt), timeout=GEMINI_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                try:
+                    error_detail = json.loads(body).get('error', {}).get('message', 'Unknown error')
+                except (ValueError, AttributeError):
+                    error_detail = 'Unknown error'
+                logger.error(f"❌ Gemini API Error ({response.status_code}): {error_detail}")
+                raise RuntimeError(f"Gemini API Error: {error_detail}")
+
+            last_event = {}
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                last_event = event
+                for candidate in event.get('candidates', []):
+                    for part in candidate.get('content', {}).get('parts', []):
+                        if part.get('text'):
+                            yield part['text']
+            # Usage totals arrive with the final event
+            _record_gemini_usage(last_event)
+
+    except httpx.TimeoutException:
+        logger.error("❌ Gemini API Timeout")
+        raise RuntimeError("Gemini API timed out")
+    except httpx.HTTPError as e:
+        logger.error(f"❌ Gemini Request Failed: {str(e)}")
+        raise RuntimeError(f"Gemini Request Failed: {str(e)}")
+
+
+async def is_gemini_reachable_async() -> bool:
+    """
+    Probe the Gemini model metadata endpoint (not billed) to check the key
+    is configured and the API is reachable
+    """
+    if not is_gemini_available():
+        return False
+    client = await get_http_client()
+    try:
+        response = await client.get(f"{GEMINI_BASE_URL}/v1beta/models/{GEMINI_MODEL}?key={API_KEY}", timeout=2)
+        return response.status_code == 200
+    except Exception as e:
+        logger.warning(f"Gemini availability check failed: {e}")
+        return False
+
+
 def is_gemini_available() -> bool:
     """Check if Gemini is configured and we have internet"""
     return bool(API_KEY) and len(API_KEY) > 10
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HEALTH_TTL = float(os.getenv("LLM_HEALTH_TTL", "15"))
+HEALTH_INTERVAL = float(os.getenv("LLM_HEALTH_INTERVAL", "5"))
+
+
+class HealthMonitor:
+    """
+    Cache provider availability so requests never wait on a probe.
+
+    A background task re-probes every provider every `interval` seconds.
+    `is_available` answers from the cache while it is younger than `ttl`
+    and only probes inline when the entry is missing or stale (e.g. the
+    monitor is not running). Concurrent inline probes of the same provider
+    share one request.
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Callable[[], Awaitable[bool]]],
+        ttl: float = HEALTH_TTL,
+        interval: float = HEALTH_INTERVAL,
+    ):
+        self.probes = probes
+        self.ttl = ttl
+        self.interval = interval
+        self._status: Dict[str, tuple] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def is_available(self, name: str) -> bool:
+        cached = self.cached_status(name)
+        if cached is not None:
+            return cached
+        return await self.probe(name)
+
+    def cached_status(self, name: str) -> Optional[bool]:
+        """The cached availability if still fresh, else None (never probes)"""
+        cached = self._status.get(name)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        return None
+
+    async def probe(self, name: str) -> bool:
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._probe(name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _probe(self, name: str) -> bool:
+        try:
+            available = bool(await self.probes[name]())
+        except Exception as e:
+            logger.warning(f"{name} health probe failed: {e}")
+            available = False
+        previous = self._status.get(name)
+        if previous is not None and previous[0] != available:
+            logger.info(f"{name} availability changed: {'up' if available else 'down'}")
+        self._status[name] = (available, time.monotonic())
+        return available
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.gather(*(self.probe(name) for name in self.probes), return_exceptions=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            name: {"available": available, "checked_s_ago": round(now - checked_at, 1)}
+            for name, (available, checked_at) in self._status.items()
+        }
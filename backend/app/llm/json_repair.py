@@ -0,0 +1,319 @@
+import json
+import logging
+import re
+from collections import Counter
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Repairs applied since startup, by kind (exported on /metrics)
+repair_counts: Counter = Counter()
+
+_VALID_ESCAPES = set('"\\/bfnrtu')
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "none": "null"}
+# A raw newline inside a string followed by what looks like the next key
+# (or the end of the object) means the model never closed the string
+_NEXT_MEMBER_RE = re.compile(r'\s*(?:"[^"\n]{1,80}"\s*:|[}\]])')
+_CLOSER_AHEAD_RE = re.compile(r"\s*[}\]]")
+# Keys models wrap the whole answer in ({"analysis": {...}})
+_WRAPPER_KEYS = {"analysis", "case_analysis", "result", "response", "output", "data"}
+
+# Frame states
+_KEY = 0
+_COLON = 1
+_VALUE = 2
+_COMMA = 3
+
+
+class _Frame:
+    __slots__ = ("closer", "state", "checkpoint", "members")
+
+    def __init__(self, closer: str, checkpoint: int):
+        self.closer = closer
+        # Objects start expecting a key, arrays a value
+        self.state = _KEY if closer == "}" else _VALUE
+        # Output length after the last complete member: where to cut a dangling one
+        self.checkpoint = checkpoint
+        self.members = 0
+
+
+def repair_json(text: str) -> Tuple[object, List[str]]:
+    """
+    Parse model output as JSON, repairing it in a single pass if needed.
+
+    Handles prose or a code fence around the JSON, trailing and missing
+    commas, raw control characters and bad escapes in strings, strings the
+    model forgot to close, bare words (True, None, High) and output cut
+    off mid-way, which is closed after the last complete member.
+
+    Returns:
+        (value, repairs) where repairs names what had to be fixed
+
+    Raises:
+        RuntimeError: If no JSON object or array can be recovered
+    """
+    try:
+        return json.loads(text), []
+    except json.JSONDecodeError:
+        pass
+
+    start = text.find("{")
+    bracket = text.find("[")
+    if bracket >= 0 and (start < 0 or bracket < start and not text[bracket + 1:start].strip()):
+        # A list of objects ("[{...}, {...}]")
+        start = bracket
+    if start < 0:
+        raise RuntimeError("No JSON object in model output")
+    repairs = []
+    if start and text[:start].strip():
+        repairs.append("code_fence" if "```" in text[:start] else "prose_prefix")
+
+    out: List[str] = []
+    stack: List[_Frame] = []
+    i, n = start, len(text)
+    in_string = False
+    string_is_key = False
+
+    def begin_member() -> None:
+        """Emit the separator before a new member, inserting a missing comma"""
+        frame = stack[-1]
+        if frame.state == _COMMA:
+            repairs.append("missing_comma")
+            frame.state = _KEY if frame.closer == "}" else _VALUE
+        if frame.members:
+            out.append(",")
+
+    def begin_value() -> bool:
+        """Prepare for a value in the current frame; False where a key is expected instead"""
+        frame = stack[-1]
+        if frame.closer == "]":
+            begin_member()
+            return True
+        if frame.state == _COLON:
+            repairs.append("missing_colon")
+            out.append(":")
+            frame.state = _VALUE
+        return frame.state == _VALUE
+
+    def end_value() -> None:
+        if stack:
+            frame = stack[-1]
+            frame.state = _COMMA
+            frame.members += 1
+            frame.checkpoint = len(out)
+
+    def close_frame() -> None:
+        frame = stack.pop()
+        if frame.state in (_COLON, _VALUE) and frame.closer == "}":
+            # Key without a value: drop it
+            del out[frame.checkpoint:]
+        out.append(frame.closer)
+        end_value()
+
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if ch == '"':
+                out.append('"')
+                in_string = False
+                if string_is_key:
+                    stack[-1].state = _COLON
+                else:
+                    end_value()
+            elif ch == "\\":
+                nxt = text[i + 1] if i + 1 < n else ""
+                if nxt in _VALID_ESCAPES and nxt:
+                    out.append(ch + nxt)
+                    i += 1
+                else:
+                    repairs.append("bad_escape")
+                    out.append("\\\\")
+            elif ch < " ":
+                if ch == "\n" and not string_is_key and _NEXT_MEMBER_RE.match(text, i):
+                    repairs.append("unterminated_string")
+                    out.append('"')
+                    in_string = False
+                    end_value()
+                    # The comma went missing with the quote
+                    stack[-1].state = _KEY if stack[-1].closer == "}" else _VALUE
+                    continue
+                repairs.append("control_char")
+                out.append(json.dumps(ch)[1:-1])
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch.isspace():
+            i += 1
+            continue
+        frame = stack[-1] if stack else None
+
+        if ch in "{[":
+            if frame is not None and not begin_value():
+                # An object or array where a key belongs: skip the bracket
+                i += 1
+                continue
+            out.append(ch)
+            stack.append(_Frame("}" if ch == "{" else "]", len(out)))
+        elif ch in "}]":
+            close_frame()
+            if not stack:
+                i += 1
+                break
+        elif ch == ",":
+            # Commas are emitted by begin_member, which drops trailing and stray ones
+            if frame.state == _COMMA:
+                frame.state = _KEY if frame.closer == "}" else _VALUE
+            if _CLOSER_AHEAD_RE.match(text, i + 1):
+                repairs.append("trailing_comma")
+        elif ch == ":":
+            if frame.state == _COLON:
+                out.append(":")
+                frame.state = _VALUE
+        else:
+            is_key = frame.closer == "}" and frame.state in (_KEY, _COMMA)
+            if is_key:
+                begin_member()
+            else:
+                begin_value()
+            if ch == '"':
+                string_is_key = is_key
+                in_string = True
+                out.append('"')
+            else:
+                # Bare word or number: runs to the next delimiter (a colon also ends a key)
+                end = i
+                stop = ",}]\n:" if is_key else ",}]\n"
+                while end < n and text[end] not in stop:
+                    end += 1
+                token = text[i:end].strip()
+                if len(token) > 1 and token[0] == token[-1] == "'":
+                    # Python-style 'quoted' string
+                    token = token[1:-1]
+                if is_key:
+                    out.append(json.dumps(token))
+                    frame.state = _COLON
+                else:
+                    literal = _LITERALS.get(token.lower())
+                    if literal is None and _NUMBER_RE.fullmatch(token):
+                        literal = token
+                    out.append(json.dumps(token) if literal is None else literal)
+                    end_value()
+                if is_key or literal != token:
+                    repairs.append("bare_token")
+                i = end
+                continue
+        i += 1
+
+    if in_string:
+        if string_is_key:
+            del out[stack[-1].checkpoint:]
+            stack[-1].state = _COMMA
+        else:
+            out.append('"')
+            end_value()
+    if stack:
+        repairs.append("truncated")
+        while stack:
+            close_frame()
+    elif text[i:].strip():
+        repairs.append("trailing_text")
+
+    try:
+        value = json.loads("".join(out))
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Unrepairable JSON in model output: {e}")
+    return value, sorted(set(repairs))
+
+
+def parse_model_json(text: str) -> dict:
+    """
+    The JSON object in a model response, repaired if needed and unwrapped
+    from a one-element list or a lone wrapper key such as "analysis"
+
+    Raises:
+        RuntimeError: If the response holds no JSON object
+    """
+    value, repairs = repair_json(text)
+    if repairs:
+        repair_counts.update(repairs)
+        logger.info(f"🔧 Repaired model JSON: {', '.join(repairs)}")
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if isinstance(value, dict) and len(value) == 1:
+        (key, inner), = value.items()
+        if key.lower() in _WRAPPER_KEYS and isinstance(inner, dict):
+            value = inner
+    if not isinstance(value, dict):
+        raise RuntimeError(f"Model returned JSON {type(value).__name__}, expected an object")
+    return value
+
+
+# Names models use instead of the schema's section keys
+SECTION_ALIASES = {
+    "type": "case_type",
+    "summary": "case_summary",
+    "facts": "key_facts",
+    "issues": "legal_issues",
+    "laws": "applicable_laws",
+    "relevant_laws": "applicable_laws",
+    "actions": "recommended_actions",
+    "recommendations": "recommended_actions",
+    "evidence": "evidence_needed",
+    "outcome": "estimated_outcome",
+    "timeline": "timeline_considerations",
+}
+
+# Fields of the AnalyzeResponse item models, the first being the headline
+ITEM_FIELDS = {
+    "legal_issues": ("issue", "description", "importance"),
+    "applicable_laws": ("law", "description", "relevance"),
+    "strengths": ("point", "explanation"),
+    "weaknesses": ("point", "explanation", "severity"),
+    "recommended_actions": ("action", "priority", "rationale"),
+}
+
+
+def canonical_key(key: str) -> str:
+    """"Key Facts", "key-facts" and "facts" all become "key_facts" """
+    key = re.sub(r"[^a-z0-9]+", "_", str(key).lower()).strip("_")
+    return SECTION_ALIASES.get(key, key)
+
+
+def canonical_sections(data: dict) -> dict:
+    """`data` with section keys mapped onto the schema's names; the first spelling wins"""
+    result = {}
+    for key, value in data.items():
+        result.setdefault(canonical_key(key), value)
+    return result
+
+
+def coerce_items(name: str, value, default: str = "Not specified") -> list:
+    """
+    Coerce a list section onto its item model: a lone item becomes a list,
+    a string item fills the headline field, missing fields get `default`
+    and non-string values are stringified. Fields the model added are kept.
+    """
+    fields = ITEM_FIELDS[name]
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = {canonical_key(k): v for k, v in item.items()}
+        elif item is None or item == "":
+            continue
+        else:
+            item = {fields[0]: item}
+        for field in fields:
+            field_value = item.get(field)
+            if field_value is None or field_value == "":
+                item[field] = default
+            elif not isinstance(field_value, str):
+                item[field] = ", ".join(map(str, field_value)) if isinstance(field_value, list) else str(field_value)
+        items.append(item)
+    return items
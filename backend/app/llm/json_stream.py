@@ -0,0 +1,162 @@
+import json
+import logging
+from typing import List, Tuple
+
+from app.llm.json_repair import repair_json
+
+logger = logging.getLogger(__name__)
+
+# Parser states
+_BEFORE_OBJECT = 0
+_EXPECT_KEY = 1
+_IN_KEY = 2
+_EXPECT_COLON = 3
+_EXPECT_VALUE = 4
+_IN_VALUE = 5
+_DONE = 6
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _loads_lenient(text: str):
+    """json.loads, falling back to the repair engine for malformed objects and arrays"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        if not text.startswith(("{", "[")):
+            raise
+        try:
+            return repair_json(text)[0]
+        except RuntimeError as e:
+            raise json.JSONDecodeError(str(e), text, 0)
+
+
+class IncrementalSectionParser:
+    """
+    Incrementally parse a streamed JSON object and emit each top-level
+    (key, value) pair as soon as its value is complete.
+
+    Tolerates leading prose and markdown code fences, trailing commas and
+    values that fail to parse (they are skipped, not fatal). `close()`
+    makes a best-effort attempt to recover a truncated final value.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.malformed_sections: List[str] = []
+        self._pos = 0
+        self._state = _BEFORE_OBJECT
+        self._key_start = 0
+        self._key = None
+        self._value_start = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        """Consume the next chunk of model output; return completed sections"""
+        self.buffer += chunk
+        sections = []
+        buf = self.buffer
+        i = self._pos
+        n = len(buf)
+
+        while i < n and self._state != _DONE:
+            ch = buf[i]
+            state = self._state
+
+            if state == _BEFORE_OBJECT:
+                if ch == "{":
+                    self._state = _EXPECT_KEY
+
+            elif state == _EXPECT_KEY:
+                if ch == '"':
+                    self._state = _IN_KEY
+                    self._key_start = i
+                    self._escape = False
+                elif ch == "}":
+                    self._state = _DONE
+
+            elif state == _IN_KEY:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    try:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                    except json.JSONDecodeError:
+                        self._key = buf[self._key_start + 1:i]
+                    self._state = _EXPECT_COLON
+
+            elif state == _EXPECT_COLON:
+                if ch == ":":
+                    self._state = _EXPECT_VALUE
+
+            elif state == _EXPECT_VALUE:
+                if not ch.isspace():
+                    self._state = _IN_VALUE
+                    self._value_start = i
+                    self._stack = []
+                    self._in_string = False
+                    self._escape = False
+                    # Re-examine this character as part of the value
+                    continue
+
+            elif state == _IN_VALUE:
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == "\\":
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                elif ch == '"':
+                    self._in_string = True
+                elif ch in "{[":
+                    self._stack.append(ch)
+                elif ch in "}]":
+                    if self._stack:
+                        self._stack.pop()
+                    elif ch == "}":
+                        # End of the top-level object
+                        self._emit(buf[self._value_start:i], sections)
+                        self._state = _DONE
+                elif ch == "," and not self._stack:
+                    self._emit(buf[self._value_start:i], sections)
+                    self._state = _EXPECT_KEY
+
+            i += 1
+
+        self._pos = i
+        return sections
+
+    def close(self) -> List[Tuple[str, object]]:
+        """
+        Flush at end of stream. A value cut off mid-way (e.g. the model hit
+        its token limit) is closed off and emitted if it then parses.
+        """
+        sections = []
+        if self._state == _IN_VALUE:
+            tail = self.buffer[self._value_start:].rstrip().rstrip(",")
+            if self._in_string:
+                tail += '"'
+            tail += "".join(_CLOSERS[c] for c in reversed(self._stack))
+            self._emit(tail, sections)
+        self._state = _DONE
+        return sections
+
+    def _emit(self, raw_value: str, sections: list) -> None:
+        raw_value = raw_value.strip()
+        if not raw_value or self._key is None:
+            return
+        try:
+            sections.append((self._key, _loads_lenient(raw_value)))
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed streamed section: {self._key}")
+            self.malformed_sections.append(self._key)
+        self._key = None
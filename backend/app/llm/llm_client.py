@@ -0,0 +1,52 @@
+import httpx
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits for the shared async HTTP client
+MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """
+    Create the shared keep-alive HTTP client used by the async LLM clients.
+    Called once from the app lifespan on startup.
+    """
+    global _http_client
+    if _http_client is None:
+        limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
+        _http_client = httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(30.0))
+        logger.info(f"Opened shared LLM HTTP pool (max connections: {MAX_CONNECTIONS})")
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared HTTP client and release pooled connections.
+    Called from the app lifespan on shutdown.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("Closed shared LLM HTTP pool")
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared HTTP client, opening it lazily when the app lifespan
+    has not run (e.g. scripts and benchmarks).
+    """
+    if _http_client is None:
+        return await open_http_client()
+    return _http_client
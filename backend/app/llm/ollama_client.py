@@ -1,18 +1,99 @@
-import requests
+import httpx
 import logging
 import json
+import os
 import time
+from typing import AsyncIterator, Sequence
+from app.llm.json_repair import parse_model_json
+from app.llm.llm_client import get_http_client
+from app.llm.token_budget import OLLAMA_NUM_CTX, ollama_context_options
+from app.utils.metrics import record_llm_usage, record_stage, stage
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_BASE_URL = "http://127.0.0.1:11434"
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
 DEFAULT_MODEL = "llama3:latest"  # Using llama3:latest which is more common
+OLLAMA_TIMEOUT = 300
+# Parallel generations one Ollama box can serve (0 = unlimited)
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+# How long Ollama keeps the model loaded after a request: a duration such
+# as "30m", or seconds (-1 = until Ollama restarts). Ollama's own default
+# is 5 minutes, after which the next request pays a cold load.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Load DEFAULT_MODEL and prime its prompt-prefix cache when the app starts
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "true").lower() in ("1", "true", "yes")
+
+
+def _keep_alive():
+    """Ollama reads a bare number as seconds, but a numeric string as an invalid duration"""
+    try:
+        return int(OLLAMA_KEEP_ALIVE)
+    except ValueError:
+        return OLLAMA_KEEP_ALIVE
+
+
+def _ollama_payload(prompt: str, model: str) -> dict:
+    return {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "format": "json",  # Request JSON response
+        "keep_alive": _keep_alive(),
+        # Performance optimizations
+        "options": {
+            "temperature": 0.7,      # Balance between creativity and consistency
+            "top_p": 0.9,           # Nucleus sampling for better quality
+            # Context window and response length sized from the prompt
+            **ollama_context_options(prompt),
+        }
+    }
+
+
+def _record_ollama_timings(result: dict, elapsed: float) -> None:
+    """
+    Split a finished generation using Ollama's own counters (nanoseconds):
+    model load, generation, and the remainder of the wall time (network
+    and HTTP overhead), plus token counts and tokens/sec
+    """
+    total = result.get("total_duration")
+    if total:
+        record_stage("generation", total / 1e9)
+        record_stage("network", max(0.0, elapsed - total / 1e9))
+    if result.get("load_duration"):
+        record_stage("model_load", result["load_duration"] / 1e9)
+    eval_duration = result.get("eval_duration")
+    record_llm_usage(
+        "Ollama",
+        result.get("prompt_eval_count"),
+        result.get("eval_count"),
+        eval_duration / 1e9 if eval_duration else None,
+    )
+
+
+def _parse_ollama_result(result: dict, start_time: float) -> dict:
+    """Parse the JSON analysis out of an /api/generate response body"""
+    response_text = result.get("response", "")
+    _record_ollama_timings(result, time.time() - start_time)
+
+    # Parse the response as JSON, repairing what the model got wrong
+    try:
+        with stage("json_parse"):
+            parsed_response = parse_model_json(response_text)
+    except RuntimeError as e:
+        elapsed_time = time.time() - start_time
+        logger.warning(f"Failed to parse Ollama response as JSON (took {elapsed_time:.2f}s): {e}")
+        raise
+    elapsed_time = time.time() - start_time
+    logger.info(f"Successfully parsed Ollama response (took {elapsed_time:.2f}s)")
+    return parsed_response
 
 
 def is_ollama_available() -> bool:
     """
     Check if Ollama service is available
     """
+    # Only the sync helpers use requests: imported on first use to keep startup fast
+    import requests
     try:
         response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=2)
         return response.status_code == 200
@@ -21,6 +102,19 @@ def is_ollama_available() -> bool:
         return False
 
 
+async def is_ollama_available_async() -> bool:
+    """
+    Async variant of is_ollama_available using the shared HTTP client
+    """
+    client = await get_http_client()
+    try:
+        response = await client.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=2)
+        return response.status_code == 200
+    except Exception as e:
+        logger.warning(f"Ollama availability check failed: {e}")
+        return False
+
+
 def call_ollama(prompt: str, model: str = DEFAULT_MODEL) -> dict:
     """
     Call Ollama API with the given prompt
@@ -35,46 +129,22 @@ def call_ollama(prompt: str, model: str = DEFAULT_MODEL) -> dict:
     Raises:
         RuntimeError: If the API call fails
     """
+    import requests
     start_time = time.time()  # Track processing time
     try:
         logger.info(f"Calling Ollama with model: {model}")
         
-        # Prepare the request
-        url = f"{OLLAMA_BASE_URL}/api/generate"
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "format": "json",  # Request JSON response
-            # Performance optimizations
-            "options": {
-                "num_predict": 2048,    # Limit response length for faster processing
-                "temperature": 0.7,      # Balance between creativity and consistency
-                "top_p": 0.9,           # Nucleus sampling for better quality
-                "num_ctx": 4096,        # Context window size
-            }
-        }
-        
         # Make the request with extended timeout for long case analysis
         # Increased from 180s to 300s to match mobile app timeout
-        logger.info(f"Sending request to Ollama (timeout: 300s)...")
-        response = requests.post(url, json=payload, timeout=300)
+        logger.info(f"Sending request to Ollama (timeout: {OLLAMA_TIMEOUT}s)...")
+        response = requests.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json=_ollama_payload(prompt, model),
+            timeout=OLLAMA_TIMEOUT,
+        )
         response.raise_for_status()
         
-        # Parse the response
-        result = response.json()
-        response_text = result.get("response", "")
-        
-        # Try to parse the response as JSON
-        try:
-            parsed_response = json.loads(response_text)
-            elapsed_time = time.time() - start_time
-            logger.info(f"Successfully parsed Ollama response (took {elapsed_time:.2f}s)")
-            return parsed_response
-        except json.JSONDecodeError:
-            elapsed_time = time.time() - start_time
-            logger.warning(f"Failed to parse Ollama response as JSON (took {elapsed_time:.2f}s), returning raw text")
-            return {"raw_response": response_text}
+        return _parse_ollama_result(response.json(), start_time)
             
     except requests.exceptions.RequestException as e:
         logger.error(f"Ollama API request failed: {e}")
@@ -84,6 +154,143 @@ def call_ollama(prompt: str, model: str = DEFAULT_MODEL) -> dict:
         raise RuntimeError(f"Unexpected error: {str(e)}")
 
 
+async def call_ollama_async(prompt: str, model: str = DEFAULT_MODEL) -> dict:
+    """
+    Async variant of call_ollama using the shared pooled HTTP client,
+    so long generations do not block the event loop
+
+    Raises:
+        RuntimeError: If the API call fails
+    """
+    start_time = time.time()
+    client = await get_http_client()
+    try:
+        logger.info(f"Calling Ollama (async) with model: {model}")
+        response = await client.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json=_ollama_payload(prompt, model),
+            timeout=OLLAMA_TIMEOUT,
+        )
+        response.raise_for_status()
+
+        return _parse_ollama_result(response.json(), start_time)
+
+    except httpx.HTTPError as e:
+        logger.error(f"Ollama API request failed: {e}")
+        raise RuntimeError(f"Failed to call Ollama API: {str(e)}")
+    except Exception as e:
+        logger.error(f"Unexpected error calling Ollama: {e}")
+        raise RuntimeError(f"Unexpected error: {str(e)}")
+
+
+async def stream_ollama_async(prompt: str, model: str = DEFAULT_MODEL) -> AsyncIterator[str]:
+    """
+    Stream generated text from Ollama as it is produced (`stream: true`)
+
+    Yields:
+        str: Response text fragments in generation order
+
+    Raises:
+        RuntimeError: If the API call fails
+    """
+    start_time = time.time()
+    client = await get_http_client()
+    payload = _ollama_payload(prompt, model)
+    payload["stream"] = True
+    try:
+        logger.info(f"Streaming from Ollama with model: {model}")
+        async with client.stream(
+            "POST", f"{OLLAMA_BASE_URL}/api/generate", json=payload, timeout=OLLAMA_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    _record_ollama_timings(chunk, time.time() - start_time)
+                    break
+        logger.info(f"Ollama stream finished (took {time.time() - start_time:.2f}s)")
+
+    except httpx.HTTPError as e:
+        logger.error(f"Ollama streaming request failed: {e}")
+        raise RuntimeError(f"Failed to call Ollama API: {str(e)}")
+
+
+async def warm_up_ollama_async(prefixes: Sequence[str], model: str = DEFAULT_MODEL) -> dict:
+    """
+    Load `model` and evaluate each static prompt prefix once, so the first
+    real request neither waits for a cold load nor prefills the shared
+    instructions. With a single Ollama slot only the last prefix stays
+    cached, so put the most used one last. Uses the same num_ctx as real requests: a different one
+    would make Ollama load the model again.
+
+    Returns:
+        dict: load_s and prefix_s timings (empty if Ollama is unreachable)
+
+    Raises:
+        RuntimeError: If a warm-up request fails
+    """
+    if not await is_ollama_available_async():
+        return {}
+
+    client = await get_http_client()
+    timings = {}
+    try:
+        # A request without a prompt only loads the model, at the context
+        # size real requests use so they find it loaded as is
+        start = time.perf_counter()
+        response = await client.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json={"model": model, "keep_alive": _keep_alive(), "options": {"num_ctx": OLLAMA_NUM_CTX}},
+            timeout=OLLAMA_TIMEOUT,
+        )
+        response.raise_for_status()
+        timings["load_s"] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        for prefix in prefixes:
+            payload = _ollama_payload(prefix, model)
+            payload["options"]["num_predict"] = 1
+            response = await client.post(f"{OLLAMA_BASE_URL}/api/generate", json=payload, timeout=OLLAMA_TIMEOUT)
+            response.raise_for_status()
+        timings["prefix_s"] = round(time.perf_counter() - start, 3)
+    except httpx.HTTPError as e:
+        logger.error(f"Ollama warm-up failed: {e}")
+        raise RuntimeError(f"Ollama warm-up failed: {str(e)}")
+
+    logger.info(f"🔥 Ollama model {model} warm (load {timings['load_s']}s, prefix {timings['prefix_s']}s)")
+    return timings
+
+
+async def embed_ollama_async(text: str, model: str) -> list:
+    """
+    Embedding vector for `text` from Ollama's /api/embeddings
+
+    Raises:
+        RuntimeError: If the API call fails
+    """
+    client = await get_http_client()
+    try:
+        response = await client.post(
+            f"{OLLAMA_BASE_URL}/api/embeddings",
+            json={"model": model, "prompt": text, "keep_alive": _keep_alive()},
+            timeout=OLLAMA_TIMEOUT,
+        )
+        response.raise_for_status()
+        embedding = response.json().get("embedding")
+    except httpx.HTTPError as e:
+        logger.error(f"Ollama embeddings request failed: {e}")
+        raise RuntimeError(f"Failed to call Ollama embeddings API: {str(e)}")
+    if not embedding:
+        raise RuntimeError(f"Ollama returned no embedding (is {model} pulled?)")
+    return embedding
+
+
 def list_available_models() -> list:
     """
     List all available Ollama models
@@ -91,6 +298,7 @@ def list_available_models() -> list:
     Returns:
         list: List of available model names
     """
+    import requests
     try:
         response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
         response.raise_for_status()
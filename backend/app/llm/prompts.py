@@ -1,63 +1,203 @@
-def case_analysis_prompt(case_text: str) -> str:
-    return f"""
+# Bump whenever the prompt wording or schema changes, so cached
+# analyses produced by an older template are not served
+PROMPT_VERSION = "7"
+
+# One line per section: the model follows this as well as the expanded
+# layout, at well under half the prompt tokens
+_SCHEMA_LINES = {
+    "case_type": '"Criminal | Civil | Constitutional | Family | Corporate | Property | Labor | Tax | Other"',
+    "case_summary": '"2-3 sentences"',
+    "key_facts": '["fact"]',
+    "legal_issues": '[{"issue": "question", "description": "explanation", "importance": "High | Medium | Low"}]',
+    "applicable_laws": '[{"law": "e.g. IPC Section 420", "description": "what it covers", "relevance": "how it applies"}]',
+    "strengths": '[{"point": "strong point", "explanation": "why"}]',
+    "weaknesses": '[{"point": "risk", "explanation": "why", "severity": "High | Medium | Low"}]',
+    "recommended_actions": '[{"action": "step", "priority": "High | Medium | Low", "rationale": "why"}]',
+    "evidence_needed": '["evidence"]',
+    "precedents": '["case law if known"]',
+    "estimated_outcome": '"likely outcome"',
+    "timeline_considerations": '"deadlines and time-sensitive matters"',
+    "dates_and_deadlines": '["date or deadline and what it refers to"]',
+}
+
+_ANALYSIS_KEYS = (
+    "case_type", "case_summary", "key_facts", "legal_issues", "applicable_laws", "strengths", "weaknesses",
+    "recommended_actions", "evidence_needed", "precedents", "estimated_outcome", "timeline_considerations",
+)
+
+
+def _schema(keys) -> str:
+    return "{\n" + ",\n".join(f'  "{key}": {_SCHEMA_LINES[key]}' for key in keys) + "\n}"
+
+
+# Static instructions that open every single-prompt analysis. They are
+# byte-identical across requests and come before anything case-specific,
+# so Ollama reuses their KV cache and only evaluates the tail.
+ANALYSIS_PREFIX = f"""
 You are an expert legal AI assistant helping lawyers analyze cases comprehensively.
 
-Analyze the following case and provide a DETAILED legal analysis in STRICT JSON format.
-
-Your response must be valid JSON with the following structure:
-
-{{
-  "case_type": "Criminal | Civil | Constitutional | Family | Corporate | Property | Labor | Tax | Other",
-  "case_summary": "Brief 2-3 sentence summary of the case",
-  "key_facts": ["fact 1", "fact 2", "fact 3"],
-  "legal_issues": [
-    {{
-      "issue": "Main legal question or issue",
-      "description": "Detailed explanation of this issue",
-      "importance": "High | Medium | Low"
-    }}
-  ],
-  "applicable_laws": [
-    {{
-      "law": "Name of law/section (e.g., IPC Section 420)",
-      "description": "What this law covers",
-      "relevance": "How it applies to this case"
-    }}
-  ],
-  "strengths": [
-    {{
-      "point": "Strong point in the case",
-      "explanation": "Why this strengthens the case"
-    }}
-  ],
-  "weaknesses": [
-    {{
-      "point": "Weak point or risk",
-      "explanation": "Why this is a concern",
-      "severity": "High | Medium | Low"
-    }}
-  ],
-  "recommended_actions": [
-    {{
-      "action": "Specific action to take",
-      "priority": "High | Medium | Low",
-      "rationale": "Why this action is important"
-    }}
-  ],
-  "evidence_needed": ["type of evidence 1", "type of evidence 2"],
-  "precedents": ["Relevant case law or precedent if known"],
-  "estimated_outcome": "Likely outcome based on the facts presented",
-  "timeline_considerations": "Important deadlines or time-sensitive matters"
-}}
+Analyze the case below and provide a DETAILED legal analysis in STRICT JSON with exactly these keys:
+
+{_schema(_ANALYSIS_KEYS[1:])}
 
 IMPORTANT RULES:
 - Output ONLY valid JSON, no markdown, no explanations outside JSON
-- Be specific and detailed in all descriptions
-- Focus on actionable insights for the lawyer
+- Be specific and detailed; focus on actionable insights for the lawyer
 - If information is not available, use empty arrays [] or "Not specified"
-- Ensure all JSON is properly formatted with correct quotes and commas
+- Prefer citing the REFERENCE STATUTE SECTIONS when they apply; cite other laws only if you are sure they exist
+"""
+
 
+def _references_block(reference_sections: str) -> str:
+    return f"""
+REFERENCE STATUTE SECTIONS (retrieved for this case):
+{reference_sections}
+""" if reference_sections else ""
+
+
+def case_analysis_prompt(case_text: str, reference_sections: str = "") -> str:
+    return ANALYSIS_PREFIX + f"""
+Begin the JSON with one more key, "case_type": {_SCHEMA_LINES["case_type"]}
+{_references_block(reference_sections)}
 CASE TEXT:
 {case_text}
 """
 
+
+# What the type-specific prompt asks the model to concentrate on
+CASE_TYPE_FOCUS = {
+    "Criminal": "the offences and their ingredients, bail, the evidence and criminal procedure",
+    "Civil": "the cause of action, liability, the relief and damages available, and limitation",
+    "Constitutional": "the fundamental or statutory rights involved, the writ jurisdiction and the remedy",
+    "Family": "matrimonial relief, maintenance, custody and protection against domestic violence",
+    "Corporate": "company law, insolvency, shareholder rights and arbitration",
+    "Property": "title, possession, tenancy, transfer documents and injunctions",
+    "Labor": "the employment relationship, termination, wages and terminal dues",
+    "Tax": "the assessment or demand, limitation for tax proceedings and appellate remedies",
+}
+
+
+# Static opening of the type-specific prompt. It names the sections and
+# their item fields instead of repeating the JSON layout, which keeps it
+# well under ANALYSIS_PREFIX; the case type comes after it, so the prefix
+# is shared by every type.
+TYPED_ANALYSIS_PREFIX = """
+You are an expert legal AI assistant helping lawyers analyze cases comprehensively.
+
+Analyze the case below and answer in STRICT JSON with exactly these keys:
+- case_summary, estimated_outcome, timeline_considerations: strings
+- key_facts, evidence_needed, precedents: lists of strings
+- legal_issues [issue, description, importance], applicable_laws [law, description, relevance],
+  strengths [point, explanation], weaknesses [point, explanation, severity],
+  recommended_actions [action, priority, rationale]: lists of objects with the fields in brackets;
+  importance, severity and priority are High, Medium or Low
+
+RULES:
+- Output ONLY valid JSON; use [] or "Not specified" when information is missing
+- Be specific and actionable
+- Prefer citing the REFERENCE STATUTE SECTIONS when they apply; cite other laws only if you are sure they exist
+"""
+
+
+def typed_case_analysis_prompt(
+    case_text: str,
+    case_type: str,
+    reference_sections: str = "",
+    candidate_issues: str = "",
+) -> str:
+    """Shorter prompt used once the case type is known locally; the model does not return case_type"""
+    issues = f"""
+POSSIBLE ISSUES (keyword screening; confirm or discard):
+{candidate_issues}
+""" if candidate_issues else ""
+    return TYPED_ANALYSIS_PREFIX + f"""
+This is a {case_type} matter; focus on {CASE_TYPE_FOCUS.get(case_type, "the legal issues raised")}.
+{_references_block(reference_sections)}{issues}
+CASE TEXT:
+{case_text}
+"""
+
+# Static opening of every chunk prompt (see ANALYSIS_PREFIX)
+CHUNK_PREFIX = f"""
+You are an expert legal AI assistant. You are reading one part of a long legal document.
+
+Extract ONLY what is stated in this part, in STRICT JSON format:
+
+{_schema(("key_facts", "legal_issues", "applicable_laws", "evidence_needed", "dates_and_deadlines"))}
+
+IMPORTANT RULES:
+- Output ONLY valid JSON, no markdown, no explanations outside JSON
+- Do not guess about parts of the document you have not seen
+- Use empty arrays [] when this part contains nothing relevant
+"""
+
+
+def chunk_extraction_prompt(chunk_text: str, chunk_index: int, chunk_count: int) -> str:
+    return CHUNK_PREFIX + f"""
+DOCUMENT PART {chunk_index}/{chunk_count}:
+{chunk_text}
+"""
+
+
+_SYNTHESIS_KEYS = (
+    "case_type", "case_summary", "strengths", "weaknesses", "recommended_actions",
+    "precedents", "estimated_outcome", "timeline_considerations",
+)
+
+
+def case_synthesis_prompt(extracted: str) -> str:
+    return f"""
+You are an expert legal AI assistant helping lawyers analyze cases comprehensively.
+
+The facts, issues and laws below were extracted from every part of a long case document.
+Using ONLY this material, complete the analysis in STRICT JSON format:
+
+{_schema(_SYNTHESIS_KEYS)}
+
+IMPORTANT RULES:
+- Output ONLY valid JSON, no markdown, no explanations outside JSON
+- If information is not available, use empty arrays [] or "Not specified"
+
+EXTRACTED MATERIAL:
+{extracted}
+"""
+
+
+def case_update_prompt(previous_analysis: str, added: str, removed: str) -> str:
+    return f"""
+You are an expert legal AI assistant. A case you already analyzed has been re-submitted with edits.
+
+Update the previous analysis for the edits below. Answer in STRICT JSON containing ONLY the keys of the
+previous analysis whose content changes, each with its complete new value in the same structure.
+Answer {{}} if nothing changes.
+
+IMPORTANT RULES:
+- Output ONLY valid JSON, no markdown, no explanations outside JSON
+- Judge every change against the whole case as described by the previous analysis
+
+PREVIOUS ANALYSIS:
+{previous_analysis}
+
+SENTENCES ADDED OR CHANGED:
+{added or "(none)"}
+
+SENTENCES REMOVED:
+{removed or "(none)"}
+"""
+
+
+def missing_sections_prompt(case_text: str, sections) -> str:
+    return f"""
+You are an expert legal AI assistant. An earlier analysis of the case below left out some sections.
+
+Provide ONLY these sections in STRICT JSON:
+
+{_schema(sections)}
+
+IMPORTANT RULES:
+- Output ONLY valid JSON, no markdown, no explanations outside JSON
+- If information is not available, use empty arrays [] or "Not specified"
+
+CASE TEXT:
+{case_text}
+"""
@@ -0,0 +1,326 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Optional, Tuple
+from app.llm.circuit_breaker import CircuitBreaker
+from app.utils.metrics import LLM_REQUEST_SECONDS, record_stage, stage
+from app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+SEQUENTIAL = "sequential"
+HEDGED = "hedged"
+RACE = "race"
+SCHEDULER_MODES = (SEQUENTIAL, HEDGED, RACE)
+
+SCHEDULER_MODE = os.getenv("LLM_SCHEDULER_MODE", SEQUENTIAL).lower()
+ADAPTIVE_ORDER = os.getenv("LLM_ADAPTIVE_ORDER", "true").lower() in ("1", "true", "yes")
+# Hedge delay used until a provider has enough latency samples for a p95
+DEFAULT_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "10"))
+
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 50
+MIN_SAMPLES = 5
+
+
+class ProviderUnavailable(RuntimeError):
+    """Raised when a provider is skipped before any request is made"""
+
+
+class ProviderStats:
+    """
+    Rolling latency / success statistics for one provider: EWMA latency,
+    EWMA success rate and a window of recent latencies for percentiles
+    """
+
+    def __init__(self):
+        self.ewma_latency: Optional[float] = None
+        self.success_rate = 1.0
+        self.successes = 0
+        self.failures = 0
+        self.cancellations = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def observations(self) -> int:
+        return self.successes + self.failures + self.cancellations
+
+    def record_success(self, latency: float) -> None:
+        self.successes += 1
+        self._latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += EWMA_ALPHA * (latency - self.ewma_latency)
+        self.success_rate += EWMA_ALPHA * (1.0 - self.success_rate)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.success_rate += EWMA_ALPHA * (0.0 - self.success_rate)
+
+    def record_cancelled(self, elapsed: float) -> None:
+        """
+        A hedged/raced attempt lost and was cancelled: its latency is at
+        least `elapsed`, so only ever raise the latency estimate
+        """
+        self.cancellations += 1
+        if self.ewma_latency is None:
+            self.ewma_latency = elapsed
+        elif elapsed > self.ewma_latency:
+            self.ewma_latency += EWMA_ALPHA * (elapsed - self.ewma_latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if self.samples < MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def expected_cost(self) -> float:
+        """Expected seconds to a successful answer; lower is better"""
+        latency = self.ewma_latency if self.ewma_latency is not None else DEFAULT_HEDGE_DELAY
+        return latency / max(self.success_rate, 0.05)
+
+    def to_dict(self) -> dict:
+        p95 = self.percentile(0.95)
+        return {
+            "ewma_latency_s": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "p95_latency_s": round(p95, 3) if p95 is not None else None,
+            "success_rate": round(self.success_rate, 3),
+            "successes": self.successes,
+            "failures": self.failures,
+            "cancellations": self.cancellations,
+        }
+
+
+class Provider:
+    """
+    An LLM backend the scheduler can dispatch a prompt to.
+
+    Args:
+        name: Display name used in logs and error details
+        call: Coroutine function taking the prompt and returning parsed JSON
+        is_available: Coroutine function checked right before each attempt
+        unavailable_message: Error detail recorded when is_available is False
+        breaker: Circuit breaker guarding the provider (one is created if omitted)
+        max_concurrency: Cap on simultaneous calls (0 = unlimited)
+        requests_per_minute: Rate limit on calls (0 = unlimited)
+        rate_limiter: Limiter to use instead of a local TokenBucket for
+            requests_per_minute, e.g. a MongoRateLimiter shared by all workers
+    """
+
+    def __init__(
+        self,
+        name: str,
+        call: Callable[[str], Awaitable[dict]],
+        is_available: Callable[[], Awaitable[bool]],
+        unavailable_message: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_concurrency: int = 0,
+        requests_per_minute: float = 0,
+        rate_limiter=None,
+    ):
+        self.name = name
+        self.call = call
+        self.is_available = is_available
+        self.unavailable_message = unavailable_message or f"{name} is not available"
+        self.stats = ProviderStats()
+        self.breaker = breaker or CircuitBreaker(name)
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        if rate_limiter is None and requests_per_minute:
+            rate_limiter = TokenBucket(requests_per_minute / 60, 1)
+        self._rate_limiter = rate_limiter
+        self.in_flight = 0
+
+    @asynccontextmanager
+    async def limit(self):
+        """Hold a concurrency slot and a rate-limit token for one call"""
+        if self._slots is not None:
+            await self._slots.acquire()
+        try:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+
+def is_valid_result(result) -> bool:
+    """A usable analysis is a non-empty JSON object"""
+    return isinstance(result, dict) and bool(result)
+
+
+class ProviderScheduler:
+    """
+    Dispatch a prompt across providers in one of three modes:
+
+    - sequential: try providers one after another (the original behavior)
+    - hedged: start the next provider if the current one has not answered
+      within its p95 latency, and take whichever answers first
+    - race: start all providers at once and take the first valid JSON
+
+    Losing attempts are cancelled. With adaptive ordering, providers are
+    tried in order of expected cost (EWMA latency / success rate) once
+    each has enough observations.
+    """
+
+    def __init__(self, providers: List[Provider], mode: str = SCHEDULER_MODE, adaptive: bool = ADAPTIVE_ORDER):
+        if mode not in SCHEDULER_MODES:
+            logger.warning(f"Unknown scheduler mode '{mode}', using {SEQUENTIAL}")
+            mode = SEQUENTIAL
+        self.providers = providers
+        self.mode = mode
+        self.adaptive = adaptive
+
+    def ordered_providers(self) -> List[Provider]:
+        if self.adaptive and all(p.stats.observations >= MIN_SAMPLES for p in self.providers):
+            return sorted(self.providers, key=lambda p: p.stats.expected_cost())
+        return list(self.providers)
+
+    def _launch_delay(self, provider: Provider) -> Optional[float]:
+        """Seconds to wait on `provider` before starting the next one"""
+        if self.mode == RACE:
+            return 0
+        if self.mode == HEDGED:
+            p95 = provider.stats.percentile(0.95)
+            return p95 if p95 is not None else DEFAULT_HEDGE_DELAY
+        return None
+
+    async def _attempt(self, provider: Provider, prompt: str, accept: Callable[[object], bool]) -> dict:
+        breaker = provider.breaker
+        if not breaker.allow_request():
+            raise ProviderUnavailable(f"{provider.name} circuit breaker is open")
+        with stage("provider_probe"):
+            available = await provider.is_available()
+        if not available:
+            breaker.release()
+            raise ProviderUnavailable(provider.unavailable_message)
+
+        start = None
+        try:
+            queued_at = time.perf_counter()
+            async with provider.limit():
+                # Time the call itself, not the wait for a slot
+                start = time.perf_counter()
+                record_stage("provider_queue", start - queued_at)
+                logger.info(f"🚀 Attempting {provider.name}...")
+                result = await provider.call(prompt)
+        except asyncio.CancelledError:
+            breaker.release()
+            if start is not None:
+                elapsed = time.perf_counter() - start
+                provider.stats.record_cancelled(elapsed)
+                LLM_REQUEST_SECONDS.observe(elapsed, provider.name, "cancelled")
+            raise
+        except Exception:
+            breaker.record_failure()
+            provider.stats.record_failure()
+            if start is not None:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider.name, "error")
+            raise
+
+        elapsed = time.perf_counter() - start
+        record_stage("llm_call", elapsed)
+        # A raw-text answer is a bad generation, not an outage
+        breaker.record_success()
+        if accept(result):
+            provider.stats.record_success(elapsed)
+            LLM_REQUEST_SECONDS.observe(elapsed, provider.name, "ok")
+            logger.info(f"✅ {provider.name} analysis successful")
+        else:
+            provider.stats.record_failure()
+            LLM_REQUEST_SECONDS.observe(elapsed, provider.name, "invalid_json")
+        return result
+
+    async def run(self, prompt: str, accept: Callable[[object], bool] = is_valid_result) -> Tuple[dict, List[str]]:
+        """
+        Return (result, errors). `result` is the first response `accept`
+        approves (by default a non-empty JSON object), falling back to the
+        last other response if no provider produced one, or None if every
+        provider failed. `errors` lists per-provider failure details.
+        """
+        queue = self.ordered_providers()
+        errors: List[str] = []
+        fallback_result = None
+        running = {}
+
+        def launch_next() -> Optional[Provider]:
+            if not queue:
+                return None
+            provider = queue.pop(0)
+            running[asyncio.ensure_future(self._attempt(provider, prompt, accept))] = provider
+            return provider
+
+        head = launch_next()
+        try:
+            while running:
+                delay = self._launch_delay(head) if queue else None
+                if delay == 0:
+                    head = launch_next()
+                    continue
+
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"⏱️ {head.name} slower than {delay:.1f}s, hedging with next provider")
+                    head = launch_next()
+                    continue
+
+                failed = False
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        result = task.result()
+                    except ProviderUnavailable as e:
+                        errors.append(str(e))
+                        failed = True
+                        continue
+                    except Exception as e:
+                        err_msg = f"{provider.name} failed: {str(e)}"
+                        logger.warning(f"⚠️ {err_msg}")
+                        errors.append(err_msg)
+                        failed = True
+                        continue
+
+                    if accept(result):
+                        return result, errors
+                    fallback_result = result
+                    failed = True
+
+                # A failed attempt hands over to the next provider straight away
+                if failed or not running:
+                    head = launch_next() or head
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return fallback_result, errors
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "adaptive": self.adaptive,
+            "order": [p.name for p in self.ordered_providers()],
+            "providers": {
+                p.name: {
+                    **p.stats.to_dict(),
+                    "in_flight": p.in_flight,
+                    "max_concurrency": p.max_concurrency or None,
+                    "breaker": p.breaker.to_dict(),
+                }
+                for p in self.providers
+            },
+        }
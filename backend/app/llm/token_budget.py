@@ -0,0 +1,82 @@
+import os
+import re
+from collections import Counter
+from typing import Dict
+
+CHARS_PER_TOKEN = 4
+
+# Generation cap grows with the input: longer cases get longer analyses
+MIN_OUTPUT_TOKENS = int(os.getenv("LLM_MIN_OUTPUT_TOKENS", "1024"))
+MAX_OUTPUT_TOKENS = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "2048"))
+OUTPUT_TOKENS_PER_INPUT_TOKEN = 0.5
+# Context size for every Ollama request. Ollama reloads the model whenever
+# num_ctx changes, so it is fixed rather than sized per prompt; only the
+# answer length (num_predict) varies.
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "8192"))
+# The character-based estimate is rough; leave headroom before the context fills up
+_ESTIMATE_MARGIN = 1.1
+
+# "Page 3", "Page 3 of 12", "- 3 -", "3/12", or a bare page number
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*\d+(?:\s*(?:of|/)\s*\d+)?|[-–]\s*\d+\s*[-–]|\d+\s*/\s*\d+|\d{1,4})$", re.IGNORECASE)
+# Signature lines: "Sd/-", "(Signature)", "Signature of the complainant", "[signed]"
+_SIGNATURE_RE = re.compile(r"^(?:sd/-.*|\(?signature\)?(?:\s+of\b.*)?|\[?signed\]?)$", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v]+")
+# Lines repeated at least this often are running headers or footers
+_REPEATED_LINE_MIN = 3
+_REPEATED_LINE_MAX_CHARS = 120
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def compact_case_text(text: str) -> str:
+    """
+    Drop what costs prompt tokens but says nothing about the case: page
+    numbers, running headers and footers (short lines repeated on every
+    page; the first copy is kept), signature lines, and redundant
+    whitespace. Everything else is left as written.
+    """
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.splitlines()]
+    # Headers often carry the page number, so compare lines with digits masked
+    masked = [_DIGITS_RE.sub("#", line).lower() for line in lines]
+    counts = Counter(m for line, m in zip(lines, masked) if line and len(line) <= _REPEATED_LINE_MAX_CHARS)
+    repeated = {m for m, count in counts.items() if count >= _REPEATED_LINE_MIN}
+
+    kept, seen, blank = [], set(), False
+    for line, m in zip(lines, masked):
+        if not line:
+            blank = bool(kept)
+            continue
+        if _PAGE_NUMBER_RE.match(line) or _SIGNATURE_RE.match(line):
+            continue
+        if m in repeated:
+            if m in seen:
+                continue
+            seen.add(m)
+        if blank:
+            kept.append("")
+            blank = False
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def output_token_budget(prompt_tokens: int) -> int:
+    """num_predict for a prompt of `prompt_tokens`"""
+    budget = MIN_OUTPUT_TOKENS + int(prompt_tokens * OUTPUT_TOKENS_PER_INPUT_TOKEN)
+    return max(MIN_OUTPUT_TOKENS, min(MAX_OUTPUT_TOKENS, budget))
+
+
+def ollama_context_options(prompt: str) -> Dict[str, int]:
+    """
+    num_ctx and num_predict for this prompt: the fixed context (so the
+    loaded model is reused), with the answer sized from the prompt and
+    shortened rather than the prompt when both do not fit.
+    """
+    prompt_tokens = int(estimate_tokens(prompt) * _ESTIMATE_MARGIN)
+    num_predict = output_token_budget(prompt_tokens)
+    if prompt_tokens + num_predict > OLLAMA_NUM_CTX:
+        num_predict = max(MIN_OUTPUT_TOKENS // 2, OLLAMA_NUM_CTX - prompt_tokens)
+    return {"num_ctx": OLLAMA_NUM_CTX, "num_predict": num_predict}
@@ -1,9 +1,95 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.routes import router
+from app.api.dependencies import AUTH_REQUIRED
+from app.auth.auth_routes import router as auth_router
+from app.auth.jwt_handler import token_cache_stats
+from app.auth.quotas import anon_quotas, login_quotas, user_quotas
+from app.config import MAX_CONCURRENT_REQUESTS, REQUEST_QUEUE_TIMEOUT, SHARED_STATE_BACKEND, WEB_CONCURRENCY
+from app.llm.llm_client import open_http_client, close_http_client
+from app.llm.json_repair import repair_counts
+from app.core.result_cache import analysis_cache
+from app.core.semantic_cache import semantic_cache, SEMANTIC_CACHE_ENABLED
+from app.core.analyzer import provider_scheduler, health_monitor
+from app.jobs.queue import job_queue
+from app.database import case_repository, user_repository
+from app.database.db import close_client
+from app.law_mapping.section_mapper import section_index
+from app.reports.report_generator import report_generator
+from app.llm.ollama_client import warm_up_ollama_async, OLLAMA_WARMUP
+from app.llm.prompts import ANALYSIS_PREFIX, TYPED_ANALYSIS_PREFIX
+from app.utils.concurrency import ConcurrencyLimitMiddleware, RequestLimiter
+from app.utils.metrics import Gauge, MetricsMiddleware, registry
 
-app = FastAPI(title="AI-Lawyer API")
+logger = logging.getLogger(__name__)
 
+# Per-process cap on requests being worked on; see app/config.py
+request_limiter = RequestLimiter(MAX_CONCURRENT_REQUESTS, REQUEST_QUEUE_TIMEOUT)
+# Startup of this worker process, reported by /health
+serving = {"pid": os.getpid(), "workers": WEB_CONCURRENCY, "shared_state": SHARED_STATE_BACKEND}
+
+# Progress of the startup warm-up of the local model, reported by /health
+ollama_warmup = {"status": "enabled" if OLLAMA_WARMUP else "disabled"}
+
+
+async def warm_up_local_model():
+    """Runs in the background so a cold model load does not hold up startup"""
+    ollama_warmup["status"] = "running"
+    start = time.perf_counter()
+    try:
+        # Most cases are classified confidently and get the typed prompt
+        timings = await warm_up_ollama_async((ANALYSIS_PREFIX, TYPED_ANALYSIS_PREFIX))
+    except RuntimeError as e:
+        logger.warning(f"⚠️ {e}")
+        ollama_warmup.update(status="failed", error=str(e))
+        return
+    ollama_warmup.update(status="done" if timings else "skipped", total_s=round(time.perf_counter() - start, 3), **timings)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start = time.perf_counter()
+    # Under a preloading gunicorn the module was imported in the master
+    serving["pid"] = os.getpid()
+    # Shared keep-alive connection pool for Gemini / Ollama calls
+    await open_http_client()
+    # Map (or build, on first run) the statute index before traffic arrives
+    await asyncio.to_thread(section_index.load)
+    if case_repository.persistence_enabled():
+        await case_repository.ensure_case_indexes()
+        await user_repository.ensure_user_indexes()
+        if SEMANTIC_CACHE_ENABLED:
+            semantic_cache.start_loading()
+    health_monitor.start()
+    await job_queue.start()
+    # Report rendering processes; spawned on the first download
+    report_generator.start()
+    warmup_task = asyncio.create_task(warm_up_local_model()) if OLLAMA_WARMUP else None
+    serving["startup_s"] = round(time.perf_counter() - start, 3)
+    logger.info(f"🚀 Worker {serving['pid']} started in {serving['startup_s']}s (shared state: {SHARED_STATE_BACKEND})")
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await semantic_cache.stop()
+    report_generator.stop()
+    await job_queue.stop()
+    await health_monitor.stop()
+    await close_http_client()
+    close_client()
+
+
+app = FastAPI(title="AI-Lawyer API", lifespan=lifespan)
+
+# Middleware added later wraps the earlier ones
+app.add_middleware(ConcurrencyLimitMiddleware, limiter=request_limiter)
+app.add_middleware(MetricsMiddleware)
+# Outermost, so preflights never wait for a slot and 503s still carry CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -11,10 +97,73 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+registry.register(Gauge(
+    "ai_lawyer_analysis_cache", "Analysis cache counters",
+    lambda: {
+        (key,): value for key, value in analysis_cache.stats().items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    },
+    labels=("stat",),
+))
+registry.register(Gauge(
+    "ai_lawyer_http_requests", "HTTP requests being worked on, waiting for a slot, and rejected as busy",
+    lambda: {(key,): value for key, value in request_limiter.stats().items()},
+    labels=("state",),
+))
+registry.register(Gauge(
+    "ai_lawyer_batch_queued_items", "Batch items waiting for a worker",
+    lambda: {(): job_queue.queued_items()},
+))
+registry.register(Gauge(
+    "ai_lawyer_reports", "Case report downloads served from the disk cache, rendered, and failed",
+    lambda: {(key,): report_generator.stats()[key] for key in ("hits", "rendered", "coalesced", "failures")},
+    labels=("stat",),
+))
+registry.register(Gauge(
+    "ai_lawyer_quota_rejections", "Requests turned away by per-client quotas, by client kind and reason",
+    lambda: {
+        (kind, reason): quotas.stats()[f"rejected_{reason}"]
+        for kind, quotas in (("user", user_quotas), ("anonymous", anon_quotas), ("login", login_quotas))
+        for reason in ("rate", "concurrency")
+    },
+    labels=("client", "reason"),
+))
+registry.register(Gauge(
+    "ai_lawyer_json_repairs", "Malformed model JSON repaired since startup, by kind",
+    lambda: {(kind,): count for kind, count in repair_counts.items()},
+    labels=("kind",),
+))
+registry.register(Gauge(
+    "ai_lawyer_provider_in_flight", "LLM calls in flight per provider",
+    lambda: {(p.name,): p.in_flight for p in provider_scheduler.providers},
+    labels=("provider",),
+))
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "serving": {**serving, "requests": request_limiter.stats()},
+        "analysis_cache": analysis_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "providers": health_monitor.snapshot(),
+        "scheduler": provider_scheduler.stats(),
+        "batch_queue": {"queued_items": job_queue.queued_items()},
+        "reports": report_generator.stats(),
+        "auth": {
+            "required": AUTH_REQUIRED,
+            "token_cache": token_cache_stats(),
+            "users": user_quotas.stats(),
+            "anonymous": anon_quotas.stats(),
+        },
+        "ollama_warmup": ollama_warmup,
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 # 🔥 THIS LINE IS CRITICAL
 app.include_router(router, prefix="/api/v1")
-
+app.include_router(auth_router, prefix="/api/v1/auth")
@@ -0,0 +1,325 @@
+"""
+Downloadable case briefs: a stored analysis rendered as PDF (reportlab) or
+DOCX (python-docx). Rendering is CPU-bound, so it runs in a process pool
+and never on the event loop; each rendered file is cached on disk by
+analysis id and TEMPLATE_VERSION and served from there on later downloads.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout changes: cached reports of older versions are
+# then never served again (and pruned as the cache fills)
+TEMPLATE_VERSION = 1
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ai_lawyer_reports"))
+REPORT_CACHE_MAX_FILES = int(os.getenv("REPORT_CACHE_MAX_FILES", "2000"))
+# Rendering processes per app worker (0 = one per CPU)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+# A partial file this old was left by a render process that died; live
+# renders take well under a second
+_STALE_PART_SECONDS = 3600
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+DISCLAIMER = (
+    "This brief was generated automatically from an AI analysis of the case text. "
+    "It is not legal advice and must be reviewed by a qualified advocate."
+)
+
+# (heading, section, fields of each item: headline first, the rest as "Label: value")
+LIST_SECTIONS = (
+    ("Legal Issues", "legal_issues", ("issue", "description", "importance")),
+    ("Applicable Laws", "applicable_laws", ("law", "description", "relevance")),
+    ("Strengths", "strengths", ("point", "explanation")),
+    ("Weaknesses", "weaknesses", ("point", "explanation", "severity")),
+    ("Recommended Actions", "recommended_actions", ("action", "rationale", "priority")),
+)
+
+
+def _outline(analysis: dict, meta: dict) -> List[Tuple[str, object]]:
+    """
+    The brief as format-neutral blocks, so both renderers share one layout:
+    ("title", str), ("meta", str), ("heading", str), ("paragraph", str),
+    ("bullets", [str]) and ("items", [(headline, [detail, ...])])
+    """
+    blocks: List[Tuple[str, object]] = [("title", meta.get("title") or "Case Analysis Brief")]
+    created_at = meta.get("created_at")
+    details = [f"Case type: {analysis.get('case_type', 'Not specified')}"]
+    if meta.get("case_id"):
+        details.append(f"Case ID: {meta['case_id']}")
+    if isinstance(created_at, datetime):
+        details.append(f"Analysed: {created_at:%d %B %Y}")
+    blocks.append(("meta", "  |  ".join(details)))
+
+    blocks += [("heading", "Case Summary"), ("paragraph", analysis.get("case_summary", ""))]
+    blocks += [("heading", "Key Facts"), ("bullets", analysis.get("key_facts", []))]
+    for heading, section, fields in LIST_SECTIONS:
+        items = []
+        for item in analysis.get(section, []):
+            if not isinstance(item, dict):
+                items.append((str(item), []))
+                continue
+            headline = str(item.get(fields[0], ""))
+            if item.get("verified"):
+                headline += " (verified)"
+            items.append((headline, [
+                f"{field.capitalize()}: {item[field]}" for field in fields[1:] if item.get(field)
+            ]))
+        blocks += [("heading", heading), ("items", items)]
+    blocks += [("heading", "Evidence Needed"), ("bullets", analysis.get("evidence_needed", []))]
+    blocks += [("heading", "Relevant Precedents"), ("bullets", analysis.get("precedents", []))]
+    blocks += [("heading", "Estimated Outcome"), ("paragraph", analysis.get("estimated_outcome", ""))]
+    blocks += [("heading", "Timeline Considerations"), ("paragraph", analysis.get("timeline_considerations", ""))]
+    blocks.append(("meta", DISCLAIMER))
+    return blocks
+
+
+def render_pdf(analysis: dict, meta: dict, path: str) -> None:
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import mm
+        from reportlab.platypus import ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer
+    except ImportError:
+        raise RuntimeError("PDF reports need reportlab (pip install reportlab)")
+    from xml.sax.saxutils import escape
+
+    styles = getSampleStyleSheet()
+    story = []
+
+    def bullets(lines, style="BodyText"):
+        return ListFlowable(
+            [ListItem(Paragraph(escape(str(line)), styles[style]), leftIndent=12) for line in lines],
+            bulletType="bullet", start="•", leftIndent=12,
+        )
+
+    for kind, value in _outline(analysis, meta):
+        if kind == "title":
+            story.append(Paragraph(escape(value), styles["Title"]))
+        elif kind == "meta":
+            story += [Paragraph(escape(value), styles["Italic"]), Spacer(1, 4 * mm)]
+        elif kind == "heading":
+            story.append(Paragraph(escape(value), styles["Heading2"]))
+        elif kind == "paragraph":
+            story.append(Paragraph(escape(str(value)), styles["BodyText"]))
+        elif kind == "bullets" and value:
+            story.append(bullets(value))
+        elif kind == "items":
+            for headline, item_details in value:
+                story.append(Paragraph(f"<b>{escape(headline)}</b>", styles["BodyText"]))
+                if item_details:
+                    story.append(bullets(item_details))
+
+    SimpleDocTemplate(
+        path, pagesize=A4, title=meta.get("title") or "Case Analysis Brief", author="AI-Lawyer",
+        leftMargin=18 * mm, rightMargin=18 * mm, topMargin=18 * mm, bottomMargin=18 * mm,
+    ).build(story)
+
+
+def render_docx(analysis: dict, meta: dict, path: str) -> None:
+    try:
+        import docx
+    except ImportError:
+        raise RuntimeError("DOCX reports need python-docx (pip install python-docx)")
+
+    document = docx.Document()
+    document.core_properties.author = "AI-Lawyer"
+    # python-docx scans every style to resolve a style name, per paragraph;
+    # resolve each once and set the id on the paragraph XML directly
+    style_ids = {name: document.styles[name].style_id for name in ("Title", "Heading 1", "List Bullet")}
+
+    def add(text: str, style: Optional[str] = None):
+        paragraph = document.add_paragraph(text)
+        if style is not None:
+            paragraph._p.style = style_ids[style]
+        return paragraph
+
+    for kind, value in _outline(analysis, meta):
+        if kind == "title":
+            add(value, "Title")
+            document.core_properties.title = value
+        elif kind == "meta":
+            add("").add_run(value).italic = True
+        elif kind == "heading":
+            add(value, "Heading 1")
+        elif kind == "paragraph":
+            add(str(value))
+        elif kind == "bullets":
+            for line in value:
+                add(str(line), "List Bullet")
+        elif kind == "items":
+            for headline, item_details in value:
+                add("").add_run(headline).bold = True
+                for line in item_details:
+                    add(line, "List Bullet")
+    document.save(path)
+
+
+RENDERERS = {"pdf": render_pdf, "docx": render_docx}
+
+
+def render_to_file(fmt: str, analysis: dict, meta: dict, path: str) -> float:
+    """
+    Render into `path` atomically (a temporary file renamed into place), so
+    readers and other app workers never see a half-written report. Runs in
+    a pool process; returns the render time in seconds.
+    """
+    start = time.perf_counter()
+    partial = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        RENDERERS[fmt](analysis, meta, partial)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return time.perf_counter() - start
+
+
+class ReportGenerator:
+    """
+    Renders reports in a process pool behind a disk cache keyed by analysis
+    id, TEMPLATE_VERSION and format. Concurrent downloads of a report not
+    yet on disk share one render.
+    """
+
+    def __init__(self, cache_dir: str = REPORT_CACHE_DIR, workers: int = REPORT_WORKERS,
+                 max_files: int = REPORT_CACHE_MAX_FILES):
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.max_files = max_files
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.rendered = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.render_seconds = 0.0
+
+    def start(self) -> None:
+        if self._pool is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # spawn: forking a process that runs an event loop and client
+            # threads is unsafe; pool processes import only this module
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def path_for(self, analysis_id: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{analysis_id}-v{TEMPLATE_VERSION}.{fmt}")
+
+    def cached(self, analysis_id: str, fmt: str) -> Optional[str]:
+        """Path of the report if it is already on disk"""
+        path = self.path_for(analysis_id, fmt)
+        if not os.path.exists(path):
+            return None
+        self.hits += 1
+        return path
+
+    async def render(self, analysis_id: str, fmt: str, analysis: dict, meta: Optional[dict] = None) -> str:
+        """
+        Path of the rendered report, from the disk cache or rendered now
+
+        Raises:
+            RuntimeError: If the format is unknown or rendering fails
+        """
+        if fmt not in RENDERERS:
+            raise RuntimeError(f"Unknown report format {fmt!r}: use {' or '.join(RENDERERS)}")
+        cached = self.cached(analysis_id, fmt)
+        if cached is not None:
+            return cached
+
+        path = self.path_for(analysis_id, fmt)
+        pending = self._pending.get(path)
+        if pending is not None:
+            self.coalesced += 1
+        else:
+            self.start()
+            pending = asyncio.get_running_loop().run_in_executor(
+                self._pool, render_to_file, fmt, analysis, {**(meta or {}), "case_id": analysis_id}, path
+            )
+            self._pending[path] = pending
+            pending.add_done_callback(lambda done: self._finished(path, done))
+        try:
+            # Shielded: a client that disconnects does not cancel the render
+            # for the others waiting on it, and the file still lands in the cache
+            await asyncio.shield(pending)
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Rendering the {fmt} report failed: {e}")
+        return path
+
+    def _finished(self, path: str, done: asyncio.Future) -> None:
+        del self._pending[path]
+        if done.cancelled():
+            return
+        error = done.exception()
+        if error is not None:
+            self.failures += 1
+            logger.error(f"❌ Rendering {os.path.basename(path)} failed: {error}")
+            if isinstance(error, BrokenProcessPool):
+                # A render process died (e.g. killed for memory): start a fresh pool next time
+                self.stop()
+            return
+        self.rendered += 1
+        self.render_seconds += done.result()
+        logger.info(f"📄 Rendered {os.path.basename(path)} in {done.result():.2f}s")
+        if self.rendered % 50 == 0:
+            asyncio.get_running_loop().run_in_executor(None, self.prune)
+
+    def prune(self) -> int:
+        """
+        Delete the oldest cached reports beyond max_files, and stale partial
+        files; returns how many went. Partial files of renders that may
+        still be running, in this or another app worker, are left alone.
+        """
+        try:
+            files = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+        except FileNotFoundError:
+            return 0
+        entries = [entry for entry in files if not entry.name.endswith(".part")]
+        stale_before = time.time() - _STALE_PART_SECONDS
+        doomed = [entry for entry in files if entry.name.endswith(".part") and entry.stat().st_mtime < stale_before]
+        excess = len(entries) - self.max_files
+        if excess > 0:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            doomed += entries[:excess]
+        removed = 0
+        for entry in doomed:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "template_version": TEMPLATE_VERSION,
+            "workers": self.workers,
+            "hits": self.hits,
+            "rendered": self.rendered,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "mean_render_ms": round(self.render_seconds / self.rendered * 1000, 1) if self.rendered else None,
+        }
+
+
+report_generator = ReportGenerator()
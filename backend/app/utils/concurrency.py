@@ -0,0 +1,81 @@
+import asyncio
+import math
+
+from starlette.responses import JSONResponse
+
+
+class RequestLimiter:
+    """Slots for the HTTP requests one process works on at once (0 = unlimited)"""
+
+    def __init__(self, max_concurrent: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> bool:
+        """Wait up to queue_timeout for a slot; False if none came free"""
+        if self._slots is None:
+            self.active += 1
+            return True
+        if self._slots.locked():
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Pure ASGI middleware holding a RequestLimiter slot for each HTTP request.
+    Requests that wait longer than the queue timeout get a 503 with
+    Retry-After, so an overloaded worker sheds load (and a load balancer
+    can retry elsewhere) instead of queueing without bound. Paths in
+    `exempt_paths` (health checks, metrics scrapes) are never held back.
+    """
+
+    def __init__(self, app, limiter: RequestLimiter, exempt_paths=("/health", "/metrics")):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.limiter.acquire():
+            response = JSONResponse(
+                {"detail": "Server is busy, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(math.ceil(self.limiter.queue_timeout))},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
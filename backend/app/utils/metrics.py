@@ -0,0 +1,207 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# Seconds; spans sub-millisecond local stages up to slow local generations
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 400)
+
+# Per-request stage durations (name -> seconds) for the Server-Timing header.
+# Holds a mutable dict so tasks and threads spawned by the request, which
+# get a copy of the context, still add to the same timings.
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Prometheus-style histogram; `observe` is a bisect and two additions"""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (+Inf last), then sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {cumulative}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    """Gauge read from a callback at scrape time, so it costs nothing between scrapes"""
+
+    def __init__(self, name: str, help: str, read: Callable[[], Dict[Tuple[str, ...], float]], labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.labels = tuple(labels)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        lines += [f"{self.name}{_format_labels(self.labels, labels)} {value}" for labels, value in sorted(self.read().items())]
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "ai_lawyer_stage_seconds", "Time spent in each analysis stage", labels=("stage",)
+))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "ai_lawyer_http_request_seconds", "HTTP request latency", labels=("method", "endpoint", "status")
+))
+LLM_REQUEST_SECONDS = registry.register(Histogram(
+    "ai_lawyer_llm_request_seconds", "Wall time of LLM provider calls", labels=("provider", "outcome")
+))
+LLM_PROMPT_TOKENS = registry.register(Histogram(
+    "ai_lawyer_llm_prompt_tokens", "Prompt tokens per LLM call", TOKEN_BUCKETS, labels=("provider",)
+))
+LLM_COMPLETION_TOKENS = registry.register(Histogram(
+    "ai_lawyer_llm_completion_tokens", "Generated tokens per LLM call", TOKEN_BUCKETS, labels=("provider",)
+))
+LLM_TOKENS_PER_SECOND = registry.register(Histogram(
+    "ai_lawyer_llm_tokens_per_second", "Generation speed reported by the provider",
+    TOKENS_PER_SECOND_BUCKETS, labels=("provider",)
+))
+
+
+def record_stage(name: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class stage:
+    """
+    Time a block as one analysis stage:
+
+        with stage("prompt_build"):
+            ...
+
+    Works in sync and async code; concurrent stages of the same name within
+    a request (e.g. hedged provider calls) add up in Server-Timing.
+    """
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.name, time.perf_counter() - self._start)
+        return False
+
+
+def record_llm_usage(provider: str, prompt_tokens: Optional[int], completion_tokens: Optional[int],
+                     generation_seconds: Optional[float] = None) -> None:
+    """Token counts and generation speed as reported by the provider, when it reports them"""
+    if prompt_tokens:
+        LLM_PROMPT_TOKENS.observe(prompt_tokens, provider)
+    if completion_tokens:
+        LLM_COMPLETION_TOKENS.observe(completion_tokens, provider)
+        if generation_seconds:
+            LLM_TOKENS_PER_SECOND.observe(completion_tokens / generation_seconds, provider)
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: times each HTTP request and adds a Server-Timing
+    header with the stages recorded while producing the response. For
+    streaming responses the header only covers stages finished before the
+    first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings, time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            endpoint = scope.get("endpoint")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(endpoint, "__name__", "unmatched"),
+                str(status[0]),
+            )
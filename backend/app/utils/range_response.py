@@ -0,0 +1,112 @@
+import os
+import re
+import stat
+from email.utils import formatdate
+from typing import Optional, Tuple
+
+import anyio
+from starlette.responses import Response
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    The inclusive (start, end) byte range a Range header asks for, or None
+    for the whole file (no header, a multi-range or a non-byte unit, which
+    a server may answer with the full body)
+
+    Raises:
+        ValueError: If the range lies outside the file (answer 416)
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.fullmatch(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length or not size:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class RangeFileResponse(Response):
+    """
+    A file download answering single-range requests with 206 Partial
+    Content, so interrupted downloads resume and PDF viewers can fetch
+    pages on demand (Starlette's FileResponse always sends the whole file).
+    An If-Range that no longer matches the ETag gets the whole file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        media_type: str,
+        filename: Optional[str] = None,
+        range_header: Optional[str] = None,
+        if_range: Optional[str] = None,
+    ):
+        self.path = path
+        info = os.stat(path)
+        if not stat.S_ISREG(info.st_mode):
+            raise RuntimeError(f"{path} is not a file")
+        size = info.st_size
+        etag = f'"{int(info.st_mtime_ns):x}-{size:x}"'
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(info.st_mtime, usegmt=True),
+        }
+        if filename:
+            headers["content-disposition"] = f'attachment; filename="{filename}"'
+
+        if if_range is not None and if_range != etag:
+            range_header = None
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            status_code = 416
+            headers["content-range"] = f"bytes */{size}"
+            self.offset, self.length = 0, 0
+        else:
+            if byte_range is None:
+                status_code = 200
+                self.offset, self.length = 0, size
+            else:
+                status_code = 206
+                start, end = byte_range
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+                self.offset, self.length = start, end - start + 1
+        headers["content-length"] = str(self.length)
+
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or not self.length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.length
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            while remaining:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+        if remaining:
+            # The file shrank under us; end the body rather than hang the client
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second up to `capacity`.
+    `try_acquire` never waits; `acquire` sleeps until a token is free.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def retry_after(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` will be available"""
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1) -> None:
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.retry_after(tokens))
+
+
+class MongoRateLimiter:
+    """
+    Rate limit shared by every process through MongoDB: one counter
+    document per fixed window, incremented atomically. Like TokenBucket,
+    `acquire` sleeps until the call is allowed.
+
+    A fixed window can let up to twice the rate through around a window
+    boundary; that is acceptable for provider quotas measured per minute.
+    If MongoDB fails the call is let through, so the limiter never takes
+    the provider down with it.
+    """
+
+    def __init__(self, name: str, rate: float, window: float = 60, collection: str = "rate_limits"):
+        self.name = name
+        self.limit = max(1, int(rate * window))
+        self.window = window
+        self.collection_name = collection
+        self._collection = None
+
+    async def _get_collection(self):
+        if self._collection is None:
+            from app.database.db import get_db
+            collection = get_db()[self.collection_name]
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._collection = collection
+        return self._collection
+
+    async def try_acquire(self, key: Optional[str] = None) -> bool:
+        """One call in this window, counted separately per `key` (e.g. per user) if given"""
+        from pymongo import ReturnDocument
+
+        now = time.time()
+        window_start = now - now % self.window
+        name = f"{self.name}:{key}" if key else self.name
+        try:
+            collection = await self._get_collection()
+            doc = await collection.find_one_and_update(
+                {"_id": f"{name}:{int(window_start)}"},
+                {
+                    "$inc": {"count": 1},
+                    "$setOnInsert": {"expires_at": datetime.utcfromtimestamp(window_start + 2 * self.window)},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Shared rate limit {name} unavailable, not limiting: {e}")
+            return True
+        return doc["count"] <= self.limit
+
+    def retry_after(self) -> float:
+        """Seconds until the next window"""
+        now = time.time()
+        return self.window - now % self.window
+
+    async def acquire(self) -> None:
+        while not await self.try_acquire():
+            # Spread the waiters over the start of the next window
+            await asyncio.sleep(self.retry_after() + random.uniform(0, 0.05 * self.window))
+
+
+class ClientQuotas:
+    """
+    Per-client request rate (a TokenBucket each) and cap on analyses in
+    flight, kept in memory so an over-quota request is turned away in
+    microseconds. Buckets of the least recently seen clients are dropped
+    beyond `max_clients`; by then they have refilled anyway.
+
+    With a `shared` MongoRateLimiter, requests the local bucket lets
+    through are also counted against a deployment-wide window per client.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: float, max_concurrent: int,
+                 shared: Optional[MongoRateLimiter] = None, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60
+        self.burst = max(1.0, burst)
+        self.max_concurrent = max_concurrent
+        self.shared = shared
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._active: Dict[str, int] = {}
+        self.rejected_rate = 0
+        self.rejected_concurrency = 0
+
+    def _bucket(self, client: str) -> TokenBucket:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket
+
+    def check_rate(self, client: str) -> float:
+        """
+        Take one request from the client's bucket
+
+        Returns:
+            0 if allowed, else seconds until it would be
+        """
+        if not self.rate:
+            return 0.0
+        bucket = self._bucket(client)
+        if bucket.try_acquire():
+            return 0.0
+        self.rejected_rate += 1
+        return bucket.retry_after()
+
+    async def check_shared_rate(self, client: str) -> float:
+        """Deployment-wide window check; 0 if allowed or no shared backend"""
+        if self.shared is None or await self.shared.try_acquire(client):
+            return 0.0
+        self.rejected_rate += 1
+        return self.shared.retry_after()
+
+    def start_analysis(self, client: str) -> bool:
+        """Claim one of the client's analysis slots; pair with finish_analysis"""
+        active = self._active.get(client, 0)
+        if self.max_concurrent and active >= self.max_concurrent:
+            self.rejected_concurrency += 1
+            return False
+        self._active[client] = active + 1
+        return True
+
+    def finish_analysis(self, client: str) -> None:
+        active = self._active.get(client, 0) - 1
+        if active > 0:
+            self._active[client] = active
+        else:
+            self._active.pop(client, None)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._buckets),
+            "analyses_in_flight": sum(self._active.values()),
+            "rejected_rate": self.rejected_rate,
+            "rejected_concurrency": self.rejected_concurrency,
+        }
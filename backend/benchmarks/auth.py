@@ -0,0 +1,144 @@
+"""
+Auth overhead: what token checks, password hashing and quota rejections
+cost the request path.
+
+  tokens     microseconds per verify_token call, a fresh signature check
+             against a hit in the verified-token cache
+  bcrypt     worst event-loop stall while a burst of logins is verified,
+             inline on the loop against the dedicated bcrypt threads
+  rejection  latency of a 429 from /case/analyze once an anonymous client
+             is over its quota, and how many of those reached the LLM
+
+    python -m benchmarks.auth --logins 8 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from benchmarks.stub_llm import SAMPLE_ANALYSIS
+
+
+def _per_call_us(func, rounds: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def bench_tokens(rounds: int = 2000) -> dict:
+    from app.auth.jwt_handler import _decode, create_access_token, verify_token
+
+    token = create_access_token("65f000000000000000000000", "user")
+    row = {
+        "decode_us": round(_per_call_us(lambda: _decode.__wrapped__(token), rounds), 1),
+        "cached_us": round(_per_call_us(lambda: verify_token(token), rounds), 1),
+    }
+    print(f"tokens  verify_token: signature check {row['decode_us']:>6.1f}us, cache hit {row['cached_us']:>5.1f}us")
+    return row
+
+
+async def _max_stall_ms(logins: int, verify) -> float:
+    """Largest gap between 5ms ticks of a task running beside the logins"""
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stalls.append((now - last) * 1000 - 5)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    done.set()
+    await tick
+    return max(stalls)
+
+
+def bench_bcrypt(logins: int) -> dict:
+    from app.auth.passwords import BCRYPT_ROUNDS, pwd_context, verify_password
+
+    hashed = pwd_context.hash("correct horse")
+
+    async def inline():
+        return pwd_context.verify("correct horse", hashed)
+
+    async def offloaded():
+        return await verify_password("correct horse", hashed)
+
+    row = {
+        "inline_stall_ms": round(asyncio.run(_max_stall_ms(logins, inline)), 1),
+        "threaded_stall_ms": round(asyncio.run(_max_stall_ms(logins, offloaded)), 1),
+    }
+    print(f"bcrypt  {logins} logins at {BCRYPT_ROUNDS} rounds: worst loop stall inline "
+          f"{row['inline_stall_ms']:>7.1f}ms, bcrypt threads {row['threaded_stall_ms']:>5.1f}ms")
+    return row
+
+
+async def _rejections(requests: int) -> dict:
+    from unittest import mock
+
+    from app.auth.quotas import anon_quotas
+
+    llm_calls = []
+
+    async def analyze(case_text, **kwargs):
+        llm_calls.append(case_text)
+        return dict(SAMPLE_ANALYSIS)
+
+    transport = httpx.ASGITransport(app=__import__("app.main", fromlist=["app"]).app)
+    statuses, rejected = [], []
+    with mock.patch("app.api.routes.analyze_case_with_ai_async", analyze):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            for i in range(requests):
+                start = time.perf_counter()
+                response = await client.post("/api/v1/case/analyze", json={"case_text": f"Case {i}: unpaid rent"})
+                elapsed = (time.perf_counter() - start) * 1e6
+                statuses.append(response.status_code)
+                if response.status_code == 429:
+                    rejected.append(elapsed)
+    check_us = _per_call_us(lambda: anon_quotas.check_rate("127.0.0.1"), 10000)
+    return {
+        "served": statuses.count(200),
+        "rejected": len(rejected),
+        "llm_calls": len(llm_calls),
+        "rejection_median_us": round(statistics.median(rejected), 1) if rejected else None,
+        "quota_check_us": round(check_us, 2),
+    }
+
+
+def bench_rejection(requests: int) -> dict:
+    row = asyncio.run(_rejections(requests))
+    print(f"reject  {requests} anonymous requests: {row['served']} served, {row['rejected']} rejected, "
+          f"{row['llm_calls']} LLM calls; median 429 {row['rejection_median_us']}us end to end, "
+          f"quota check {row['quota_check_us']}us")
+    return row
+
+
+def main(args) -> dict:
+    os.environ.update({
+        "GEMINI_API_KEY": "", "MONGODB_URI": "", "OLLAMA_WARMUP": "false", "SEMANTIC_CACHE_ENABLED": "false",
+        "RISK_ASSESSMENT_ENABLED": "false", "AUTH_REQUIRED": "false",
+        # Anonymous limits are off by default
+        "ANON_RATE_LIMIT_RPM": "6", "ANON_MAX_CONCURRENT_ANALYSES": "1",
+    })
+    return {
+        "tokens": bench_tokens(),
+        "bcrypt": bench_bcrypt(args.logins),
+        "rejection": bench_rejection(args.requests),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=8, help="concurrent logins in the bcrypt run")
+    parser.add_argument("--requests", type=int, default=200)
+    main(parser.parse_args())
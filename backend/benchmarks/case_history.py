@@ -0,0 +1,119 @@
+"""
+Case history page latency on a large `cases` collection.
+
+Seeds N documents (default 1,000,000) into a scratch database on a local
+mongod, builds the history indexes and times pages at increasing depth
+with keyset pagination (list_cases) against skip/limit as a baseline.
+Keyset page latency should stay flat as depth grows.
+
+    python -m benchmarks.case_history --uri mongodb://127.0.0.1:27017 --docs 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.database.case_repository import (
+    DEFAULT_LIST_FIELDS,
+    _SORT,
+    case_document,
+    ensure_case_indexes,
+    list_cases,
+)
+
+CASE_TYPES = ["Criminal", "Civil", "Family", "Property", "Corporate", "Labor", "Tax", "Constitutional"]
+ISSUES = ["Cheating", "Breach of contract", "Maintenance", "Title dispute", "Wrongful termination",
+          "Dowry harassment", "Cheque dishonour", "Defamation", "Tenancy", "Custody"]
+BATCH = 10_000
+
+
+def fake_analysis(rng: random.Random) -> dict:
+    issues = rng.sample(ISSUES, 2)
+    return {
+        "case_type": rng.choice(CASE_TYPES),
+        "case_summary": f"Dispute involving {issues[0].lower()} and {issues[1].lower()}.",
+        "key_facts": ["fact"] * 5,
+        "legal_issues": [{"issue": i, "description": "x" * 200, "importance": "High"} for i in issues],
+        "applicable_laws": [{"law": "IPC Section 420", "description": "x" * 100, "relevance": "x" * 100}],
+        "estimated_outcome": "x" * 200,
+    }
+
+
+async def seed(collection, docs: int, owners: list) -> None:
+    rng = random.Random(42)
+    start_time = datetime(2020, 1, 1)
+    inserted = 0
+    while inserted < docs:
+        batch = []
+        for i in range(min(BATCH, docs - inserted)):
+            doc = case_document("case text " * 300, fake_analysis(rng), owner_id=rng.choice(owners))
+            doc["created_at"] = start_time + timedelta(seconds=inserted + i)
+            batch.append(doc)
+        await collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+        if inserted % 100_000 == 0:
+            print(f"  seeded {inserted}")
+
+
+async def time_keyset(collection, owner_id, pages: int, limit: int) -> dict:
+    timings = {}
+    cursor = None
+    for page in range(1, pages + 1):
+        start = time.perf_counter()
+        docs, cursor = await list_cases(owner_id=owner_id, cursor=cursor, limit=limit, collection=collection)
+        timings[page] = (time.perf_counter() - start) * 1000
+        if cursor is None:
+            break
+    return timings
+
+
+async def time_skip(collection, owner_id, page: int, limit: int) -> float:
+    projection = {field: 1 for field in DEFAULT_LIST_FIELDS}
+    start = time.perf_counter()
+    query = {"owner_id": owner_id} if owner_id is not None else {}
+    await collection.find(query, projection).sort(_SORT).skip((page - 1) * limit).limit(limit).to_list(length=limit)
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(args) -> None:
+    client = AsyncIOMotorClient(args.uri)
+    collection = client[args.database]["cases"]
+    owners = [ObjectId() for _ in range(args.owners)]
+
+    if not args.skip_seed:
+        await collection.drop()
+        print(f"Seeding {args.docs} cases across {args.owners} owners...")
+        start = time.perf_counter()
+        await seed(collection, args.docs, owners)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+        await ensure_case_indexes(collection)
+    else:
+        owners = await collection.distinct("owner_id")
+
+    # Whole-collection history (no owner filter) is the worst case for depth
+    for label, owner in (("All cases", None), ("One owner's history", owners[0])):
+        print(f"\n{label}, {args.limit} per page")
+        timings = await time_keyset(collection, owner, args.pages, args.limit)
+        for page in sorted({1, 10, 100, max(timings)} & set(timings)):
+            skip_ms = await time_skip(collection, owner, page, args.limit)
+            print(f"  page {page:>5}: keyset {timings[page]:6.2f} ms   skip/limit {skip_ms:7.2f} ms")
+        print(f"  keyset median {statistics.median(timings.values()):.2f} ms, max {max(timings.values()):.2f} ms")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://127.0.0.1:27017")
+    parser.add_argument("--database", default="ai_lawyer_bench")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already seeded database")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,187 @@
+"""
+JSON repair engine: how much of a malformed model answer survives, and
+what it costs.
+
+  corpus  hand-written malformed outputs of the kinds local models produce:
+          per case, whether the old json.loads path parsed it, how many of
+          the 12 sections the repair engine recovers and whether the
+          normalized result validates as AnalyzeResponse
+  fuzz    the sample analysis with 1-3 random corruptions each (seeded)
+  speed   microseconds per parse for clean and malformed answers
+  retry   prompt tokens of the missing-section follow-up vs a full re-run
+
+    python -m benchmarks.json_repair --fuzz 2000
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+
+from benchmarks.stub_llm import SAMPLE_ANALYSIS, _malformed
+from benchmarks.token_budget import pleading
+
+BODY = json.dumps(SAMPLE_ANALYSIS, indent=2)
+
+
+def _cut_inside(body: str, marker: str, offset: int) -> str:
+    return body[:body.index(marker) + offset]
+
+
+def _with_value(key: str, value) -> str:
+    return json.dumps({**SAMPLE_ANALYSIS, key: value}, indent=2)
+
+
+CORPUS = [
+    ("clean", BODY),
+    ("code_fence", f"```json\n{BODY}\n```"),
+    ("prose_prefix", "Here is the analysis of the case:\n\n" + BODY),
+    ("prose_around", "Sure! Below is the detailed legal analysis.\n" + BODY + "\n\nLet me know if you need more."),
+    ("trailing_commas", re.sub(r"\n(\s*)([\]}])", r",\n\1\2", BODY)),
+    ("truncated_in_array", _cut_inside(BODY, '"action": "File FIR"', 10)),
+    ("truncated_in_string", _cut_inside(BODY, '"Favourable if', 20)),
+    ("truncated_after_key", _cut_inside(BODY, '"timeline_considerations"', 27)),
+    ("raw_newlines", BODY.replace("never delivered the goods.", "never delivered\nthe goods.\n")),
+    ("unterminated_string", BODY.replace('delivered the goods.",', "delivered the goods.", 1)),
+    ("missing_commas", BODY.replace('},\n    {', '}\n    {').replace('"Criminal",', '"Criminal"')),
+    ("python_literals", BODY.replace('"Criminal",', '"Criminal",\n  "urgent": True,\n  "notes": None,')),
+    ("python_repr", str(SAMPLE_ANALYSIS)),
+    ("bare_words", BODY.replace('"High"', "High").replace('"Medium"', "Medium")),
+    ("bad_escape", BODY.replace("IPC Section 420", "IPC Section\\ 420")),
+    ("wrapped", json.dumps({"analysis": SAMPLE_ANALYSIS}, indent=2)),
+    ("list_wrapped", json.dumps([SAMPLE_ANALYSIS])),
+    ("alias_keys", BODY.replace('"case_summary"', '"Case Summary"').replace('"key_facts"', '"facts"')),
+    ("strings_for_objects", _with_value("legal_issues", ["Cheating", "Criminal breach of trust"])),
+    ("object_for_list", _with_value("strengths", {"point": "Bank transfer record"})),
+    ("list_for_string", _with_value("estimated_outcome", ["Conviction likely", "Compensation possible"])),
+    ("not_json", "I'm sorry, I cannot provide legal advice on this matter."),
+]
+
+
+def corrupt(body: str, rng: random.Random) -> str:
+    """One to three random corruptions, including the stub server's own"""
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.randrange(5)
+        if kind == 0:
+            body = _malformed(body, rng)
+        elif kind == 1:
+            body = body[:rng.randint(len(body) // 3, len(body))]
+        elif kind == 2:
+            closers = [m.start() for m in re.finditer(r"\n\s*[\]}]", body)]
+            if closers:
+                at = rng.choice(closers)
+                body = body[:at] + "," + body[at:]
+        elif kind == 3:
+            separators = [m.start() for m in re.finditer(r",\n", body)]
+            if separators:
+                at = rng.choice(separators)
+                body = body[:at] + body[at + 1:]
+        else:
+            spaces = [m.start() for m in re.finditer(r"[a-z] [a-z]", body)]
+            if spaces:
+                at = rng.choice(spaces) + 1
+                body = body[:at] + "\n" + body[at + 1:]
+    return body
+
+
+def evaluate(text: str) -> dict:
+    """What the old json.loads path and the repair engine each make of `text`"""
+    from pydantic import ValidationError
+
+    from app.api.schemas import AnalyzeResponse
+    from app.core.analyzer import ANALYSIS_SECTIONS, normalize_analysis
+    from app.llm.json_repair import canonical_sections, parse_model_json
+
+    try:
+        json.loads(text)
+        old_parsed = True
+    except json.JSONDecodeError:
+        old_parsed = False
+    try:
+        parsed = canonical_sections(parse_model_json(text))
+    except RuntimeError:
+        return {"old_parsed": old_parsed, "parsed": False, "sections": 0, "valid": False}
+    try:
+        AnalyzeResponse(**normalize_analysis(parsed))
+        valid = True
+    except (ValidationError, RuntimeError):
+        valid = False
+    sections = sum(name in parsed for name in ANALYSIS_SECTIONS)
+    return {"old_parsed": old_parsed, "parsed": True, "sections": sections, "valid": valid}
+
+
+def bench_corpus() -> list:
+    rows = []
+    for label, text in CORPUS:
+        row = {"case": label, **evaluate(text)}
+        print(f"corpus  {label:<20} old {'ok' if row['old_parsed'] else '--'}  "
+              f"repaired {'ok' if row['parsed'] else '--'}  sections {row['sections']:>2}/12  "
+              f"schema {'ok' if row['valid'] else '--'}")
+        rows.append(row)
+    return rows
+
+
+def bench_fuzz(count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    rows = [evaluate(corrupt(BODY, rng)) for _ in range(count)]
+    result = {
+        "cases": count,
+        "old_parse_rate": round(sum(r["old_parsed"] for r in rows) / count, 3),
+        "parse_rate": round(sum(r["parsed"] for r in rows) / count, 3),
+        "schema_valid_rate": round(sum(r["valid"] for r in rows) / count, 3),
+        "mean_sections": round(statistics.mean(r["sections"] for r in rows), 2),
+    }
+    print(f"fuzz    {count} cases: old parse rate {result['old_parse_rate']:.1%}, repaired {result['parse_rate']:.1%}, "
+          f"schema-valid {result['schema_valid_rate']:.1%}, {result['mean_sections']} of 12 sections on average")
+    return result
+
+
+def bench_speed(rounds: int = 2000) -> dict:
+    from app.llm.json_repair import repair_json
+
+    samples = {
+        "clean": BODY,
+        "fenced_trailing_commas": "```json\n" + re.sub(r"\n(\s*)([\]}])", r",\n\1\2", BODY) + "\n```",
+        "truncated": BODY[:len(BODY) * 2 // 3],
+    }
+    result = {}
+    for label, text in samples.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            repair_json(text)
+        us = (time.perf_counter() - start) / rounds * 1e6
+        result[f"{label}_us"] = round(us, 1)
+        print(f"speed   {label:<24} {us:>8.1f} us per parse ({len(text)} chars)")
+    return result
+
+
+def bench_retry(pages: int = 3) -> dict:
+    from app.core.analyzer import build_case_prompt
+    from app.llm.prompts import missing_sections_prompt
+    from app.llm.token_budget import compact_case_text, estimate_tokens
+
+    case_text = pleading(pages, 7)
+    full = estimate_tokens(build_case_prompt(case_text)[0])
+    # What a typical truncation loses: the last three sections
+    retry = estimate_tokens(missing_sections_prompt(
+        compact_case_text(case_text), ["precedents", "estimated_outcome", "timeline_considerations"]))
+    print(f"retry   {pages}-page case: full prompt ~{full} tokens, missing-section prompt ~{retry} tokens; "
+          f"output asked for: 3 of 12 sections")
+    return {"full_prompt_tokens": full, "retry_prompt_tokens": retry}
+
+
+def main(args) -> dict:
+    return {
+        "corpus": bench_corpus(),
+        "fuzz": bench_fuzz(args.fuzz, args.seed),
+        "speed": bench_speed(),
+        "retry": bench_retry(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fuzz", type=int, default=1000, help="number of randomly corrupted answers")
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,95 @@
+"""
+Concurrent throughput of the analyze pipeline, blocking vs async clients.
+
+Starts a stub Ollama server and fires N concurrent analyses from a single
+event loop, the way one uvicorn worker sees them:
+
+  before: the old route body, calling the blocking analyze_case_with_ai
+  after:  the async route body, awaiting analyze_case_with_ai_async
+
+Also reports the worst event-loop stall observed while the batch runs,
+which is what /health experiences behind a running analysis.
+
+    python -m benchmarks.load_test --concurrency 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+CASE_TEXT = "The accused took an advance of Rs. 2,00,000 for goods and never delivered them."
+
+
+async def _loop_lag_probe(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Return the largest delay between scheduled wake-ups of the event loop"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def _run(label: str, make_call, concurrency: int) -> dict:
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_loop_lag_probe(stop))
+    start = time.perf_counter()
+    # Distinct texts so the result cache does not collapse the batch
+    await asyncio.gather(*(make_call(f"{CASE_TEXT} (case {i})") for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_stall = await probe
+    result = {
+        "mode": label,
+        "requests": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(concurrency / elapsed, 2),
+        "max_loop_stall_s": round(worst_stall, 3),
+    }
+    print(
+        f"{label:>7}: {concurrency} analyses in {elapsed:.2f}s "
+        f"({result['throughput_rps']} req/s, max loop stall {worst_stall:.2f}s)"
+    )
+    return result
+
+
+async def main(concurrency: int, port: int, latency: float) -> list:
+    # Point the clients at the stub before importing them
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["GEMINI_API_KEY"] = ""
+    # The stub has no parallel limit; measure the client, not a queue
+    os.environ["OLLAMA_MAX_CONCURRENCY"] = "0"
+
+    from app.core.analyzer import analyze_case_with_ai, analyze_case_with_ai_async
+    from app.llm.llm_client import open_http_client, close_http_client
+
+    async def blocking_call(case_text):
+        return analyze_case_with_ai(case_text)
+
+    async def async_call(case_text):
+        return await analyze_case_with_ai_async(case_text)
+
+    with StubServer(create_stub_app(latency), port):
+        await open_http_client()
+        try:
+            results = [
+                await _run("before", blocking_call, concurrency),
+                await _run("after", async_call, concurrency),
+            ]
+        finally:
+            await close_http_client()
+
+    speedup = results[0]["elapsed_s"] / results[1]["elapsed_s"]
+    print(f"speedup: {speedup:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub generation latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.port, args.latency))
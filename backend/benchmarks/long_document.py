@@ -0,0 +1,92 @@
+"""
+Long-document analysis: single prompt vs chunked map-reduce.
+
+Generates synthetic 50-200 page case documents and analyzes them against
+a stub Ollama whose latency grows with prompt length. The single-prompt
+figure is what one giant prompt would cost (and it would not fit in
+Ollama's num_ctx anyway); map-reduce latency should fall as workers increase.
+
+    python -m benchmarks.long_document --pages 50 100 200 --workers 1 4 8
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+CHARS_PER_PAGE = 3000
+
+SENTENCES = [
+    "The complainant states that on {d}.{m}.20{y} the accused received Rs. {amt},000 as advance.",
+    "The FIR No. {n}/20{y} was registered at the local police station u/s. 420 and 406 IPC.",
+    "Witness PW-{n} deposed that the goods were never delivered to the complainant.",
+    "The learned counsel for the accused argued that the dispute is purely civil in nature.",
+    "It is submitted that the accused stopped responding to calls after {d}.{m}.20{y}.",
+    "The bank statement marked Exhibit P-{n} shows a transfer of Rs. {amt},000.",
+    "The Hon'ble Court observed that dishonest intention at the inception must be shown.",
+    "A legal notice dated {d}.{m}.20{y} was served but no reply was received.",
+    "The investigating officer seized the mobile phone of the accused under a seizure memo.",
+    "The accused has filed an application for anticipatory bail before the Sessions Court.",
+]
+
+
+def synthetic_document(pages: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    target = pages * CHARS_PER_PAGE
+    parts, size = [], 0
+    while size < target:
+        sentence = rng.choice(SENTENCES).format(
+            d=rng.randint(1, 28), m=rng.randint(1, 12), y=rng.randint(15, 24),
+            n=rng.randint(1, 400), amt=rng.randint(10, 900),
+        )
+        parts.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(parts)
+
+
+async def main(args) -> list:
+    from app.core import analyzer
+    from app.core.chunked_analyzer import analyze_long_case_async, chunk_text, estimate_tokens
+    from app.llm.llm_client import close_http_client
+    from app.llm.prompts import case_analysis_prompt
+
+    results = []
+    try:
+        for pages in args.pages:
+            text = synthetic_document(pages)
+            chunks = len(chunk_text(text))
+
+            start = time.perf_counter()
+            await analyzer.provider_scheduler.run(case_analysis_prompt(text))
+            single = time.perf_counter() - start
+            print(f"{pages:>4} pages (~{estimate_tokens(text)} tokens, {chunks} chunks): single prompt {single:.2f}s")
+
+            for workers in args.workers:
+                start = time.perf_counter()
+                await analyze_long_case_async(text, analyzer.provider_scheduler.run, max_parallel=workers)
+                elapsed = time.perf_counter() - start
+                print(f"       map-reduce, {workers:>2} workers: {elapsed:.2f}s")
+                results.append({"pages": pages, "chunks": chunks, "workers": workers,
+                                "single_prompt_s": round(single, 3), "map_reduce_s": round(elapsed, 3)})
+    finally:
+        await close_http_client()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.2, help="stub base latency per request")
+    parser.add_argument("--prefill", type=float, default=0.05, help="stub seconds per 1k prompt tokens")
+    parser.add_argument("--port", type=int, default=11500)
+    args = parser.parse_args()
+
+    os.environ["GEMINI_API_KEY"] = ""
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    # Let --workers, not the client-side Ollama cap, bound parallelism
+    os.environ["OLLAMA_MAX_CONCURRENCY"] = "0"
+    with StubServer(create_stub_app(args.latency, prefill_per_1k_tokens=args.prefill), args.port):
+        asyncio.run(main(args))
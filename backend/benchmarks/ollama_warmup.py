@@ -0,0 +1,99 @@
+"""
+Startup and first-request latency with and without the Ollama warm-up.
+
+Starts the stub Ollama server with a cold model load (--load-seconds) and
+prefix KV-cache accounting, then the app as a uvicorn subprocess, and
+times:
+
+  startup          process start until /health answers
+  warm-up          until /health reports the warm-up finished (warm only)
+  first request    the first /case/analyze after that
+  second request   another case, to show prefix-cache reuse
+
+Also reports how many prompt characters consecutive analysis prompts
+share from the start, which is what Ollama can reuse from its cache.
+
+    python -m benchmarks.ollama_warmup --load-seconds 5 --prefill 0.5
+"""
+import argparse
+import os
+import time
+
+import httpx
+
+from benchmarks.long_document import synthetic_document
+from benchmarks.suite import _spawn, _wait_ready
+
+
+def shared_prefix_report(cases: int = 20) -> dict:
+    from app.core.analyzer import build_case_prompt
+    from app.core.classifier_training import synthetic_corpus
+
+    prompts = [build_case_prompt(text)[0] for text, _ in synthetic_corpus(per_type=max(1, cases // 8), seed=5)]
+    shared = [len(os.path.commonprefix([a, b])) for a, b in zip(prompts, prompts[1:])]
+    report = {
+        "mean_prompt_chars": round(sum(map(len, prompts)) / len(prompts)),
+        "min_shared_prefix_chars": min(shared),
+    }
+    print(f"consecutive prompts share at least {report['min_shared_prefix_chars']} of "
+          f"~{report['mean_prompt_chars']} chars from the start")
+    return report
+
+
+def run(mode: str, args) -> dict:
+    env = {
+        **os.environ, "MONGODB_URI": "", "GEMINI_API_KEY": "",
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{args.stub_port}",
+        "OLLAMA_WARMUP": "true" if mode == "warm" else "false",
+    }
+    stub = _spawn([
+        "benchmarks.stub_llm", "--port", str(args.stub_port), "--latency", str(args.latency),
+        "--prefill-per-1k-tokens", str(args.prefill), "--load-seconds", str(args.load_seconds), "--prefix-cache",
+    ], env, quiet=True)
+    processes = [stub]
+    try:
+        _wait_ready(f"http://127.0.0.1:{args.stub_port}/api/tags", stub)
+        app_url = f"http://127.0.0.1:{args.app_port}"
+        start = time.perf_counter()
+        app = _spawn(["uvicorn", "app.main:app", "--port", str(args.app_port), "--log-level", "warning"], env, quiet=True)
+        processes.append(app)
+        _wait_ready(f"{app_url}/health", app)
+        result = {"mode": mode, "startup_s": round(time.perf_counter() - start, 3)}
+
+        with httpx.Client(base_url=app_url, timeout=300) as client:
+            if mode == "warm":
+                while client.get("/health").json()["ollama_warmup"]["status"] in ("enabled", "running"):
+                    time.sleep(0.05)
+                result["warmup_s"] = round(time.perf_counter() - start - result["startup_s"], 3)
+            for label, seed in (("first_request_s", 1), ("second_request_s", 2)):
+                request_start = time.perf_counter()
+                client.post("/api/v1/case/analyze", json={"case_text": synthetic_document(1, seed)}).raise_for_status()
+                result[label] = round(time.perf_counter() - request_start, 3)
+        result["ready_to_first_answer_s"] = round(time.perf_counter() - start - result["second_request_s"], 3)
+        print(
+            f"{mode:>5}: startup {result['startup_s']:.2f}s, warm-up {result.get('warmup_s', 0):.2f}s, "
+            f"first request {result['first_request_s']:.2f}s, second {result['second_request_s']:.2f}s "
+            f"(process start to first answer {result['ready_to_first_answer_s']:.2f}s)"
+        )
+        return result
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def main(args) -> dict:
+    return {
+        "prefix": shared_prefix_report(),
+        "runs": [run("cold", args), run("warm", args)],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--load-seconds", type=float, default=5.0, help="stub cold model load time")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub generation latency in seconds")
+    parser.add_argument("--prefill", type=float, default=0.5, help="stub seconds per 1000 uncached prompt tokens")
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--stub-port", type=int, default=11500)
+    main(parser.parse_args())
@@ -0,0 +1,158 @@
+"""
+Case report engine: rendering throughput across pool sizes, what inline
+rendering would do to the event loop, and cached downloads.
+
+  render    reports/sec for N distinct analyses rendered through the
+            ReportGenerator process pool at each --workers size, per format
+  inline    the same renders on the event loop thread, and the worst event
+            loop stall each way (a ticker measures how late it wakes)
+  download  GET /cases/{id}/report for a cached report through the app
+            (full and ranged), against a throwaway copy of the cache
+
+    python -m benchmarks.reports --reports 40 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.stub_llm import SAMPLE_ANALYSIS
+
+
+def _analysis_ids(count: int, salt: int) -> list:
+    return [f"{salt:08x}{i:016x}" for i in range(count)]
+
+
+async def _ticker(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Worst lateness of a periodic wake-up, in seconds"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def _timed(work) -> tuple:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await ticker
+
+
+def bench_render(count: int, worker_counts, cache_dir: str) -> list:
+    from app.reports.report_generator import ReportGenerator
+
+    rows = []
+    for fmt in ("pdf", "docx"):
+        for workers in worker_counts:
+            generator = ReportGenerator(os.path.join(cache_dir, f"{fmt}-{workers}"), workers)
+            generator.start()
+            ids = _analysis_ids(count, workers)
+
+            async def render_all():
+                # Spawn and import in every pool process before timing
+                await asyncio.gather(*(generator.render(f"warm{i:020x}", fmt, SAMPLE_ANALYSIS) for i in range(workers)))
+                elapsed, lag = await _timed(lambda: asyncio.gather(
+                    *(generator.render(analysis_id, fmt, SAMPLE_ANALYSIS) for analysis_id in ids)
+                ))
+                return elapsed, lag
+
+            try:
+                elapsed, lag = asyncio.run(render_all())
+            finally:
+                generator.stop()
+            row = {"format": fmt, "workers": workers, "reports_per_s": round(count / elapsed, 2),
+                   "max_loop_stall_ms": round(lag * 1000, 1)}
+            print(f"render  {fmt:<4} {workers} pool processes: {row['reports_per_s']:>7.2f} reports/s  "
+                  f"worst loop stall {row['max_loop_stall_ms']:>6.1f}ms")
+            rows.append(row)
+    return rows
+
+
+def bench_inline(count: int, cache_dir: str) -> list:
+    from app.reports.report_generator import render_to_file
+
+    rows = []
+    for fmt in ("pdf", "docx"):
+        directory = os.path.join(cache_dir, f"inline-{fmt}")
+        os.makedirs(directory, exist_ok=True)
+        render_to_file(fmt, SAMPLE_ANALYSIS, {}, os.path.join(directory, f"warm.{fmt}"))
+
+        async def render_all():
+            for analysis_id in _analysis_ids(count, 0):
+                render_to_file(fmt, SAMPLE_ANALYSIS, {}, os.path.join(directory, f"{analysis_id}.{fmt}"))
+                await asyncio.sleep(0)
+
+        elapsed, lag = asyncio.run(_timed(render_all))
+        row = {"format": fmt, "reports_per_s": round(count / elapsed, 2), "max_loop_stall_ms": round(lag * 1000, 1)}
+        print(f"inline  {fmt:<4} on the event loop:  {row['reports_per_s']:>7.2f} reports/s  "
+              f"worst loop stall {row['max_loop_stall_ms']:>6.1f}ms")
+        rows.append(row)
+    return rows
+
+
+def bench_download(rounds: int, cache_dir: str) -> dict:
+    import httpx
+    from unittest import mock
+
+    from app.main import app
+    from app.reports.report_generator import ReportGenerator, render_to_file
+
+    generator = ReportGenerator(os.path.join(cache_dir, "download"), 1)
+    os.makedirs(generator.cache_dir, exist_ok=True)
+    case_id = "65f0c0ffee00000000000001"
+    path = generator.path_for(case_id, "pdf")
+    render_to_file("pdf", SAMPLE_ANALYSIS, {}, path)
+    size = os.path.getsize(path)
+
+    async def fetch(headers) -> float:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            url = f"/api/v1/cases/{case_id}/report?format=pdf"
+            response = await client.get(url, headers=headers)
+            assert response.status_code in (200, 206), response.text
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await client.get(url, headers=headers)
+            return rounds / (time.perf_counter() - start)
+
+    # Served from the disk cache: MongoDB is asked only for the case owner,
+    # stubbed here (an _id lookup)
+    owner = mock.AsyncMock(return_value={"_id": case_id, "owner_id": None})
+    with mock.patch("app.api.routes.report_generator", generator), \
+            mock.patch("app.database.case_repository.persistence_enabled", return_value=True), \
+            mock.patch("app.database.case_repository.get_case", owner):
+        full = asyncio.run(fetch({}))
+        ranged = asyncio.run(fetch({"Range": "bytes=0-1023"}))
+    print(f"download cached {size}-byte pdf: {full:.0f} req/s full, {ranged:.0f} req/s for a 1 KiB range")
+    return {"bytes": size, "full_per_s": round(full), "range_per_s": round(ranged)}
+
+
+def main(args) -> dict:
+    os.environ.setdefault("MONGODB_URI", "")
+    cache_dir = tempfile.mkdtemp(prefix="report_bench_")
+    print(f"{os.cpu_count()} CPUs")
+    try:
+        return {
+            "cpus": os.cpu_count(),
+            "inline": bench_inline(args.reports, cache_dir),
+            "render": bench_render(args.reports, args.workers, cache_dir),
+            "download": bench_download(args.downloads, cache_dir),
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=40, help="distinct analyses rendered per measurement")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="process pool sizes")
+    parser.add_argument("--downloads", type=int, default=500)
+    main(parser.parse_args())
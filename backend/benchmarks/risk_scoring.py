@@ -0,0 +1,146 @@
+"""
+Local risk scoring: cost of the CPU-only pass and what it adds to
+/case/analyze when it runs alongside the LLM call.
+
+  speed     milliseconds per assess_risk call by document length, and the
+            combined lexicon regex against one scan per phrase
+  overlap   /case/analyze latency against a stub Ollama with the risk pass
+            off, sequential after the LLM call, and concurrent (as shipped)
+  fallback  /case/risk latency, the triage path when no LLM is reachable
+
+    python -m benchmarks.risk_scoring --pages 1 5 20 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import time
+
+import httpx
+
+from benchmarks.long_document import synthetic_document
+from benchmarks.suite import _spawn, _stub_args, _wait_ready
+
+
+def _per_call_ms(func, text: str, rounds: int) -> float:
+    func(text)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(text)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def bench_speed(pages_list, rounds: int = 20) -> list:
+    from app.analysis.risk_detector import assess_risk
+    from app.analysis.sentiment_analyzer import LEXICON, lexicon_hits
+
+    per_phrase = [re.compile(r"(?<![\w-])" + re.escape(phrase) + r"(?![\w-])") for phrase in LEXICON]
+
+    def scan_each_phrase(text):
+        lowered = text.lower()
+        return [m.span() for pattern in per_phrase for m in pattern.finditer(lowered)]
+
+    rows = []
+    for pages in pages_list:
+        text = synthetic_document(pages, 11)
+        row = {
+            "pages": pages,
+            "assess_risk_ms": round(_per_call_ms(assess_risk, text, rounds), 2),
+            "lexicon_combined_ms": round(_per_call_ms(lambda t: list(lexicon_hits(t)), text, rounds), 2),
+            "lexicon_per_phrase_ms": round(_per_call_ms(scan_each_phrase, text, rounds), 2),
+        }
+        print(f"speed   {pages:>3} pages: assess_risk {row['assess_risk_ms']:>7.2f}ms  lexicon combined "
+              f"{row['lexicon_combined_ms']:>6.2f}ms vs per phrase {row['lexicon_per_phrase_ms']:>7.2f}ms "
+              f"({len(LEXICON)} phrases)")
+        rows.append(row)
+    return rows
+
+
+async def _latencies(texts, path: str = "/api/v1/case/analyze") -> list:
+    from app.llm.llm_client import close_http_client, open_http_client
+
+    await open_http_client()
+    transport = httpx.ASGITransport(app=__import__("app.main", fromlist=["app"]).app)
+    latencies = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for text in texts:
+                start = time.perf_counter()
+                response = await client.post(path, json={"case_text": text})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        await close_http_client()
+    return latencies
+
+
+def bench_overlap(pages: int, requests: int, latency: float, port: int) -> dict:
+    from unittest import mock
+
+    from app.analysis.risk_detector import assess_risk
+    from app.api import routes
+
+    async def sequential(case_text, **kwargs):
+        result = await original_analyze(case_text, **kwargs)
+        await asyncio.to_thread(assess_risk, case_text)
+        return result
+
+    original_analyze = routes.analyze_case_with_ai_async
+    modes = {
+        "off": [mock.patch("app.api.routes.RISK_ASSESSMENT_ENABLED", False)],
+        "sequential": [mock.patch("app.api.routes.RISK_ASSESSMENT_ENABLED", False),
+                       mock.patch("app.api.routes.analyze_case_with_ai_async", sequential)],
+        "concurrent": [],
+    }
+    result = {}
+    # A separate process, so the stub does not compete with the app for the GIL
+    stub = _spawn(_stub_args(port, {"latency": latency}, 1.0, 0), dict(os.environ), quiet=True)
+    try:
+        _wait_ready(f"http://127.0.0.1:{port}/api/tags", stub)
+        for mode, patches in modes.items():
+            # Distinct texts per mode so every request reaches the model
+            texts = [synthetic_document(pages, 1000 * len(result) + i) for i in range(requests)]
+            for patch in patches:
+                patch.start()
+            try:
+                latencies = asyncio.run(_latencies(texts))
+            finally:
+                for patch in patches:
+                    patch.stop()
+            result[mode] = round(statistics.median(latencies), 1)
+            print(f"overlap {pages}-page case, stub LLM {latency * 1000:.0f}ms: risk pass {mode:<10} "
+                  f"median /case/analyze {result[mode]:>7.1f}ms")
+    finally:
+        stub.terminate()
+        stub.wait()
+    return result
+
+
+def bench_fallback(pages: int, requests: int) -> dict:
+    texts = [synthetic_document(pages, 5000 + i) for i in range(requests)]
+    latencies = asyncio.run(_latencies(texts, "/api/v1/case/risk"))
+    median = round(statistics.median(latencies), 2)
+    print(f"fallback /case/risk {pages}-page case, no LLM: median {median}ms")
+    return {"median_ms": median}
+
+
+def main(args) -> dict:
+    os.environ.update({
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{args.stub_port}", "GEMINI_API_KEY": "", "MONGODB_URI": "",
+        "OLLAMA_WARMUP": "false", "SEMANTIC_CACHE_ENABLED": "false",
+    })
+    return {
+        "speed": bench_speed(args.pages),
+        "overlap": bench_overlap(max(args.pages), args.requests, args.latency, args.stub_port),
+        "fallback": bench_fallback(max(args.pages), args.requests),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM latency in seconds")
+    parser.add_argument("--stub-port", type=int, default=11500)
+    main(parser.parse_args())
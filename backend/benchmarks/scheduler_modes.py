@@ -0,0 +1,72 @@
+"""
+Analysis latency under each provider scheduler mode.
+
+Runs a slow stub "Gemini" and a faster stub "Ollama" and times a batch of
+uncached analyses through ProviderScheduler in sequential, hedged and race
+modes.
+
+    python -m benchmarks.scheduler_modes --gemini-latency 2 --ollama-latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+CASE_TEXT = "The accused took an advance of Rs. 2,00,000 for goods and never delivered them."
+
+
+async def run_mode(mode: str, requests: int, hedge_delay: float) -> dict:
+    from app.core import analyzer
+    from app.llm import scheduler
+
+    scheduler.DEFAULT_HEDGE_DELAY = hedge_delay
+    analyzer.provider_scheduler.mode = mode
+    for provider in analyzer.provider_scheduler.providers:
+        provider.stats = scheduler.ProviderStats()
+
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        await analyzer._analyze_uncached_async(f"{CASE_TEXT} ({mode} {i})")
+        latencies.append(time.perf_counter() - start)
+
+    result = {
+        "mode": mode,
+        "mean_s": round(statistics.mean(latencies), 3),
+        "max_s": round(max(latencies), 3),
+        "order": analyzer.provider_scheduler.stats()["order"],
+    }
+    print(f"{mode:>10}: mean {result['mean_s']:.2f}s  max {result['max_s']:.2f}s  final order {result['order']}")
+    return result
+
+
+async def main(args) -> list:
+    from app.llm.llm_client import close_http_client
+
+    try:
+        return [await run_mode(mode, args.requests, args.hedge_delay) for mode in ("sequential", "hedged", "race")]
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--gemini-latency", type=float, default=2.0)
+    parser.add_argument("--ollama-latency", type=float, default=0.5)
+    parser.add_argument("--hedge-delay", type=float, default=0.5, help="hedge delay before p95 samples exist")
+    parser.add_argument("--gemini-port", type=int, default=11501)
+    parser.add_argument("--ollama-port", type=int, default=11500)
+    args = parser.parse_args()
+
+    # Point the clients at the stubs before importing them
+    os.environ["GEMINI_API_KEY"] = "stub-key-for-benchmarks"
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{args.gemini_port}"
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.ollama_port}"
+
+    with StubServer(create_stub_app(args.gemini_latency), args.gemini_port), \
+            StubServer(create_stub_app(args.ollama_latency), args.ollama_port):
+        asyncio.run(main(args))
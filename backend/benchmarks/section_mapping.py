@@ -0,0 +1,67 @@
+"""
+Offline statute retrieval: index build, load and query latency.
+
+Builds the BM25 index from acts_db.json into a temporary file, then times
+loading it back (memory-mapped) and map_sections() queries over case texts
+of increasing length. Retrieval must stay in the low milliseconds so it
+can run inline before every analysis prompt.
+
+    python -m benchmarks.section_mapping --queries 2000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.long_document import synthetic_document
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main(args) -> dict:
+    from app.law_mapping import section_mapper
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, "sections.idx")
+
+        start = time.perf_counter()
+        section_mapper.SectionIndex(index_path=index_path).load()
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = section_mapper.SectionIndex(index_path=index_path)
+        index.load()
+        load = time.perf_counter() - start
+        print(f"build {build * 1000:.1f} ms, mmap load {load * 1000:.1f} ms, "
+              f"index {os.path.getsize(index_path)} bytes")
+
+        section_mapper.section_index = index
+        results = {"build_ms": round(build * 1000, 2), "load_ms": round(load * 1000, 2), "queries": []}
+        for pages in args.pages:
+            text = synthetic_document(pages)
+            timings = []
+            for _ in range(args.queries):
+                start = time.perf_counter()
+                top = section_mapper.map_sections(text, args.k)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{pages:>4} pages: p50 {statistics.median(timings):.2f} ms, "
+                  f"p99 {percentile(timings, 0.99):.2f} ms, top: {top[0]['citation']}")
+            results["queries"].append({
+                "pages": pages,
+                "p50_ms": round(statistics.median(timings), 3),
+                "p99_ms": round(percentile(timings, 0.99), 3),
+                "top": [s["citation"] for s in top],
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=float, nargs="+", default=[0.3, 1, 5, 20])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=6)
+    main(parser.parse_args())
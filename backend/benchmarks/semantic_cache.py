@@ -0,0 +1,153 @@
+"""
+Semantic near-duplicate cache: embedding and search cost, and what a
+re-submission with small edits costs compared with a fresh analysis.
+
+  embed     hashed n-gram embeddings per second for 1 and 5 page documents
+  search    query latency of VectorIndex, brute force vs LSH, by index size
+  resubmit  a case analyzed once (fresh), then re-submitted with
+            punctuation edits (reuse) and with amendments spread through the
+            text (incremental update), against the stub Ollama server
+
+    python -m benchmarks.semantic_cache --sizes 1000 5000 20000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.long_document import synthetic_document
+from benchmarks.stub_llm import StubServer, create_stub_app
+from benchmarks.token_budget import pleading
+
+
+AMENDMENTS = (
+    "The accused has since returned Rs. 50,000 of the advance by cheque.",
+    "The complainant disputes that the cheque was honoured.",
+    "A second legal notice was served on the accused demanding the balance.",
+    "No reply to the second notice has been received.",
+)
+
+
+def amended(text: str, every: int = 4) -> str:
+    """`text` with an amendment inserted after every `every`th sentence"""
+    from app.core.chunked_analyzer import split_sentences
+
+    sentences = split_sentences(text)
+    return " ".join(
+        f"{sentence} {AMENDMENTS[i // every % len(AMENDMENTS)]}" if i % every == 0 else sentence
+        for i, sentence in enumerate(sentences)
+    )
+
+
+def bench_embed() -> dict:
+    from app.llm.embeddings import hashed_ngram_embedding
+
+    results = {}
+    for pages in (1, 5):
+        docs = [synthetic_document(pages, seed) for seed in range(50)]
+        start = time.perf_counter()
+        for doc in docs:
+            hashed_ngram_embedding(doc)
+        rate = len(docs) / (time.perf_counter() - start)
+        print(f"embed   {pages} page(s): {rate:>8.0f} docs/sec")
+        results[f"{pages}_pages_per_sec"] = round(rate)
+    return results
+
+
+def bench_search(sizes, dim: int, queries: int = 200) -> list:
+    from app.core.vector_index import VectorIndex
+
+    rng = np.random.default_rng(0)
+    results = []
+    for size in sizes:
+        vectors = rng.standard_normal((size, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Queries are noisy copies of stored vectors (cosine ~0.9)
+        targets = rng.integers(0, size, queries)
+        noise = rng.standard_normal((queries, dim)).astype(np.float32)
+        probes = vectors[targets] + 0.5 * noise / np.linalg.norm(noise, axis=1, keepdims=True)
+        probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+
+        row = {"size": size}
+        for label, ann_min_rows in (("brute", size + 1), ("lsh", 0)):
+            index = VectorIndex(dim, size, ann_min_rows=ann_min_rows)
+            for i, vector in enumerate(vectors):
+                index.add(str(i), vector)
+            start = time.perf_counter()
+            found = sum(index.search(probe, 1)[0][0] == str(target) for probe, target in zip(probes, targets))
+            row[f"{label}_ms"] = round((time.perf_counter() - start) / queries * 1000, 3)
+            row[f"{label}_recall"] = round(found / queries, 3)
+        print(f"search  {size:>6} x {dim}: brute {row['brute_ms']:.3f}ms (recall {row['brute_recall']}), "
+              f"lsh {row['lsh_ms']:.3f}ms (recall {row['lsh_recall']})")
+        results.append(row)
+    return results
+
+
+async def bench_resubmit(cases: int) -> dict:
+    from app.core import analyzer
+    from app.core.semantic_cache import semantic_cache
+    from app.llm.llm_client import close_http_client
+    from app.llm.token_budget import estimate_tokens
+
+    prompts = []
+    scheduler_run = analyzer.provider_scheduler.run
+
+    async def recording_run(prompt, **kwargs):
+        prompts.append(prompt)
+        return await scheduler_run(prompt, **kwargs)
+
+    analyzer.provider_scheduler.run = recording_run
+    timings = {"fresh": [], "reuse": [], "update": []}
+    tokens = {"fresh": [], "update": []}
+    try:
+        for seed in range(cases):
+            original = pleading(1, seed + 100)
+            variants = (
+                ("fresh", original),
+                ("reuse", original.replace(",", " ,")),
+                ("update", amended(original)),
+            )
+            for label, text in variants:
+                prompts.clear()
+                start = time.perf_counter()
+                # The semantic cache only serves a signed-in owner's own cases
+                await analyzer.analyze_case_with_ai_async(text, owner="bench-user")
+                timings[label].append(time.perf_counter() - start)
+                if label in tokens and prompts:
+                    tokens[label].append(estimate_tokens(prompts[-1]))
+    finally:
+        analyzer.provider_scheduler.run = scheduler_run
+        await close_http_client()
+
+    result = {f"{label}_s": round(statistics.mean(values), 3) for label, values in timings.items()}
+    result.update({f"{label}_prompt_tokens": round(statistics.mean(values)) for label, values in tokens.items() if values})
+    result["cache"] = semantic_cache.stats()
+    print(f"resubmit: fresh {result['fresh_s']:.2f}s (~{result.get('fresh_prompt_tokens')} prompt tokens), "
+          f"reuse {result['reuse_s'] * 1000:.1f}ms, update {result['update_s']:.2f}s "
+          f"(~{result.get('update_prompt_tokens')} prompt tokens); {result['cache']}")
+    return result
+
+
+def main(args) -> dict:
+    # Before the first app import: the clients read these at import time
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["GEMINI_API_KEY"] = ""
+    from app.llm.embeddings import HASHED_DIM
+
+    results = {"embed": bench_embed(), "search": bench_search(args.sizes, HASHED_DIM)}
+    with StubServer(create_stub_app(args.latency, prefill_per_1k_tokens=args.prefill), args.port):
+        results["resubmit"] = asyncio.run(bench_resubmit(args.cases))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--cases", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub generation latency in seconds")
+    parser.add_argument("--prefill", type=float, default=0.5, help="stub seconds per 1000 prompt tokens")
+    parser.add_argument("--port", type=int, default=11500)
+    main(parser.parse_args())
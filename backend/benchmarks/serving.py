@@ -0,0 +1,161 @@
+"""
+Production serving mode: cold start and scaling across worker processes.
+
+  import    seconds to import app.main in a fresh interpreter, and which
+            heavy optional modules that pulls in
+  startup   process start until every worker answers /health, for
+            `uvicorn --workers N` and gunicorn with and without preload
+  scaling   requests/sec with 1..N workers against a zero-latency stub
+            Ollama, so the app's own CPU work is the bottleneck; efficiency
+            is rps / (workers * single-worker rps), capped by os.cpu_count()
+
+    python -m benchmarks.serving --workers 1 2 4 --requests 200
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.long_document import synthetic_document
+from benchmarks.suite import BACKEND_DIR, _spawn, _stub_args, _wait_ready, drive
+
+# Modules the app should no longer load just to start
+DEFERRED_MODULES = ("requests", "google.generativeai", "motor.motor_asyncio")
+
+_IMPORT_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+print(",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))
+"""
+
+
+def bench_import(env: dict, rounds: int = 3) -> dict:
+    seconds, loaded = [], ""
+    for _ in range(rounds):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE], cwd=BACKEND_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout.split("\n")
+        seconds.append(float(output[0]))
+        loaded = output[1]
+    result = {"import_s": round(statistics.median(seconds), 3), "deferred_modules_loaded": loaded.split(",") if loaded else []}
+    print(f"import  app.main {result['import_s']:.2f}s (median of {rounds}); "
+          f"deferred modules loaded: {result['deferred_modules_loaded'] or 'none'}")
+    return result
+
+
+def _server_args(server: str, workers: int, port: int) -> list:
+    if server == "uvicorn":
+        return ["uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return ["gunicorn", "app.main:app", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+
+
+async def _health_pids(url: str, burst: int) -> set:
+    """pids behind a burst of concurrent /health requests, each on its own connection"""
+    async with httpx.AsyncClient(timeout=1) as client:
+        replies = await asyncio.gather(*(client.get(f"{url}/health") for _ in range(burst)), return_exceptions=True)
+    return {r.json()["serving"]["pid"] for r in replies if isinstance(r, httpx.Response)}
+
+
+def _wait_for_workers(url: str, workers: int, process: subprocess.Popen, timeout: float = 120) -> None:
+    """Until /health has answered from `workers` distinct processes"""
+    pids = set()
+    deadline = time.monotonic() + timeout
+    while len(pids) < workers:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"only {len(pids)} of {workers} workers answered within {timeout}s")
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode} during startup")
+        # Concurrent connections, so the kernel spreads them over the workers
+        pids |= asyncio.run(_health_pids(url, 8 * workers))
+        if len(pids) < workers:
+            time.sleep(0.05)
+
+
+def _stop(processes) -> None:
+    for process in reversed(processes):
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def bench_startup(env: dict, workers: int, port: int) -> list:
+    variants = [("uvicorn", {})]
+    try:
+        import gunicorn  # noqa: F401
+        variants += [("gunicorn", {"GUNICORN_PRELOAD": "false"}), ("gunicorn+preload", {"GUNICORN_PRELOAD": "true"})]
+    except ImportError:
+        print("startup gunicorn is not installed, measuring uvicorn only")
+    results = []
+    env = {**env, "WEB_CONCURRENCY": str(workers)}
+    for label, extra in variants:
+        start = time.perf_counter()
+        server = _spawn(_server_args(label.split("+")[0], workers, port), {**env, **extra}, quiet=True)
+        try:
+            _wait_for_workers(f"http://127.0.0.1:{port}", workers, server)
+            elapsed = time.perf_counter() - start
+        finally:
+            _stop([server])
+        results.append({"server": label, "workers": workers, "all_ready_s": round(elapsed, 3)})
+        print(f"startup {label:<17} {workers} workers: all answering after {elapsed:.2f}s")
+    return results
+
+
+def bench_scaling(env: dict, worker_counts, requests: int, pages: int, port: int) -> list:
+    results = []
+    seeds = itertools.count(1_000_000)
+    for workers in worker_counts:
+        app_env = {**env, "WEB_CONCURRENCY": str(workers)}
+        server = _spawn(_server_args("uvicorn", workers, port), app_env, quiet=True)
+        try:
+            _wait_for_workers(f"http://127.0.0.1:{port}", workers, server)
+            texts = [synthetic_document(pages, next(seeds)) for _ in range(requests)]
+            result = asyncio.run(drive(f"http://127.0.0.1:{port}", texts, 4 * workers))
+        finally:
+            _stop([server])
+        row = {"workers": workers, "rps": result["rps"], "p95_ms": result["latency_ms"]["p95"], "outcomes": result["outcomes"]}
+        row["efficiency"] = round(row["rps"] / (workers * results[0]["rps"]), 2) if results else 1.0
+        print(f"scaling {workers} workers: {row['rps']:>7.2f} req/s  p95 {row['p95_ms']:>7.1f}ms  "
+              f"efficiency {row['efficiency']:.2f}  outcomes {row['outcomes']}")
+        results.append(row)
+    return results
+
+
+def main(args) -> dict:
+    env = {
+        **os.environ, "MONGODB_URI": "", "GEMINI_API_KEY": "", "OLLAMA_WARMUP": "false",
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{args.stub_port}",
+        # Distinct texts must reach the model, not a near-duplicate analysis
+        "SEMANTIC_CACHE_ENABLED": "false",
+    }
+    print(f"{os.cpu_count()} CPUs")
+    results = {"cpus": os.cpu_count(), "import": bench_import(env)}
+    stub = _spawn(_stub_args(args.stub_port, {"latency": 0.0, "max_parallel": 0}, 1.0, 0), env, quiet=True)
+    try:
+        _wait_ready(f"http://127.0.0.1:{args.stub_port}/api/tags", stub)
+        results["startup"] = bench_startup(env, max(args.workers), args.app_port)
+        results["scaling"] = bench_scaling(env, args.workers, args.requests, args.pages, args.app_port)
+    finally:
+        _stop([stub])
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--stub-port", type=int, default=11500)
+    main(parser.parse_args())
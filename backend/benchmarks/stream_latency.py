@@ -0,0 +1,58 @@
+"""
+Time to first useful byte: /case/analyze vs /case/analyze/stream.
+
+Serves the app and a stub Ollama server with uvicorn and reports when the
+client first receives usable analysis data from each endpoint.
+
+    python -m benchmarks.stream_latency --latency 5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+CASE_TEXT = "The accused took an advance of Rs. 2,00,000 for goods and never delivered them."
+
+
+async def measure(base_url: str) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        start = time.perf_counter()
+        response = await client.post("/api/v1/case/analyze", json={"case_text": CASE_TEXT + " (blocking)"})
+        response.raise_for_status()
+        blocking = time.perf_counter() - start
+
+        first_section = None
+        start = time.perf_counter()
+        async with client.stream(
+            "POST", "/api/v1/case/analyze/stream", json={"case_text": CASE_TEXT + " (stream)"}
+        ) as response:
+            async for line in response.aiter_lines():
+                if first_section is None and line == "event: section":
+                    first_section = time.perf_counter() - start
+        streamed_total = time.perf_counter() - start
+
+    print(f"/case/analyze          first useful byte: {blocking:.2f}s")
+    print(f"/case/analyze/stream   first section:     {first_section:.2f}s (complete {streamed_total:.2f}s)")
+    return {"blocking_s": blocking, "stream_first_section_s": first_section, "stream_total_s": streamed_total}
+
+
+def main(latency: float, stub_port: int, app_port: int) -> dict:
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{stub_port}"
+    os.environ["GEMINI_API_KEY"] = ""
+    from app.main import app
+
+    with StubServer(create_stub_app(latency), stub_port), StubServer(app, app_port):
+        return asyncio.run(measure(f"http://127.0.0.1:{app_port}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=5.0, help="stub generation latency in seconds")
+    parser.add_argument("--stub-port", type=int, default=11500)
+    parser.add_argument("--app-port", type=int, default=8100)
+    args = parser.parse_args()
+    main(args.latency, args.stub_port, args.app_port)
@@ -0,0 +1,265 @@
+"""
+Local stub LLM servers for benchmarks.
+
+Mimics the subset of the Ollama (/api/tags, /api/generate) and Gemini
+(generateContent) REST APIs used by app/llm, returning a canned analysis
+after a configurable delay. Optional log-normal latency jitter, malformed
+JSON bodies and HTTP errors, drawn from a seeded RNG so runs repeat.
+
+Run standalone:
+    python -m benchmarks.stub_llm --port 11500 --latency 0.5 --jitter 0.3 --malformed-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SAMPLE_ANALYSIS = {
+    "case_type": "Criminal",
+    "case_summary": "The complainant alleges the accused took an advance payment and never delivered the goods.",
+    "key_facts": ["Advance of Rs. 2,00,000 paid", "Goods never delivered", "Accused stopped answering calls"],
+    "legal_issues": [
+        {"issue": "Cheating", "description": "Dishonest inducement to part with money", "importance": "High"}
+    ],
+    "applicable_laws": [
+        {"law": "IPC Section 420", "description": "Cheating and dishonestly inducing delivery of property",
+         "relevance": "Accused induced payment without intent to deliver"}
+    ],
+    "strengths": [{"point": "Bank transfer record", "explanation": "Proves payment"}],
+    "weaknesses": [{"point": "No written contract", "explanation": "Terms are oral", "severity": "Medium"}],
+    "recommended_actions": [
+        {"action": "File FIR", "priority": "High", "rationale": "Initiates criminal investigation"}
+    ],
+    "evidence_needed": ["Bank statements", "Call records"],
+    "precedents": ["Hridaya Ranjan Prasad Verma v. State of Bihar (2000)"],
+    "estimated_outcome": "Favourable if intent at inception is shown",
+    "timeline_considerations": "File complaint promptly",
+}
+
+
+STREAM_CHUNK_CHARS = 16
+
+
+def _chunks(text: str, size: int = STREAM_CHUNK_CHARS):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _malformed(body: str, rng: random.Random) -> str:
+    """The ways local models actually break JSON"""
+    kind = rng.randrange(4)
+    if kind == 0:
+        # Truncated mid-generation (num_predict reached)
+        return body[:rng.randint(len(body) // 4, len(body) - 2)]
+    if kind == 1:
+        return f"```json\n{body}\n```"
+    if kind == 2:
+        return body.replace("]", ",]", 1)
+    return "Here is the analysis of the case:\n" + body
+
+
+def _keep_alive_seconds(value) -> float:
+    """Ollama's keep_alive: seconds or a duration like "30m"; negative means forever; default 5m"""
+    if value is None:
+        return 300.0
+    if isinstance(value, str):
+        units = {"s": 1, "m": 60, "h": 3600}
+        value = float(value[:-1]) * units[value[-1]] if value[-1] in units else float(value)
+    return float("inf") if value < 0 else float(value)
+
+
+def create_stub_app(
+    latency: float = 0.5,
+    prefill_per_1k_tokens: float = 0.0,
+    max_parallel: int = 0,
+    jitter: float = 0.0,
+    malformed_rate: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 0,
+    load_seconds: float = 0.0,
+    prefix_cache: bool = False,
+) -> FastAPI:
+    """
+    Build a stub app that answers both Ollama and Gemini routes after
+    `latency` seconds. Streaming requests spread that latency evenly
+    across token chunks.
+
+    Non-streaming requests additionally take `prefill_per_1k_tokens`
+    seconds per 1000 prompt tokens (~4 chars each), and at most
+    `max_parallel` of them are served at once (0 = unlimited), like
+    OLLAMA_NUM_PARALLEL on a single box.
+
+    With `jitter` > 0 each latency is scaled by a log-normal factor with
+    that sigma (median unchanged, long right tail). `malformed_rate` and
+    `error_rate` are the fractions of generations answered with broken
+    JSON or an HTTP 500/503.
+
+    The Ollama routes also model residency: with `load_seconds` the first
+    request, and any request after the model's keep_alive has expired,
+    waits for a cold load. With `prefix_cache` prefill is only charged for
+    the part of the prompt after its common prefix with the previous
+    prompt, like Ollama reusing its KV cache.
+    """
+    stub = FastAPI(title="Stub LLM")
+    slots = asyncio.Semaphore(max_parallel) if max_parallel else None
+    rng = random.Random(seed)
+
+    def sample_latency() -> float:
+        return latency * rng.lognormvariate(0, jitter) if jitter else latency
+
+    def sample_body() -> str:
+        return _malformed(body, rng) if rng.random() < malformed_rate else body
+
+    model = {"loaded_until": 0.0, "last_prompt": ""}
+    load_lock = asyncio.Lock()
+
+    async def ensure_loaded(keep_alive):
+        if load_seconds:
+            async with load_lock:
+                if time.monotonic() > model["loaded_until"]:
+                    await asyncio.sleep(load_seconds)
+                    model["last_prompt"] = ""
+        model["loaded_until"] = time.monotonic() + _keep_alive_seconds(keep_alive)
+
+    def uncached_prompt(prompt: str) -> str:
+        if not prefix_cache:
+            return prompt
+        shared = len(os.path.commonprefix([prompt, model["last_prompt"]]))
+        model["last_prompt"] = prompt
+        return prompt[shared:]
+
+    async def generation_delay(prompt: str) -> float:
+        delay = sample_latency() + prefill_per_1k_tokens * len(prompt) / 4000
+        if slots is None:
+            await asyncio.sleep(delay)
+            return delay
+        async with slots:
+            await asyncio.sleep(delay)
+        return delay
+
+    body = json.dumps(SAMPLE_ANALYSIS, indent=2)
+
+    def usage(prompt: str, text: str, seconds: float) -> dict:
+        """Ollama's counters (token counts at ~4 chars each, durations in ns)"""
+        return {
+            "prompt_eval_count": len(prompt) // 4,
+            "eval_count": len(text) // 4,
+            "eval_duration": int(seconds * 0.9e9),
+            "total_duration": int(seconds * 1e9),
+        }
+
+    async def ollama_stream(model, prompt):
+        text = sample_body()
+        chunks = _chunks(text)
+        delay = sample_latency()
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            yield json.dumps({"model": model, "response": chunk, "done": False}) + "\n"
+        yield json.dumps({"model": model, "response": "", "done": True, **usage(prompt, text, delay)}) + "\n"
+
+    async def gemini_stream(prompt):
+        text = sample_body()
+        chunks = _chunks(text)
+        delay = sample_latency()
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            event = {"candidates": [{"content": {"parts": [{"text": chunk}]}}]}
+            yield f"data: {json.dumps(event)}\r\n\r\n"
+        event = {"candidates": [], "usageMetadata": {
+            "promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4,
+        }}
+        yield f"data: {json.dumps(event)}\r\n\r\n"
+
+    @stub.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "llama3:latest"}]}
+
+    @stub.post("/api/generate")
+    async def generate(payload: dict):
+        prompt = payload.get("prompt", "")
+        load_start = time.monotonic()
+        await ensure_loaded(payload.get("keep_alive"))
+        if not prompt:
+            # No prompt: Ollama only loads the model
+            return {"model": payload.get("model"), "response": "", "done": True, "done_reason": "load"}
+        if rng.random() < error_rate:
+            return JSONResponse({"error": "model runner has unexpectedly stopped"}, status_code=500)
+        if payload.get("stream", True):
+            return StreamingResponse(ollama_stream(payload.get("model"), prompt), media_type="application/x-ndjson")
+        load = time.monotonic() - load_start
+        delay = await generation_delay(uncached_prompt(prompt))
+        text = sample_body()
+        return {
+            "model": payload.get("model"), "response": text, "done": True,
+            **usage(prompt, text, load + delay), "load_duration": int(load * 1e9),
+        }
+
+    @stub.get("/v1beta/models/{model}")
+    async def model_info(model: str):
+        return {"name": f"models/{model}"}
+
+    @stub.post("/v1beta/models/{model_action}")
+    async def generate_content(model_action: str, payload: dict):
+        prompt = payload["contents"][0]["parts"][0]["text"]
+        if rng.random() < error_rate:
+            return JSONResponse(
+                {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}},
+                status_code=503,
+            )
+        if model_action.endswith(":streamGenerateContent"):
+            return StreamingResponse(gemini_stream(prompt), media_type="text/event-stream")
+        await generation_delay(prompt)
+        text = sample_body()
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}]}}],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4},
+        }
+
+    return stub
+
+
+class StubServer:
+    """Run a stub app with uvicorn on a background thread"""
+
+    def __init__(self, app: FastAPI, port: int, host: str = "127.0.0.1"):
+        self.url = f"http://{host}:{port}"
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning", backlog=4096)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub Ollama/Gemini server")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.5, help="median generation latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="log-normal sigma of the latency")
+    parser.add_argument("--prefill-per-1k-tokens", type=float, default=0.0)
+    parser.add_argument("--max-parallel", type=int, default=0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="cold model load time")
+    parser.add_argument("--prefix-cache", action="store_true", help="charge prefill only for the uncached tail")
+    args = parser.parse_args()
+    stub_app = create_stub_app(
+        args.latency, args.prefill_per_1k_tokens, args.max_parallel,
+        args.jitter, args.malformed_rate, args.error_rate, args.seed,
+        args.load_seconds, args.prefix_cache,
+    )
+    uvicorn.run(stub_app, host="127.0.0.1", port=args.port, log_level="warning", backlog=4096)
@@ -0,0 +1,316 @@
+"""
+Reproducible load benchmark of POST /api/v1/case/analyze.
+
+Each scenario starts stub Ollama/Gemini servers and the app (uvicorn with
+--workers N) as subprocesses, then drives /case/analyze at each fixed
+concurrency level with distinct case texts, so nothing is served from the
+result cache. Reports p50/p95/p99 latency of successful responses,
+requests/sec, error counts, server-side stage means (from Server-Timing)
+and resident memory of each app worker.
+
+Results go to a JSON file; pass an earlier file as --baseline to print the
+change against it, scenario by scenario.
+
+    python -m benchmarks.suite --concurrency 1 8 32 --requests 200 --output bench.json
+    python -m benchmarks.suite --scenarios ollama_malformed --baseline bench.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.long_document import synthetic_document
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stub settings per provider (create_stub_app keyword arguments); None
+# leaves the provider unconfigured. Latencies are medians in seconds.
+SCENARIOS = {
+    "ollama": {
+        "ollama": {"latency": 0.5, "jitter": 0.3},
+        "gemini": None,
+    },
+    "ollama_malformed": {
+        "ollama": {"latency": 0.5, "jitter": 0.3, "malformed_rate": 0.1},
+        "gemini": None,
+    },
+    "ollama_errors": {
+        "ollama": {"latency": 0.5, "jitter": 0.3, "error_rate": 0.05},
+        "gemini": None,
+    },
+    "gemini_fallback": {
+        "gemini": {"latency": 0.8, "jitter": 0.4, "error_rate": 0.2},
+        "ollama": {"latency": 0.5, "jitter": 0.3},
+    },
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    timings = {}
+    for part in header.split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        if dur:
+            timings[name] = float(dur)
+    return timings
+
+
+def worker_memory(pid: int) -> List[dict]:
+    """
+    RSS and peak RSS (MB) of the uvicorn worker processes: the children of
+    `pid` when it is a --workers supervisor, else `pid` itself. Linux only.
+    """
+    def status(p: int) -> dict:
+        fields = {}
+        with open(f"/proc/{p}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                fields[key] = value.strip()
+        return fields
+
+    try:
+        children = []
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    if int(status(int(entry)).get("PPid", 0)) == pid:
+                        children.append(int(entry))
+                except OSError:
+                    continue
+        # multiprocessing's resource tracker is a child too, but not a worker
+        workers = [p for p in children if b"spawn_main" in _cmdline(p)] or [pid]
+        result = []
+        for p in sorted(workers):
+            fields = status(p)
+            result.append({
+                "pid": p,
+                "rss_mb": round(int(fields["VmRSS"].split()[0]) / 1024, 1),
+                "peak_rss_mb": round(int(fields["VmHWM"].split()[0]) / 1024, 1),
+            })
+        return result
+    except (OSError, KeyError):
+        return []
+
+
+def _cmdline(pid: int) -> bytes:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+def _spawn(module_args: List[str], env: Dict[str, str], quiet: bool) -> subprocess.Popen:
+    output = subprocess.DEVNULL if quiet else None
+    return subprocess.Popen(
+        [sys.executable, "-m", *module_args], cwd=BACKEND_DIR, env=env, stdout=output, stderr=output
+    )
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} during startup")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def _stub_args(port: int, settings: dict, latency_scale: float, seed: int) -> List[str]:
+    args = ["benchmarks.stub_llm", "--port", str(port), "--seed", str(seed)]
+    for key, value in settings.items():
+        if key == "latency":
+            value *= latency_scale
+        args += [f"--{key.replace('_', '-')}", str(value)]
+    return args
+
+
+async def drive(base_url: str, texts: List[str], concurrency: int) -> dict:
+    """Send every text to /case/analyze with `concurrency` requests in flight"""
+    latencies, outcomes = [], Counter()
+    stage_totals = defaultdict(float)
+    next_index = itertools.count()
+
+    async def client_loop(client: httpx.AsyncClient):
+        while (i := next(next_index)) < len(texts):
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/v1/case/analyze", json={"case_text": texts[i]})
+            except httpx.HTTPError as e:
+                outcomes[type(e).__name__] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            outcomes[str(response.status_code)] += 1
+            if response.status_code == 200:
+                latencies.append(elapsed)
+                for name, ms in parse_server_timing(response.headers.get("server-timing", "")).items():
+                    stage_totals[name] += ms
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ok = len(latencies)
+    return {
+        "requests": len(texts),
+        "ok": ok,
+        "outcomes": dict(outcomes),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(ok / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "mean": round(sum(latencies) / ok * 1000, 1) if ok else 0.0,
+            "max": round(latencies[-1] * 1000, 1) if ok else 0.0,
+        },
+        "server_timing_ms": {name: round(total / ok, 2) for name, total in sorted(stage_totals.items())} if ok else {},
+    }
+
+
+def run_scenario(name: str, args) -> List[dict]:
+    scenario = SCENARIOS[name]
+    env = {**os.environ, "MONGODB_URI": "", "GEMINI_API_KEY": "", "WEB_CONCURRENCY": str(args.workers)}
+    env.update(item.split("=", 1) for item in args.app_env)
+    processes = []
+    try:
+        for offset, provider in enumerate(("ollama", "gemini")):
+            settings = scenario[provider]
+            if settings is None:
+                continue
+            port = args.stub_port + offset
+            stub = _spawn(_stub_args(port, settings, args.latency_scale, args.seed), env, not args.verbose)
+            processes.append(stub)
+            _wait_ready(f"http://127.0.0.1:{port}/api/tags", stub)
+            if provider == "ollama":
+                env["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{port}"
+            else:
+                env["GEMINI_API_KEY"] = "stub-key-for-benchmarks"
+                env["GEMINI_BASE_URL"] = f"http://127.0.0.1:{port}"
+
+        app_url = f"http://127.0.0.1:{args.app_port}"
+        app = _spawn([
+            "uvicorn", "app.main:app", "--port", str(args.app_port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ], env, not args.verbose)
+        processes.append(app)
+        _wait_ready(f"{app_url}/health", app)
+
+        # Distinct texts across all levels so every request misses the cache
+        seeds = itertools.count(args.seed * 1_000_000)
+        asyncio.run(drive(app_url, [synthetic_document(args.pages, next(seeds)) for _ in range(args.warmup)], 1))
+        results = []
+        for concurrency in args.concurrency:
+            texts = [synthetic_document(args.pages, next(seeds)) for _ in range(args.requests)]
+            result = {"scenario": name, "concurrency": concurrency, **asyncio.run(drive(app_url, texts, concurrency))}
+            result["memory_mb"] = worker_memory(app.pid)
+            latency = result["latency_ms"]
+            print(
+                f"{name:>17} c={concurrency:<4} {result['rps']:>8.2f} req/s  p50 {latency['p50']:>8.1f}ms  "
+                f"p95 {latency['p95']:>8.1f}ms  p99 {latency['p99']:>8.1f}ms  outcomes {result['outcomes']}  "
+                f"rss {[m['rss_mb'] for m in result['memory_mb']]}MB"
+            )
+            results.append(result)
+        return results
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    def change(new: float, old: float) -> str:
+        return f"{100 * (new - old) / old:+6.1f}%" if old else "   n/a"
+
+    print(f"\nchange against {baseline_path}:")
+    for result in results:
+        old = baseline.get((result["scenario"], result["concurrency"]))
+        if old is None:
+            continue
+        new_latency, old_latency = result["latency_ms"], old["latency_ms"]
+        print(
+            f"{result['scenario']:>17} c={result['concurrency']:<4} rps {change(result['rps'], old['rps'])}  "
+            + "  ".join(f"{q} {change(new_latency[q], old_latency[q])}" for q in ("p50", "p95", "p99"))
+        )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args) -> dict:
+    results = []
+    for name in args.scenarios:
+        results += run_scenario(name, args)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=1, help="size of each synthetic case document")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every stub latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app-env", nargs="*", default=[], metavar="KEY=VALUE", help="extra app environment")
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--stub-port", type=int, default=11500, help="Ollama stub; Gemini uses the next port")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show app and stub logs")
+    main(parser.parse_args())
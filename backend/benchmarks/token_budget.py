@@ -0,0 +1,168 @@
+"""
+Prompt tokens before and after token budgeting, and what that is worth in
+prefill latency.
+
+"Before" is the pre-budgeting prompt: the expanded ~60-line schema and the
+case text as filed. "After" is what build_case_prompt sends now: compact
+schema and the text without page numbers, running headers and signature
+lines. Case documents are synthetic pleadings laid out as printed pages.
+
+Latency is measured against the stub Ollama server, which charges
+--prefill seconds per 1000 prompt tokens on top of --latency, so the delta
+is modelled, not measured on a real model.
+
+    python -m benchmarks.token_budget --pages 1 2 --prefill 0.5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.long_document import synthetic_document
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+LINE_CHARS = 80
+LINES_PER_PAGE = 40
+HEADER = ("IN THE COURT OF THE CHIEF JUDICIAL MAGISTRATE, PATIALA HOUSE COURTS, NEW DELHI",
+          "Crl. Complaint Case No. 4512 of 2023")
+SIGNATURE = ("Sd/-", "COMPLAINANT", "Through Counsel", "(Signature)", "Sd/-", "ADVOCATE FOR THE COMPLAINANT")
+
+# The schema block of case_analysis_prompt before PROMPT_VERSION 5 (case_type included)
+LEGACY_SCHEMA = """{
+  "case_type": "Criminal | Civil | Constitutional | Family | Corporate | Property | Labor | Tax | Other",
+  "case_summary": "Brief 2-3 sentence summary of the case",
+  "key_facts": ["fact 1", "fact 2", "fact 3"],
+  "legal_issues": [
+    {
+      "issue": "Main legal question or issue",
+      "description": "Detailed explanation of this issue",
+      "importance": "High | Medium | Low"
+    }
+  ],
+  "applicable_laws": [
+    {
+      "law": "Name of law/section (e.g., IPC Section 420)",
+      "description": "What this law covers",
+      "relevance": "How it applies to this case"
+    }
+  ],
+  "strengths": [
+    {
+      "point": "Strong point in the case",
+      "explanation": "Why this strengthens the case"
+    }
+  ],
+  "weaknesses": [
+    {
+      "point": "Weak point or risk",
+      "explanation": "Why this is a concern",
+      "severity": "High | Medium | Low"
+    }
+  ],
+  "recommended_actions": [
+    {
+      "action": "Specific action to take",
+      "priority": "High | Medium | Low",
+      "rationale": "Why this action is important"
+    }
+  ],
+  "evidence_needed": ["type of evidence 1", "type of evidence 2"],
+  "precedents": ["Relevant case law or precedent if known"],
+  "estimated_outcome": "Likely outcome based on the facts presented",
+  "timeline_considerations": "Important deadlines or time-sensitive matters"
+}"""
+
+
+def pleading(pages: int, seed: int) -> str:
+    """synthetic_document laid out as printed pages with headers, page numbers and a signature block"""
+    text = synthetic_document(pages, seed)
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > LINE_CHARS:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+
+    body_lines = LINES_PER_PAGE - len(HEADER) - 1
+    page_count = -(-len(lines) // body_lines)
+    out = []
+    for page in range(page_count):
+        out += [*HEADER, ""]
+        out += lines[page * body_lines:(page + 1) * body_lines]
+        out += ["", f"Page {page + 1} of {page_count}", ""]
+    out += SIGNATURE
+    return "\n".join(out)
+
+
+def legacy_prompt(case_text: str) -> str:
+    from app.law_mapping.section_mapper import format_sections, map_sections
+    from app.llm.prompts import case_analysis_prompt, _ANALYSIS_KEYS, _schema
+
+    prompt = case_analysis_prompt(case_text, format_sections(map_sections(case_text)))
+    return prompt.replace(_schema(_ANALYSIS_KEYS[1:]), LEGACY_SCHEMA)
+
+
+async def mean_latency(prompts) -> float:
+    from app.llm.ollama_client import call_ollama_async
+
+    latencies = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        await call_ollama_async(prompt)
+        latencies.append(time.perf_counter() - start)
+    return statistics.mean(latencies)
+
+
+async def main(args) -> list:
+    from app.core.analyzer import build_case_prompt
+    from app.llm.llm_client import close_http_client
+    from app.llm.token_budget import estimate_tokens, ollama_context_options
+
+    results = []
+    try:
+        for pages in args.pages:
+            documents = [pleading(pages, seed) for seed in range(args.cases)]
+            before = [legacy_prompt(doc) for doc in documents]
+            after = [build_case_prompt(doc)[0] for doc in documents]
+            before_tokens = statistics.mean(estimate_tokens(p) for p in before)
+            after_tokens = statistics.mean(estimate_tokens(p) for p in after)
+            before_s, after_s = await mean_latency(before), await mean_latency(after)
+            options = ollama_context_options(after[0])
+            result = {
+                "pages": pages,
+                "prompt_tokens_before": round(before_tokens),
+                "prompt_tokens_after": round(after_tokens),
+                "tokens_saved_pct": round(100 * (1 - after_tokens / before_tokens), 1),
+                "latency_before_s": round(before_s, 3),
+                "latency_after_s": round(after_s, 3),
+                "num_ctx": options["num_ctx"],
+                "num_predict": options["num_predict"],
+            }
+            print(
+                f"{pages} page(s): prompt ~{result['prompt_tokens_before']} -> ~{result['prompt_tokens_after']} tokens "
+                f"({result['tokens_saved_pct']}% saved), latency {before_s:.2f}s -> {after_s:.2f}s "
+                f"({after_s - before_s:+.2f}s), num_ctx {options['num_ctx']} num_predict {options['num_predict']} "
+                f"(was 4096/2048)"
+            )
+            results.append(result)
+    finally:
+        await close_http_client()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub generation latency in seconds")
+    parser.add_argument("--prefill", type=float, default=0.5, help="stub seconds per 1000 prompt tokens")
+    parser.add_argument("--port", type=int, default=11500)
+    args = parser.parse_args()
+
+    # Point the client at the stub before importing it
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    with StubServer(create_stub_app(args.latency, prefill_per_1k_tokens=args.prefill), args.port):
+        asyncio.run(main(args))
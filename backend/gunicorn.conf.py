@@ -0,0 +1,34 @@
+"""
+Production serving: gunicorn managing uvicorn workers.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+Workers default to one per CPU (WEB_CONCURRENCY overrides). Each worker
+has its own caches, circuit breakers and connection pools; set
+SHARED_STATE_BACKEND=mongo (the default with MONGODB_URI and more than
+one worker) so the analysis cache, Gemini rate limit and batch jobs are
+shared. See app/config.py for the per-process limits.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+# The app divides deployment-wide limits (Ollama slots, Gemini quota) by this
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Import the app once in the master and fork the workers from it: they start
+# without paying the import again and share its read-only memory. Safe
+# because clients, connections and background tasks are all created in the
+# lifespan, after the fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# Longer than the slowest analysis (OLLAMA_TIMEOUT is 300s)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "360"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+# Recycle workers after this many requests to bound memory growth (0 = never)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Tests run without MongoDB, LLM providers or a model warm-up; set before
+# any app module reads its configuration at import time
+os.environ.update({
+    "MONGODB_URI": "",
+    "GEMINI_API_KEY": "",
+    "OLLAMA_WARMUP": "false",
+    "SEMANTIC_CACHE_ENABLED": "false",
+    "RISK_ASSESSMENT_ENABLED": "false",
+    "JWT_SECRET_KEY": "test-secret",
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import dependencies, routes
+from app.auth.jwt_handler import create_access_token
+from app.core import analyzer
+from app.jobs.store import MemoryJobStore, new_job
+from app.main import app
+from app.utils.rate_limit import ClientQuotas
+from benchmarks.stub_llm import SAMPLE_ANALYSIS
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def ollama_stream(monkeypatch):
+    """Ollama as the only available provider, streaming SAMPLE_ANALYSIS in small chunks"""
+    prompts = []
+
+    async def is_available(name):
+        return name == "Ollama"
+
+    async def stream(prompt):
+        prompts.append(prompt)
+        body = json.dumps(SAMPLE_ANALYSIS)
+        for start in range(0, len(body), 16):
+            yield body[start:start + 16]
+
+    monkeypatch.setattr(analyzer.health_monitor, "is_available", is_available)
+    monkeypatch.setitem(analyzer._stream_providers, "Ollama", stream)
+    return prompts
+
+
+def _sse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_sends_each_section_then_the_result(client, ollama_stream):
+    response = client.post("/api/v1/case/analyze/stream",
+                           json={"case_text": "The accused took an advance for goods and never delivered them."})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    sections = {payload["section"]: payload["value"] for event, payload in events if event == "section"}
+    assert set(sections) == set(analyzer.ANALYSIS_SECTIONS)
+    assert sections["key_facts"] == SAMPLE_ANALYSIS["key_facts"]
+    assert events[-1][0] == "result"
+    assert events[-1][1]["case_summary"] == SAMPLE_ANALYSIS["case_summary"]
+    assert len(ollama_stream) == 1
+
+
+def test_stream_reports_failure_as_an_error_event(client, monkeypatch):
+    async def unavailable(name):
+        return False
+
+    monkeypatch.setattr(analyzer.health_monitor, "is_available", unavailable)
+    response = client.post("/api/v1/case/analyze/stream", json={"case_text": "A dispute over an unpaid invoice."})
+    events = _sse_events(response.text)
+    assert events[-1][0] == "error"
+    assert "AI analysis failed" in events[-1][1]["detail"]
+
+
+def test_classify_answers_without_an_llm(client, monkeypatch):
+    async def unavailable(name):
+        raise AssertionError("no provider should be consulted")
+
+    monkeypatch.setattr(analyzer.health_monitor, "is_available", unavailable)
+    response = client.post("/api/v1/case/classify",
+                           json={"case_text": "The accused cheated the complainant under Section 420 IPC."})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["case_type"] == "Criminal"
+    assert any("420" in section for section in body["sections"])
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    async def analyze(case_text, **kwargs):
+        calls.append(case_text)
+        return dict(SAMPLE_ANALYSIS)
+
+    monkeypatch.setattr(routes, "analyze_case_with_ai_async", analyze)
+    return calls
+
+
+def _bearer(user_id="65f000000000000000000000", role="user"):
+    return {"Authorization": f"Bearer {create_access_token(user_id, role)}"}
+
+
+def _analyze(client, headers=None):
+    return client.post("/api/v1/case/analyze", json={"case_text": "The tenant has not paid rent for three months."},
+                       headers=headers or {})
+
+
+def test_anonymous_analysis_is_served_by_default(client, llm_calls):
+    assert _analyze(client).status_code == 200
+    assert len(llm_calls) == 1
+
+
+def test_bad_token_is_rejected(client, llm_calls):
+    response = _analyze(client, {"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+    assert llm_calls == []
+
+
+def test_auth_required_rejects_anonymous_callers(client, llm_calls, monkeypatch):
+    monkeypatch.setattr(dependencies, "AUTH_REQUIRED", True)
+    assert _analyze(client).status_code == 401
+    assert _analyze(client, _bearer()).status_code == 200
+
+
+def test_over_quota_is_rejected_before_the_llm(client, llm_calls, monkeypatch):
+    quotas = ClientQuotas(rate_per_minute=1, burst=1, max_concurrent=0)
+    monkeypatch.setitem(dependencies.ANALYSIS_QUOTAS, "anon", quotas)
+    assert _analyze(client).status_code == 200
+    response = _analyze(client)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert len(llm_calls) == 1
+
+
+@pytest.fixture
+def anonymous_job(monkeypatch):
+    """A queued job submitted by the test client's anonymous address"""
+    store = MemoryJobStore()
+    monkeypatch.setattr(routes.job_queue, "store", store)
+    job = new_job([{"case_text": "A dispute over an unpaid invoice."}], 0, owner={"kind": "anon", "client": "testclient"})
+    asyncio.run(store.insert(job))
+    return job["_id"]
+
+
+def test_jobs_are_hidden_from_other_callers(client, anonymous_job):
+    url = f"/api/v1/jobs/{anonymous_job}"
+    assert client.get(url).status_code == 200
+    assert client.get(url, headers=_bearer()).status_code == 404
+    assert client.delete(url, headers=_bearer()).status_code == 404
+    assert client.get(url).json()["status"] == "queued"
+    assert client.get(url, headers=_bearer(role="admin")).status_code == 200
+
+
+def test_owner_can_cancel_a_job(client, anonymous_job):
+    url = f"/api/v1/jobs/{anonymous_job}"
+    assert client.delete(url).json()["status"] == "cancelled"
+    assert client.delete(url).status_code == 409
@@ -0,0 +1,43 @@
+from app.core.analyzer import build_case_prompt
+from app.core.case_classifier import CaseClassifier, case_classifier
+from app.core.case_parser import parse_case
+from app.core.classifier_training import accuracy, synthetic_corpus, train
+
+CHEATING = ("Complainant Ramesh Kumar paid Rs. 2,50,000 to the accused Anil Sharma on 12/03/2023 for goods "
+            "that were never delivered. An FIR under Section 420 IPC was lodged on 5 April 2023.")
+
+
+def test_shipped_model_classifies_typical_cases():
+    assert case_classifier.predict(CHEATING)["case_type"] == "Criminal"
+    divorce = "The wife filed a petition for divorce and custody of the minor child under the Hindu Marriage Act."
+    prediction = case_classifier.predict(divorce)
+    assert prediction["case_type"] == "Family" and prediction["confidence"] > 0.9
+
+
+def test_unknown_words_give_no_confident_type():
+    assert case_classifier.predict("xyzzy plugh") == {"case_type": "Other", "confidence": 0.0, "scores": {}}
+
+
+def test_training_is_deterministic_and_generalizes():
+    model = train(synthetic_corpus(per_type=20, seed=0))
+    assert model == train(synthetic_corpus(per_type=20, seed=0))
+    classifier = CaseClassifier(model)
+    held_out = synthetic_corpus(per_type=10, seed=1)
+    assert accuracy(lambda text: classifier.predict(text)["case_type"], held_out) >= 0.9
+
+
+def test_parser_extracts_parties_dates_and_amounts():
+    parsed = parse_case(CHEATING)
+    assert parsed["parties"] == [{"role": "Complainant", "name": "Ramesh Kumar"},
+                                 {"role": "Accused", "name": "Anil Sharma"}]
+    # Day-first dates
+    assert [d["date"] for d in parsed["dates"]] == ["2023-03-12", "2023-04-05"]
+    assert parsed["amounts"][0]["amount"] == 250000
+
+
+def test_confident_classification_uses_the_typed_prompt():
+    prompt, case_type = build_case_prompt(CHEATING)
+    assert case_type == "Criminal"
+    assert "Criminal" in prompt
+    _, unknown = build_case_prompt("xyzzy plugh")
+    assert unknown is None
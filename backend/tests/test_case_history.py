@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.database.case_repository import case_document, decode_cursor, encode_cursor, list_cases
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def _seed(owners):
+    collection = mongomock_motor.AsyncMongoMockClient()["test"]["cases"]
+    base = datetime(2024, 1, 1)
+    docs = []
+    for i in range(25):
+        doc = case_document(f"case {i}", {"case_type": "Civil"}, owner_id=owners[i % len(owners)])
+        # Pairs share a timestamp, so the _id tie-break matters
+        doc["created_at"] = base + timedelta(minutes=i // 2)
+        docs.append(doc)
+    asyncio.run(collection.insert_many(docs))
+    return collection
+
+
+def _all_pages(collection, limit, **filters):
+    async def pages():
+        seen, cursor = [], None
+        while True:
+            docs, cursor = await list_cases(cursor=cursor, limit=limit, collection=collection, **filters)
+            seen.append(docs)
+            if cursor is None:
+                return seen
+    return asyncio.run(pages())
+
+
+def test_cursor_round_trip():
+    doc = {"created_at": datetime(2024, 5, 1, 12, 30, 15, 123000), "_id": ObjectId()}
+    assert decode_cursor(encode_cursor(doc)) == (doc["created_at"], doc["_id"])
+
+
+def test_malformed_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_pages_cover_every_case_once_newest_first():
+    collection = _seed([None])
+    pages = _all_pages(collection, 10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    docs = [doc for page in pages for doc in page]
+    assert len({doc["_id"] for doc in docs}) == 25
+    keys = [(doc["created_at"], doc["_id"]) for doc in docs]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_lists_never_load_case_text_or_analysis():
+    docs, _ = asyncio.run(list_cases(limit=5, collection=_seed([None]), fields=["title", "case_text", "analysis"]))
+    assert all("case_text" not in doc and "analysis" not in doc for doc in docs)
+
+
+def test_owner_and_unowned_filters():
+    owner = ObjectId()
+    collection = _seed([owner, None])
+    owned = [doc for page in _all_pages(collection, 7, owner_id=owner, fields=["owner_id"]) for doc in page]
+    unowned = [doc for page in _all_pages(collection, 7, unowned=True, fields=["owner_id"]) for doc in page]
+    assert len(owned) == 13 and all(doc["owner_id"] == owner for doc in owned)
+    assert len(unowned) == 12 and all(doc["owner_id"] is None for doc in unowned)
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.core.chunked_analyzer import analyze_long_case_async, chunk_text, merge_extractions, split_sentences
+from app.llm.token_budget import estimate_tokens
+
+
+def _document(sentences):
+    return " ".join(f"Sentence number {i} records one more fact about the dispute." for i in range(sentences))
+
+
+def test_split_sentences_keeps_legal_abbreviations_together():
+    text = "The accused was booked u/s. 420 IPC. He was arrested by Sh. Kumar on 3 May. Bail was refused."
+    assert split_sentences(text) == [
+        "The accused was booked u/s. 420 IPC.",
+        "He was arrested by Sh. Kumar on 3 May.",
+        "Bail was refused.",
+    ]
+
+
+def test_chunks_respect_the_budget_and_overlap():
+    chunks = chunk_text(_document(60), max_tokens=100, overlap_tokens=20)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        # The last sentence of each chunk opens the next one
+        assert current.startswith(split_sentences(previous)[-1])
+
+
+def test_merge_drops_duplicates_across_chunks():
+    merged = merge_extractions([
+        {"key_facts": ["Rent unpaid since May"], "legal_issues": [{"issue": "Eviction"}]},
+        {"key_facts": ["rent unpaid since May.", "Notice served"], "legal_issues": [{"issue": "eviction"}]},
+    ])
+    assert merged["key_facts"] == ["Rent unpaid since May", "Notice served"]
+    assert merged["legal_issues"] == [{"issue": "Eviction"}]
+
+
+def test_map_reduce_extracts_each_chunk_then_synthesizes_once():
+    text = _document(800)
+    chunks = len(chunk_text(text))
+    prompts, running, peak = [], [0], [0]
+
+    async def run_prompt(prompt):
+        prompts.append(prompt)
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        if len(prompts) <= chunks:
+            return {"key_facts": [f"fact {len(prompts)}"], "dates_and_deadlines": ["1 May 2024"]}, []
+        return {"case_type": "Civil", "case_summary": "Summary"}, []
+
+    result = asyncio.run(analyze_long_case_async(text, run_prompt, max_parallel=2))
+    assert chunks > 2 and len(prompts) == chunks + 1
+    assert peak[0] == 2
+    assert result["case_type"] == "Civil"
+    assert result["timeline_considerations"] == "1 May 2024"
+    assert result["key_facts"]
+
+
+def test_map_reduce_fails_when_every_chunk_fails():
+    async def run_prompt(prompt):
+        return None, ["Ollama failed: timeout"]
+
+    with pytest.raises(RuntimeError, match="Ollama failed"):
+        asyncio.run(analyze_long_case_async(_document(200), run_prompt))
@@ -0,0 +1,84 @@
+import time
+
+from app.llm.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown=60)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.rejections == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_limited_trials(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=30, half_open_max_calls=1)
+    breaker.record_failure()
+    now[0] += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    # A trial that ended without an outcome gives its slot back
+    breaker.release()
+    assert breaker.allow_request()
+
+
+def test_half_open_failure_reopens_and_success_closes(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    now[0] += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.to_dict()["retry_in_s"] == 30
+    now[0] += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_blocking_analysis_shares_the_breakers_and_cached_health(monkeypatch):
+    from app.core import analyzer
+    from app.llm.scheduler import Provider, ProviderScheduler
+    from benchmarks.stub_llm import SAMPLE_ANALYSIS
+
+    async def unused():
+        return True
+
+    gemini = Provider("Gemini", None, unused, breaker=CircuitBreaker("Gemini", failure_threshold=1, cooldown=60))
+    ollama = Provider("Ollama", None, unused, breaker=CircuitBreaker("Ollama", failure_threshold=1, cooldown=60))
+    calls = []
+
+    def call_gemini(prompt):
+        calls.append("Gemini")
+        raise RuntimeError("timeout")
+
+    def call_ollama(prompt):
+        calls.append("Ollama")
+        return dict(SAMPLE_ANALYSIS)
+
+    monkeypatch.setattr(analyzer, "provider_scheduler", ProviderScheduler([gemini, ollama], adaptive=False))
+    monkeypatch.setattr(analyzer, "_sync_providers", {"Gemini": call_gemini, "Ollama": call_ollama})
+    # Cached health answers without a probe
+    monkeypatch.setattr(analyzer.health_monitor, "_status", {"Gemini": (True, time.monotonic()),
+                                                            "Ollama": (True, time.monotonic())})
+    monkeypatch.setattr(analyzer, "_sync_probes", {})
+
+    assert analyzer.analyze_case_with_ai("A buyer paid for goods that never arrived.")["case_summary"]
+    assert gemini.breaker.state == OPEN
+    analyzer.analyze_case_with_ai("A buyer paid for goods that never arrived.")
+    assert calls == ["Gemini", "Ollama", "Ollama"]
@@ -0,0 +1,55 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app, request_limiter
+from app.utils.concurrency import RequestLimiter
+
+ORIGIN = {"Origin": "http://frontend.example"}
+
+
+def _full(monkeypatch):
+    """Leave the shared limiter with no free slot and a short queue timeout"""
+    monkeypatch.setattr(request_limiter, "_slots", asyncio.Semaphore(0))
+    monkeypatch.setattr(request_limiter, "queue_timeout", 0.05)
+
+
+def test_limiter_rejects_after_the_queue_timeout():
+    async def scenario():
+        limiter = RequestLimiter(max_concurrent=1, queue_timeout=0.05)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        limiter.release()
+        assert await limiter.acquire()
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 1
+    assert stats["rejected"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_busy_worker_answers_503_with_cors_headers(monkeypatch):
+    _full(monkeypatch)
+    rejected = request_limiter.rejected
+
+    response = TestClient(app).get("/api/v1/cases", headers=ORIGIN)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert request_limiter.rejected == rejected + 1
+
+
+def test_preflight_and_health_do_not_wait_for_a_slot(monkeypatch):
+    _full(monkeypatch)
+    client = TestClient(app)
+
+    preflight = client.options(
+        "/api/v1/case/analyze",
+        headers={**ORIGIN, "Access-Control-Request-Method": "POST"},
+    )
+    assert preflight.status_code == 200
+    assert preflight.headers["access-control-allow-origin"] == "*"
+
+    assert client.get("/health").status_code != 503
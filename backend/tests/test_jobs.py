@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.jobs import queue as job_queue_module
+from app.jobs.queue import JobQueue
+from app.jobs.store import COMPLETED, FAILED, MemoryJobStore, MongoJobStore, new_job
+
+
+async def _wait_finished(queue, job_id):
+    for _ in range(500):
+        job = await queue.get(job_id)
+        if job["status"] in (COMPLETED, FAILED):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def _run_jobs(process, batches, workers=1, max_attempts=3):
+    async def main():
+        store = MemoryJobStore()
+        # Stored before the queue starts, as after a restart, so priority alone decides the order
+        jobs = [new_job(cases, priority) for cases, priority in batches]
+        for job in jobs:
+            await store.insert(job)
+        queue = JobQueue(store, process, workers=workers, max_attempts=max_attempts, quotas=lambda owner: None)
+        await queue.start()
+        try:
+            return [await _wait_finished(queue, job["_id"]) for job in jobs]
+        finally:
+            await queue.stop()
+    return asyncio.run(main())
+
+
+def test_higher_priority_items_run_first():
+    order = []
+
+    async def process(case_text):
+        order.append(case_text)
+        return {"case_text": case_text}
+
+    low, high = _run_jobs(process, [([{"case_text": "low"}], 0), ([{"case_text": "high"}], 5)])
+    assert order == ["high", "low"]
+    assert low["completed"] == high["completed"] == 1
+    assert low["items"][0]["result"] == {"case_text": "low"}
+    # Job status never carries the case texts back
+    assert "case_text" not in low["items"][0]
+
+
+def test_failed_items_are_retried_then_recorded(monkeypatch):
+    monkeypatch.setattr(job_queue_module, "BATCH_RETRY_BASE_DELAY", 0.01)
+    attempts = []
+
+    async def process(case_text):
+        attempts.append(case_text)
+        if case_text == "flaky" and attempts.count("flaky") == 1 or case_text == "broken":
+            raise RuntimeError("provider timeout")
+        return {"ok": True}
+
+    (job,) = _run_jobs(process, [([{"case_text": "flaky"}, {"case_text": "broken"}], 0)], workers=2)
+    assert attempts.count("flaky") == 2 and attempts.count("broken") == 3
+    assert (job["status"], job["completed"], job["failed"]) == (COMPLETED, 1, 1)
+    assert job["items"][1]["error"] == "provider timeout"
+
+
+def test_mongo_store_claims_each_item_once(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    monkeypatch.setattr("app.jobs.store.get_db", lambda: db)
+
+    async def main():
+        store = MongoJobStore()
+        job = new_job([{"case_text": "a"}, {"case_text": "b"}], priority=2, owner={"kind": "user", "client": "u1"})
+        await store.insert(job)
+        claimable = sorted(await store.find_claimable())
+        first = await store.claim_item(job["_id"], 0, lease_seconds=60)
+        second = await store.claim_item(job["_id"], 0, lease_seconds=60)
+        return job, claimable, first, second, await store.find_claimable(), await store.get(job["_id"])
+
+    job, claimable, first, second, remaining, stored = asyncio.run(main())
+    owner = {"kind": "user", "client": "u1"}
+    assert claimable == [(job["_id"], 2, 0, owner), (job["_id"], 2, 1, owner)]
+    assert first["attempts"] == 1 and second is None
+    assert remaining == [(job["_id"], 2, 1, owner)]
+    assert [item["index"] for item in stored["items"]] == [0, 1]
+    assert "case_text" not in stored["items"][0]
@@ -0,0 +1,47 @@
+import pytest
+
+from app.llm.json_repair import canonical_sections, coerce_items, parse_model_json, repair_json
+
+
+def test_valid_json_needs_no_repair():
+    assert repair_json('{"a": 1}') == ({"a": 1}, [])
+
+
+def test_code_fence_and_trailing_comma():
+    value, repairs = repair_json('Here you go:\n```json\n{"a": [1, 2,], "b": "x",}\n```')
+    assert value == {"a": [1, 2], "b": "x"}
+    assert repairs
+
+
+def test_bare_words_become_literals():
+    value, _ = repair_json('{"ok": True, "missing": None, "no": false}')
+    assert value == {"ok": True, "missing": None, "no": False}
+
+
+def test_truncated_output_keeps_complete_members():
+    value, _ = repair_json('{"case_type": "Civil", "key_facts": ["one", "two"], "case_summary": "The ten')
+    assert value["case_type"] == "Civil"
+    assert value["key_facts"] == ["one", "two"]
+
+
+def test_unrepairable_output_raises():
+    with pytest.raises(RuntimeError):
+        repair_json("no json here at all")
+
+
+def test_parse_model_json_unwraps_wrapper_key():
+    assert parse_model_json('{"analysis": {"case_type": "Criminal"}}') == {"case_type": "Criminal"}
+
+
+def test_parse_model_json_rejects_non_objects():
+    with pytest.raises(RuntimeError):
+        parse_model_json("[1, 2, 3]")
+
+
+def test_canonical_sections_maps_aliases():
+    assert canonical_sections({"Summary": "s", "key-facts": ["f"]}) == {"case_summary": "s", "key_facts": ["f"]}
+
+
+def test_coerce_items_wraps_strings():
+    items = coerce_items("legal_issues", ["Cheating"])
+    assert items[0]["issue"] == "Cheating"
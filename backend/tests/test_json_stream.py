@@ -0,0 +1,28 @@
+from app.llm.json_stream import IncrementalSectionParser
+
+
+def _feed_in_chunks(parser, text, size):
+    sections = []
+    for start in range(0, len(text), size):
+        sections += parser.feed(text[start:start + size])
+    return sections
+
+
+def test_stream_parser_emits_sections_as_they_complete():
+    parser = IncrementalSectionParser()
+    assert parser.feed('{"case_type": "Civ') == []
+    assert parser.feed('il", "key_facts": ["a", "b"') == [("case_type", "Civil")]
+    assert parser.feed('], "case_summary": "done"}') == [("key_facts", ["a", "b"]), ("case_summary", "done")]
+    assert parser.done
+
+
+def test_stream_parser_ignores_prose_and_braces_in_strings():
+    text = 'Sure! ```json\n{"a": "curly } and \\" quote", "b": {"nested": [1, {"x": 2}]}}\n```'
+    sections = _feed_in_chunks(IncrementalSectionParser(), text, 3)
+    assert sections == [("a", 'curly } and " quote'), ("b", {"nested": [1, {"x": 2}]})]
+
+
+def test_stream_parser_close_recovers_truncated_value():
+    parser = IncrementalSectionParser()
+    parser.feed('{"case_type": "Civil", "key_facts": ["a", "b"')
+    assert parser.close() == [("key_facts", ["a", "b"])]
@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.metrics import Histogram, record_llm_usage, stage
+from benchmarks.stub_llm import SAMPLE_ANALYSIS
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test latency", buckets=(0.1, 1), labels=("stage",))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value, "parse")
+    lines = histogram.render().splitlines()
+    assert 'test_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="parse",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{stage="parse"} 6.05' in lines
+    assert 'test_seconds_count{stage="parse"} 4' in lines
+
+
+def test_stage_timings_reach_server_timing_and_metrics(monkeypatch):
+    async def analyze(case_text, **kwargs):
+        return dict(SAMPLE_ANALYSIS)
+
+    monkeypatch.setattr("app.api.routes.analyze_case_with_ai_async", analyze)
+    client = TestClient(app)
+    response = client.post("/api/v1/case/analyze", json={"case_text": "The accused cheated the complainant."})
+    stages = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert "validation" in stages and stages[-1] == "total"
+
+    with stage("unit_test_stage"):
+        pass
+    record_llm_usage("Ollama", 120, 40, 2.0)
+    body = client.get("/metrics").text
+    assert 'ai_lawyer_stage_seconds_count{stage="unit_test_stage"} 1' in body
+    assert 'ai_lawyer_http_request_seconds_count{method="POST",endpoint="analyze_case",status="200"}' in body
+    assert 'ai_lawyer_llm_tokens_per_second_bucket{provider="Ollama",le="20.0"}' in body
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import httpx
+
+from app.core.analyzer import ANALYSIS_SECTIONS, build_case_prompt
+from app.law_mapping.section_mapper import format_sections, map_sections
+from app.llm import ollama_client
+from app.llm.prompts import ANALYSIS_PREFIX, TYPED_ANALYSIS_PREFIX, case_analysis_prompt
+from app.llm.token_budget import OLLAMA_NUM_CTX
+
+CASE = ("The accused took an advance of Rs. 2,00,000 from the complainant for goods and never delivered them. "
+        "An FIR for cheating under Section 420 IPC was lodged at the local police station.")
+
+
+def test_typed_prompt_is_smaller_than_the_generic_prompt():
+    typed, case_type = build_case_prompt(CASE)
+    generic = case_analysis_prompt(CASE, format_sections(map_sections(CASE)))
+    assert case_type == "Criminal"
+    assert len(typed) < 0.95 * len(generic)
+
+
+def test_prompts_open_with_their_static_prefix_and_name_every_section():
+    typed, _ = build_case_prompt(CASE)
+    assert typed.startswith(TYPED_ANALYSIS_PREFIX)
+    assert case_analysis_prompt(CASE).startswith(ANALYSIS_PREFIX)
+    # The typed prompt asks for everything except case_type, which is known locally
+    assert all(name in TYPED_ANALYSIS_PREFIX for name in ANALYSIS_SECTIONS[1:])
+    assert "case_type" not in TYPED_ANALYSIS_PREFIX
+
+
+def test_warm_up_loads_at_the_request_context_and_primes_each_prefix(monkeypatch):
+    requests = []
+
+    def handler(request):
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": []})
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "{}"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def get_http_client():
+        return client
+
+    monkeypatch.setattr(ollama_client, "get_http_client", get_http_client)
+    timings = asyncio.run(ollama_client.warm_up_ollama_async((ANALYSIS_PREFIX, TYPED_ANALYSIS_PREFIX)))
+    assert set(timings) == {"load_s", "prefix_s"}
+    load, *primes = requests
+    assert "prompt" not in load and load["options"]["num_ctx"] == OLLAMA_NUM_CTX
+    assert [p["prompt"] for p in primes] == [ANALYSIS_PREFIX, TYPED_ANALYSIS_PREFIX]
+    assert all(p["options"]["num_ctx"] == OLLAMA_NUM_CTX and p["options"]["num_predict"] == 1 for p in primes)
+    assert all(r["keep_alive"] == load["keep_alive"] for r in primes)
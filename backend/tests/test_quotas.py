@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from app.jobs.queue import JobQueue
+from app.jobs.store import MemoryJobStore
+from app.utils.rate_limit import ClientQuotas
+
+
+def test_rate_limit_is_per_client():
+    quotas = ClientQuotas(rate_per_minute=60, burst=2, max_concurrent=0)
+    assert quotas.check_rate("a") == 0
+    assert quotas.check_rate("a") == 0
+    retry_after = quotas.check_rate("a")
+    assert 0 < retry_after <= 1
+    assert quotas.check_rate("b") == 0
+    assert quotas.stats()["rejected_rate"] == 1
+
+
+def test_zero_rate_is_unlimited():
+    quotas = ClientQuotas(rate_per_minute=0, burst=1, max_concurrent=0)
+    assert all(quotas.check_rate("a") == 0 for _ in range(100))
+    assert quotas.stats()["clients"] == 0
+
+
+def test_concurrent_analysis_slots():
+    quotas = ClientQuotas(rate_per_minute=0, burst=1, max_concurrent=2)
+    assert quotas.start_analysis("a") and quotas.start_analysis("a")
+    assert not quotas.start_analysis("a")
+    assert quotas.start_analysis("b")
+    quotas.finish_analysis("a")
+    assert quotas.start_analysis("a")
+    assert quotas.stats() == {"clients": 0, "analyses_in_flight": 3, "rejected_rate": 0, "rejected_concurrency": 1}
+
+
+def test_least_recently_seen_clients_are_dropped():
+    quotas = ClientQuotas(rate_per_minute=60, burst=1, max_concurrent=0, max_clients=2)
+    for client in ("a", "b", "a", "c"):
+        quotas.check_rate(client)
+    assert list(quotas._buckets) == ["a", "c"]
+
+
+def test_batch_items_are_charged_to_their_owner_as_they_run():
+    quotas = ClientQuotas(rate_per_minute=600, burst=3, max_concurrent=2)
+    running, peak = set(), [0]
+
+    async def process(case_text):
+        running.add(case_text)
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.02)
+        running.discard(case_text)
+        return {"case_text": case_text}
+
+    async def main():
+        queue = JobQueue(MemoryJobStore(), process, workers=4, quotas=lambda owner: quotas if owner else None)
+        await queue.start()
+        start = time.perf_counter()
+        job = await queue.submit([{"case_text": str(i)} for i in range(8)], owner={"kind": "user", "client": "u1"})
+        try:
+            for _ in range(200):
+                status = await queue.get(job["_id"])
+                if status["status"] == "completed":
+                    return status, time.perf_counter() - start
+                await asyncio.sleep(0.02)
+        finally:
+            await queue.stop()
+
+    status, elapsed = asyncio.run(main())
+    assert status["completed"] == 8
+    # Never more than the owner's two slots, and 5 items past the burst of 3 at 10/s
+    assert peak[0] == 2
+    assert elapsed >= 0.4
+    assert quotas.stats()["analyses_in_flight"] == 0
@@ -0,0 +1,96 @@
+import os
+import time
+
+import pytest
+from fastapi import FastAPI, Header
+from fastapi.testclient import TestClient
+
+from app.reports.report_generator import ReportGenerator, render_to_file
+from app.utils.range_response import RangeFileResponse, parse_range
+from benchmarks.stub_llm import SAMPLE_ANALYSIS
+
+BODY = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def download(tmp_path):
+    path = tmp_path / "brief.pdf"
+    path.write_bytes(BODY)
+    app = FastAPI()
+
+    @app.get("/brief")
+    def brief(range: str = Header(None), if_range: str = Header(None)):
+        return RangeFileResponse(str(path), "application/pdf", filename="brief.pdf",
+                                 range_header=range, if_range=if_range)
+
+    return TestClient(app)
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    # Multi-range and other units fall back to the whole file
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    for unsatisfiable in ("bytes=100-", "bytes=9-3", "bytes=-0"):
+        with pytest.raises(ValueError):
+            parse_range(unsatisfiable, 100)
+
+
+def test_whole_file_and_byte_ranges(download):
+    whole = download.get("/brief")
+    assert whole.status_code == 200
+    assert whole.content == BODY
+    assert whole.headers["accept-ranges"] == "bytes"
+    assert whole.headers["content-disposition"] == 'attachment; filename="brief.pdf"'
+
+    part = download.get("/brief", headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206
+    assert part.content == BODY[100:200]
+    assert part.headers["content-range"] == f"bytes 100-199/{len(BODY)}"
+    assert part.headers["content-length"] == "100"
+
+    tail = download.get("/brief", headers={"Range": "bytes=-24"})
+    assert tail.status_code == 206
+    assert tail.content == BODY[-24:]
+
+
+def test_unsatisfiable_range_is_416(download):
+    response = download.get("/brief", headers={"Range": f"bytes={len(BODY)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(BODY)}"
+    assert response.content == b""
+
+
+def test_if_range_only_resumes_the_same_file(download):
+    etag = download.get("/brief").headers["etag"]
+    same = download.get("/brief", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert same.status_code == 206
+    changed = download.get("/brief", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert changed.status_code == 200
+    assert changed.content == BODY
+
+
+@pytest.mark.parametrize("fmt, magic", [("pdf", b"%PDF"), ("docx", b"PK")])
+def test_render_to_file_leaves_only_the_finished_report(tmp_path, fmt, magic):
+    pytest.importorskip("reportlab" if fmt == "pdf" else "docx")
+    path = tmp_path / f"case-v1.{fmt}"
+    render_to_file(fmt, SAMPLE_ANALYSIS, {"title": "Test brief", "case_id": "abc"}, str(path))
+    assert path.read_bytes().startswith(magic)
+    assert os.listdir(tmp_path) == [path.name]
+
+
+def test_prune_drops_the_oldest_reports_and_stale_partials(tmp_path):
+    generator = ReportGenerator(cache_dir=str(tmp_path), workers=1, max_files=2)
+    now = time.time()
+    for age, name in enumerate(["new.pdf", "mid.pdf", "old.pdf", "live.part", "dead.part"]):
+        path = tmp_path / name
+        path.write_bytes(b"x")
+        mtime = now - (7200 if name == "dead.part" else age)
+        os.utime(path, (mtime, mtime))
+
+    assert generator.prune() == 2
+    assert sorted(os.listdir(tmp_path)) == ["live.part", "mid.pdf", "new.pdf"]
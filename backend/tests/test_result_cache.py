@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.core.result_cache import AnalysisCache, make_cache_key
+
+
+def test_cache_key_ignores_whitespace_but_not_model():
+    key = make_cache_key("A  case\n text ", "v1", "model")
+    assert key == make_cache_key("A case text", "v1", "model")
+    assert key != make_cache_key("A case text", "v1", "other-model")
+
+
+def test_concurrent_lookups_share_one_computation():
+    cache = AnalysisCache(max_entries=10, ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"case_type": "Civil"}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert results == [{"case_type": "Civil"}] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+    assert asyncio.run(cache.get_or_compute("k", compute)) == {"case_type": "Civil"}
+    assert cache.hits == 1
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    cache = AnalysisCache(max_entries=10, ttl_seconds=60)
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        second = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == {"ok": True}
+
+
+def test_failures_are_not_cached():
+    cache = AnalysisCache(max_entries=10, ttl_seconds=60)
+    attempts = []
+
+    async def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("provider down")
+        return {"ok": True}
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute("k", compute))
+    assert asyncio.run(cache.get_or_compute("k", compute)) == {"ok": True}
+
+
+def test_returned_values_are_copies():
+    cache = AnalysisCache(max_entries=10, ttl_seconds=60)
+    cache.set("k", {"facts": ["a"]})
+    cache.get("k")["facts"].append("b")
+    assert cache.get("k") == {"facts": ["a"]}
+
+
+def test_lru_eviction_and_ttl_expiry(monkeypatch):
+    import time
+
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = AnalysisCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.expirations == 1
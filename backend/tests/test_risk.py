@@ -0,0 +1,68 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.analysis.risk_detector import assess_risk, detect_deadlines
+from app.analysis.sentiment_analyzer import analyze_sentiment, lexicon_hits
+from app.main import app
+
+CHEQUE_CASE = (
+    "The client lent Rs. 2,00,000 to his neighbour orally, paid in cash with no receipt. "
+    "The neighbour issued a cheque which bounced on 10 January 2024 for insufficient funds. "
+    "The client admitted he did not reply to messages for months."
+)
+
+
+def test_longest_phrase_wins():
+    phrases = [hit.phrase for hit in lexicon_hits("There was no written agreement, only a receipt.")]
+    assert phrases == ["no written agreement", "receipt"]
+
+
+def test_sentiment_labels_the_tone():
+    adverse = analyze_sentiment("He admitted the delay. There is no proof and no witness; he confessed orally.")
+    assert adverse["label"] == "adverse"
+    assert "admitted" in adverse["adverse_terms"]
+
+    favourable = analyze_sentiment(
+        "Payment was by bank transfer under a written agreement, the CCTV footage and "
+        "the medical report support him, and the eyewitness statement is on record."
+    )
+    assert favourable["label"] == "favourable"
+    assert favourable["adverse_score"] == 0
+
+    assert analyze_sentiment("The parties met in Delhi.")["label"] == "neutral"
+
+
+def test_deadlines_count_from_the_nearest_date():
+    deadlines = detect_deadlines(CHEQUE_CASE, today=date(2024, 1, 20))
+    notice = next(d for d in deadlines if d["source"].endswith("s. 138(b)"))
+    assert notice["trigger_date"] == "2024-01-10"
+    assert notice["due_date"] == "2024-02-09"
+    assert notice["days_remaining"] == 20
+    assert notice["status"] == "urgent"
+    # Soonest first
+    assert deadlines == sorted(deadlines, key=lambda d: d["days_remaining"])
+
+
+def test_expired_deadline_and_evidence_gaps_make_a_high_risk():
+    risk = assess_risk(CHEQUE_CASE, today=date(2024, 6, 1))
+    assert risk["deadlines"][0]["status"] == "expired"
+    assert [gap["cue"] for gap in risk["evidence_gaps"]] == ["orally", "paid in cash", "no receipt"]
+    assert risk["risk_level"] == "High"
+    assert 0.6 <= risk["risk_score"] < 1
+
+
+def test_case_without_dates_or_cues_is_low_risk():
+    risk = assess_risk("The tenant wants to know whether the landlord may raise the rent.")
+    assert risk["deadlines"] == []
+    assert risk["evidence_gaps"] == []
+    assert risk["risk_level"] == "Low"
+
+
+def test_risk_route_needs_no_llm():
+    response = TestClient(app).post("/api/v1/case/risk", json={"case_text": CHEQUE_CASE})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["risk_level"] in ("High", "Medium", "Low")
+    assert body["evidence_gaps"][0]["cue"] == "orally"
+    assert body["sentiment"]["label"] == "adverse"
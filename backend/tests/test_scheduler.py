@@ -0,0 +1,95 @@
+import asyncio
+
+from app.llm.circuit_breaker import CircuitBreaker
+from app.llm.scheduler import HEDGED, RACE, SEQUENTIAL, Provider, ProviderScheduler
+
+
+def _provider(name, result=None, delay=0.0, error=None, available=True, calls=None):
+    async def call(prompt):
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    async def is_available():
+        return available
+
+    return Provider(name, call, is_available, breaker=CircuitBreaker(name, failure_threshold=1, cooldown=60))
+
+
+def _run(scheduler, **kwargs):
+    return asyncio.run(scheduler.run("prompt", **kwargs))
+
+
+def test_sequential_falls_through_failures_in_order():
+    calls = []
+    scheduler = ProviderScheduler([
+        _provider("a", error=RuntimeError("boom"), calls=calls),
+        _provider("b", available=False, calls=calls),
+        _provider("c", result={"ok": 1}, calls=calls),
+    ], mode=SEQUENTIAL, adaptive=False)
+    result, errors = _run(scheduler)
+    assert result == {"ok": 1}
+    assert calls == ["a", "c"]
+    assert len(errors) == 2
+
+
+def test_sequential_returns_none_when_every_provider_fails():
+    scheduler = ProviderScheduler([_provider("a", error=RuntimeError("boom"))], mode=SEQUENTIAL, adaptive=False)
+    result, errors = _run(scheduler)
+    assert result is None
+    assert errors == ["a failed: boom"]
+
+
+def test_failure_opens_the_breaker_and_skips_the_provider():
+    calls = []
+    failing = _provider("a", error=RuntimeError("boom"), calls=calls)
+    scheduler = ProviderScheduler([failing, _provider("b", result={"ok": 1})], mode=SEQUENTIAL, adaptive=False)
+    _run(scheduler)
+    _, errors = _run(scheduler)
+    assert calls == ["a"]
+    assert "a circuit breaker is open" in errors
+
+
+def test_hedged_starts_the_next_provider_after_the_delay():
+    calls = []
+    slow = _provider("slow", result={"from": "slow"}, delay=1.0, calls=calls)
+    fast = _provider("fast", result={"from": "fast"}, calls=calls)
+    scheduler = ProviderScheduler([slow, fast], mode=HEDGED, adaptive=False)
+    scheduler._launch_delay = lambda provider: 0.05
+    result, _ = _run(scheduler)
+    assert result == {"from": "fast"}
+    assert calls == ["slow", "fast"]
+    assert slow.stats.cancellations == 1
+
+
+def test_race_takes_the_first_valid_answer():
+    scheduler = ProviderScheduler([
+        _provider("slow", result={"from": "slow"}, delay=0.2),
+        _provider("empty", result={}),
+        _provider("fast", result={"from": "fast"}, delay=0.01),
+    ], mode=RACE, adaptive=False)
+    result, _ = _run(scheduler)
+    assert result == {"from": "fast"}
+
+
+def test_accept_predicate_can_allow_an_empty_object():
+    calls = []
+    scheduler = ProviderScheduler([
+        _provider("a", result={}, calls=calls),
+        _provider("b", result={"x": 1}, calls=calls),
+    ], mode=SEQUENTIAL, adaptive=False)
+    result, _ = _run(scheduler, accept=lambda r: isinstance(r, dict))
+    assert result == {}
+    assert calls == ["a"]
+
+
+def test_adaptive_order_prefers_the_cheaper_provider():
+    slow, fast = _provider("slow"), _provider("fast")
+    for _ in range(5):
+        slow.stats.record_success(5.0)
+        fast.stats.record_success(1.0)
+    scheduler = ProviderScheduler([slow, fast], mode=SEQUENTIAL, adaptive=True)
+    assert [p.name for p in scheduler.ordered_providers()] == ["fast", "slow"]
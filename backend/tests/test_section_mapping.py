@@ -0,0 +1,42 @@
+from app.law_mapping.reasoning_engine import parse_citation, validate_applicable_laws
+from app.law_mapping.section_mapper import SectionIndex, map_sections
+
+CHEATING = "The accused dishonestly induced the complainant to pay an advance and cheated him, never delivering the goods."
+
+
+def test_retrieval_ranks_the_matching_section_first():
+    sections = map_sections(CHEATING, 3)
+    assert sections[0]["act"] == "IPC" and sections[0]["section"] == "420"
+    assert [s["score"] for s in sections] == sorted((s["score"] for s in sections), reverse=True)
+    assert map_sections("   ") == []
+
+
+def test_index_file_is_built_once_and_memory_mapped(tmp_path):
+    index_path = tmp_path / "sections.idx"
+    built = SectionIndex(index_path=str(index_path))
+    expected = built.search(CHEATING, 5)
+    assert index_path.exists()
+    mtime = index_path.stat().st_mtime_ns
+    reopened = SectionIndex(index_path=str(index_path))
+    assert reopened.search(CHEATING, 5) == expected
+    assert index_path.stat().st_mtime_ns == mtime
+
+
+def test_stale_index_file_is_rebuilt(tmp_path):
+    index_path = tmp_path / "sections.idx"
+    index_path.write_bytes(b"SIDX" + b"\0" * 100)
+    assert SectionIndex(index_path=str(index_path)).search(CHEATING, 1)
+    assert index_path.read_bytes()[:4] == b"SIDX" and index_path.stat().st_size > 104
+
+
+def test_parse_citation_forms():
+    assert parse_citation("Sections 406 and 420 IPC") == ("IPC", ["406", "420"])
+    assert parse_citation("Order VII Rule 11 CPC") == ("CPC", ["O7R11"])
+    # Enactment years are not section numbers
+    assert parse_citation("IPC 420 of 1860") == ("IPC", ["420"])
+
+
+def test_cited_laws_are_checked_against_the_index():
+    laws = validate_applicable_laws([{"law": "IPC Section 420"}, {"law": "IPC Section 9999"}])
+    assert laws[0]["verified"] and laws[0]["description"]
+    assert laws[1]["verified"] is False
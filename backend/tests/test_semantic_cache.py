@@ -0,0 +1,54 @@
+import asyncio
+
+from app.core import analyzer
+from app.core.semantic_cache import SemanticCache, sentence_diff
+from benchmarks.stub_llm import SAMPLE_ANALYSIS
+
+CASE = ("The landlord let the flat to the tenant in 2019. The tenant has not paid rent since May 2023. "
+        "A legal notice demanding the arrears was served in August. The tenant did not reply to the notice.")
+
+
+def test_sentence_diff_ignores_spacing_and_case():
+    added, removed = sentence_diff(CASE, CASE.replace(". ", " .  ").upper())
+    assert added == [] and removed == []
+    added, removed = sentence_diff(CASE, CASE.replace("did not reply", "replied"))
+    assert added == ["The tenant replied to the notice."]
+    assert removed == ["The tenant did not reply to the notice."]
+
+
+def test_lookups_only_match_the_owners_own_cases():
+    cache = SemanticCache(max_entries=100, ann_min_rows=1000)
+
+    async def main():
+        assert await cache.lookup(CASE, "alice") is None
+        cache.add(CASE, {"case_summary": "alice's analysis"}, "alice")
+        edited = CASE.replace("August", "September")
+        return await cache.lookup(edited, "alice"), await cache.lookup(edited, "bob")
+
+    own, other = asyncio.run(main())
+    assert own.analysis == {"case_summary": "alice's analysis"} and own.score > 0.85
+    assert other is None
+
+
+def test_a_near_duplicate_from_another_user_is_analyzed_afresh(monkeypatch):
+    monkeypatch.setattr(analyzer, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(analyzer, "semantic_cache", SemanticCache(max_entries=100, ann_min_rows=1000))
+    prompts = []
+
+    async def run(prompt, **kwargs):
+        prompts.append(prompt)
+        return dict(SAMPLE_ANALYSIS), []
+
+    monkeypatch.setattr(analyzer.provider_scheduler, "run", run)
+
+    async def main():
+        await analyzer.analyze_case_with_ai_async(CASE, owner="alice")
+        # Same sentences, different spacing: reused for alice without an LLM call
+        await analyzer.analyze_case_with_ai_async(CASE.replace(". ", " .  "), owner="alice")
+        alice_calls = len(prompts)
+        await analyzer.analyze_case_with_ai_async(CASE.replace(". ", " .   "), owner="bob")
+        return alice_calls
+
+    assert asyncio.run(main()) == 1
+    assert len(prompts) == 2
+    assert analyzer.semantic_cache.hits == 1
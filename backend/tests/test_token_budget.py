@@ -0,0 +1,52 @@
+from app.core.chunked_analyzer import CHUNK_TOKENS, LONG_DOC_THRESHOLD_TOKENS
+from app.llm.token_budget import (
+    MAX_OUTPUT_TOKENS,
+    MIN_OUTPUT_TOKENS,
+    OLLAMA_NUM_CTX,
+    compact_case_text,
+    estimate_tokens,
+    ollama_context_options,
+    output_token_budget,
+)
+
+
+def _prompt(tokens):
+    return "x" * (tokens * 4)
+
+
+def test_num_ctx_is_the_same_for_every_prompt():
+    sizes = [ollama_context_options(_prompt(tokens))["num_ctx"] for tokens in (10, 3000, 6000, 20000)]
+    assert sizes == [OLLAMA_NUM_CTX] * 4
+
+
+def test_answer_budget_grows_with_the_prompt_within_bounds():
+    assert output_token_budget(0) == MIN_OUTPUT_TOKENS
+    assert MIN_OUTPUT_TOKENS < output_token_budget(1000) < MAX_OUTPUT_TOKENS
+    assert output_token_budget(100000) == MAX_OUTPUT_TOKENS
+    assert ollama_context_options(_prompt(100))["num_predict"] == output_token_budget(110)
+
+
+def test_answer_is_shortened_when_prompt_and_answer_do_not_fit():
+    options = ollama_context_options(_prompt(6500))
+    assert options["num_predict"] < MAX_OUTPUT_TOKENS
+    assert int(6500 * 1.1) + options["num_predict"] <= OLLAMA_NUM_CTX
+    # Never below half the minimum answer, however long the prompt
+    assert ollama_context_options(_prompt(20000))["num_predict"] == MIN_OUTPUT_TOKENS // 2
+
+
+def test_a_case_below_the_long_document_threshold_gets_a_full_answer():
+    # Threshold plus ~700 tokens of instructions and statute references
+    options = ollama_context_options(_prompt(LONG_DOC_THRESHOLD_TOKENS + 700))
+    assert options["num_predict"] == MAX_OUTPUT_TOKENS
+    assert CHUNK_TOKENS < LONG_DOC_THRESHOLD_TOKENS
+
+
+def test_compaction_drops_page_furniture_but_keeps_the_text():
+    facts = ["The tenant stopped paying rent in May.", "A notice was served in July.", "The tenant did not reply."]
+    page = "IN THE COURT OF THE CIVIL JUDGE, PUNE\n{fact}\nPage {n} of 3\n\n"
+    text = "".join(page.format(fact=fact, n=n) for n, fact in enumerate(facts, 1)) + "Sd/-\nAdvocate for the plaintiff"
+    compacted = compact_case_text(text)
+    assert compacted.count("IN THE COURT OF THE CIVIL JUDGE") == 1
+    assert "Page" not in compacted and "Sd/-" not in compacted
+    assert all(fact in compacted for fact in facts)
+    assert estimate_tokens(compacted) < estimate_tokens(text)
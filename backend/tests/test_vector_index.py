@@ -0,0 +1,82 @@
+import numpy as np
+
+from app.core.vector_index import VectorIndex
+
+
+def _unit_vectors(count, dim, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_brute_force_search_ranks_by_cosine():
+    vectors = _unit_vectors(50, 16)
+    index = VectorIndex(16, capacity=100, ann_min_rows=1000)
+    for i, vector in enumerate(vectors):
+        index.add(f"k{i}", vector)
+    results = index.search(vectors[7], k=3)
+    assert results[0][0] == "k7"
+    assert abs(results[0][1] - 1.0) < 1e-5
+    assert results[0][1] >= results[1][1] >= results[2][1]
+
+
+def test_full_index_overwrites_the_oldest():
+    vectors = _unit_vectors(6, 8)
+    index = VectorIndex(8, capacity=4, ann_min_rows=1000)
+    evicted = [index.add(f"k{i}", vector) for i, vector in enumerate(vectors)]
+    assert evicted == [None, None, None, None, "k0", "k1"]
+    assert len(index) == 4
+    assert "k0" not in index and "k5" in index
+    assert index.search(vectors[5])[0][0] == "k5"
+
+
+def test_lsh_is_built_at_the_threshold_and_finds_exact_matches():
+    vectors = _unit_vectors(300, 32)
+    index = VectorIndex(32, capacity=1000, ann_min_rows=200)
+    for i, vector in enumerate(vectors[:199]):
+        index.add(f"k{i}", vector)
+    assert not index.ann_enabled
+    for i, vector in enumerate(vectors[199:], start=199):
+        index.add(f"k{i}", vector)
+    assert index.ann_enabled
+    for i in (0, 150, 299):
+        assert index.search(vectors[i])[0][0] == f"k{i}"
+
+
+def test_eviction_with_lsh_removes_the_old_row_from_its_buckets():
+    vectors = _unit_vectors(80, 32, seed=1)
+    index = VectorIndex(32, capacity=50, ann_min_rows=40)
+    for i, vector in enumerate(vectors):
+        index.add(f"k{i}", vector)
+    assert index.ann_enabled and len(index) == 50
+    # Rows of the 30 evicted keys now hold k50..k79
+    for i in range(30):
+        hits = [key for key, _ in index.search(vectors[i], k=5)]
+        assert f"k{i}" not in hits
+    for i in range(50, 80):
+        assert index.search(vectors[i])[0][0] == f"k{i}"
+    buckets = sum(len(bucket) for table in index._buckets for bucket in table.values())
+    assert buckets == 50 * index.lsh_tables
+
+
+def test_replacing_a_key_rebuckets_its_vector():
+    vectors = _unit_vectors(60, 32, seed=2)
+    index = VectorIndex(32, capacity=100, ann_min_rows=50)
+    for i, vector in enumerate(vectors[:55]):
+        index.add(f"k{i}", vector)
+    assert index.add("k3", vectors[59]) is None
+    assert len(index) == 55
+    assert index.search(vectors[59])[0][0] == "k3"
+    # The old vector is gone from the matrix and the buckets
+    assert index.search(vectors[3])[0][1] < 0.99
+
+
+def test_search_within_a_group_ignores_other_groups():
+    vectors = _unit_vectors(40, 16)
+    for ann_min_rows in (1000, 10):
+        index = VectorIndex(16, 100, ann_min_rows=ann_min_rows, lsh_tables=4, lsh_bits=4)
+        for i, vector in enumerate(vectors):
+            index.add(f"k{i}", vector, group="even" if i % 2 == 0 else "odd")
+        assert index.search(vectors[7], 1)[0][0] == "k7"
+        assert index.search(vectors[7], 1, group="odd")[0][0] == "k7"
+        assert all(int(key[1:]) % 2 == 0 for key, _ in index.search(vectors[7], 5, group="even"))
+        assert index.search(vectors[7], 1, group="nobody") == []